@@ -11,21 +11,21 @@ st.set_page_config(
 
 
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 import os
+import dotenv
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from PIL import Image
 import docx
 from docx.shared import Pt, RGBColor, Inches
 import io
-from urllib.parse import urlparse
 from googlenews import GoogleNews
-from news_ai import (
-    collect_news,
-    filter_valid_press,
-    filter_excluded_news,
-    group_and_select_news,
-    evaluate_importance,
-)
+from date_utils import KST, format_news_date
+from press_matcher import parse_press_config
+from pipeline import build_initial_state, run_company_pipeline
+from telemetry import new_run_id, get_run_telemetry, close_run
+from news_ai import prefetch_news
 
 # Import centralized configuration
 from config import (
@@ -41,39 +41,26 @@ from config import (
     SELECTION_CRITERIA, 
     GPT_MODELS,
     DEFAULT_GPT_MODEL,
+    NEWS_FETCH_SETTINGS,
+    LLM_CACHE_SETTINGS,
+    PIPELINE_SETTINGS,
+    STREAMING_SETTINGS,
+    TELEMETRY_SETTINGS,
+    STAGE_MODEL_ROUTING,
+    ARTICLE_STORE_SETTINGS,
+    CHECKPOINT_SETTINGS,
     # 새로 추가되는 회사별 기준들
     COMPANY_ADDITIONAL_EXCLUSION_CRITERIA,
     COMPANY_ADDITIONAL_DUPLICATE_HANDLING,
     COMPANY_ADDITIONAL_SELECTION_CRITERIA
 )
 
-# 한국 시간대(KST) 정의
-KST = timezone(timedelta(hours=9))
-
-
-def format_date(date_str):
-    """Format date to MM/DD format with proper timezone handling"""
-    try:
-        # Try YYYY-MM-DD format
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        return date_obj.strftime('%m/%d')
-    except Exception:
-        try:
-            # Try GMT format and convert to KST
-            date_obj = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %Z')
-            # Convert UTC to KST (add 9 hours)
-            date_obj_kst = date_obj + timedelta(hours=9)
-            return date_obj_kst.strftime('%m/%d')
-        except Exception:
-            try:
-                # Try GMT format without timezone indicator
-                date_obj = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S GMT')
-                # Convert UTC to KST (add 9 hours)
-                date_obj_kst = date_obj + timedelta(hours=9)
-                return date_obj_kst.strftime('%m/%d')
-            except Exception:
-                # Return original if parsing fails
-                return date_str if date_str else '날짜 정보 없음'
+# 환경 변수(.env) 로드 (OPENAI_API_KEY 등)
+dotenv.load_dotenv(override=True) #pwc
+
+def format_date(news):
+    """Format a news item's publish date to MM/DD in KST"""
+    return format_news_date(news.get('published_at') or news.get('date', ''))
 
 # 회사별 추가 기준을 적용하는 함수들
 def get_enhanced_exclusion_criteria(companies):
@@ -788,9 +775,56 @@ st.sidebar.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
+# 단계별 모델 안내 (1단계는 저가 모델로 먼저 분류하고 불확실한 뉴스만 선택한 모델로 재판단)
+stage1_model = STAGE_MODEL_ROUTING["stage_models"].get(1) if STAGE_MODEL_ROUTING["enabled"] else None
+if stage1_model and stage1_model != selected_model:
+    st.sidebar.caption(
+        f"1단계 제외 판단은 {stage1_model}로 먼저 분류하고, 보류 또는 확신도가 낮은 뉴스만 {selected_model}로 다시 판단합니다."
+    )
+
+# LLM 응답 캐시 사용 여부 (끄면 항상 새로 호출)
+use_llm_cache = st.sidebar.checkbox(
+    "LLM 응답 캐시 사용",
+    value=LLM_CACHE_SETTINGS["enabled"],
+    help="같은 모델과 프롬프트로 이미 받은 응답이 있으면 다시 호출하지 않고 재사용합니다. 끄면 모든 단계를 새로 호출합니다."
+)
+
+# 기사 저장소 사용 여부 (이전 실행에서 같은 기준으로 판단한 기사는 다시 판단하지 않음)
+use_article_store = st.sidebar.checkbox(
+    "이전 분석 판단 재사용",
+    value=ARTICLE_STORE_SETTINGS["enabled"],
+    help="기간이 겹치는 이전 분석에서 같은 기준으로 이미 판단한 기사는 LLM에 다시 보내지 않고 저장된 판단을 사용합니다. 기준이나 모델을 바꾸면 새로 판단합니다."
+)
+
+# 중단된 이전 실행 이어서 하기 (같은 실행 ID로 다시 실행하면 회사별 마지막 완료 단계 다음부터 실행)
+resume_last_run = False
+if CHECKPOINT_SETTINGS["enabled"] and st.session_state.get("last_run_id"):
+    resume_last_run = st.sidebar.checkbox(
+        "중단된 이전 실행 이어서 하기",
+        value=False,
+        help=f"직전 실행({st.session_state.last_run_id})에서 완료된 단계는 다시 실행하지 않고 저장된 결과를 사용합니다. "
+             "검색 기간이나 기준을 바꿨다면 끄고 새로 실행하세요."
+    )
+
+# LLM 응답 스트리밍 여부 (분석 중에 분류/선정 결과를 미리 표시)
+use_streaming = st.sidebar.checkbox(
+    "분석 중 결과 미리보기",
+    value=STREAMING_SETTINGS["enabled"],
+    help="LLM 응답을 스트리밍으로 받아 분류/선정된 뉴스를 응답이 끝나기 전에 먼저 보여줍니다."
+)
+
 # 구분선 추가
 st.sidebar.markdown("---")
 
+# 동시에 분석할 기업 수 (LLM 동시 호출 수는 config의 PIPELINE_SETTINGS로 별도 제한)
+company_workers = st.sidebar.slider(
+    "동시 분석 기업 수",
+    min_value=1,
+    max_value=10,
+    value=PIPELINE_SETTINGS["company_workers"],
+    help="여러 기업의 분석을 동시에 진행합니다. 값을 높이면 전체 분석 시간이 줄어듭니다."
+)
+
 # 검색 결과 수 - 고정 값으로 설정
 max_results = 100
 
@@ -931,6 +965,242 @@ analysis_prompt = f"""
 {duplicate_handling}
 """
 
+def format_live_preview(company_items):
+    """분석 중인 회사별 스트리밍 항목을 미리보기 마크다운으로 만듭니다."""
+    lines = []
+    for company, items in company_items.items():
+        counts = {}
+        selected = []
+        for (stage, key, _), item in items.items():
+            counts[key] = counts.get(key, 0) + 1
+            if stage == 3 and key == "final_selection":
+                selected.append(item)
+        lines.append(
+            f"**{company}** — 제외 {counts.get('excluded', 0)} · 보류 {counts.get('borderline', 0)} · "
+            f"유지 {counts.get('retained', 0)} · 그룹 {counts.get('groups', 0)} · 선정 {len(selected)}"
+        )
+        for item in selected:
+            lines.append(f"  - ⏳ {item.get('title', '')} (중요도: {item.get('importance', '-')})")
+    return "\n".join(lines)
+
+def render_telemetry_summary(run):
+    """이번 실행의 회사/단계별 LLM 토큰 사용량과 처리 시간을 표로 표시합니다."""
+    rows = run.summary()
+    if not rows:
+        return
+
+    stage_names = {1: "1단계 제외 판단", 2: "2단계 그룹핑", 3: "3단계 중요도 평가"}
+    total_prompt_tokens = sum(row["prompt_tokens"] for row in rows)
+    total_completion_tokens = sum(row["completion_tokens"] for row in rows)
+    total_wall_time = sum(row["wall_time"] for row in rows)
+
+    with st.expander(f"📈 LLM 사용량 및 처리 시간 (실행 ID: {run.run_id})"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("입력 토큰", f"{total_prompt_tokens:,}")
+        col2.metric("출력 토큰", f"{total_completion_tokens:,}")
+        col3.metric("LLM 호출 시간 합계", f"{total_wall_time:.1f}초")
+        st.dataframe([
+            {
+                "기업": row["company"],
+                "단계": stage_names.get(row["stage"], str(row["stage"])),
+                "호출": row["calls"],
+                "재시도": row["retries"],
+                "형식 수정": row["repairs"],
+                "상위 모델 재판단": row["escalations"],
+                "캐시 사용": row["cache_hits"],
+                "오류": row["errors"],
+                "입력 토큰": row["prompt_tokens"],
+                "출력 토큰": row["completion_tokens"],
+                "호출 시간(초)": row["wall_time"],
+                "대기 시간(초)": row["wait_time"],
+            }
+            for row in rows
+        ], use_container_width=True, hide_index=True)
+        st.caption("호출 시간은 호출별 소요 시간의 합계이므로 동시에 실행된 호출이 있으면 실제 경과 시간보다 깁니다.")
+        if run.path:
+            st.caption(f"호출별 기록: {run.path}")
+
+def render_company_result(company, company_keywords, final_state, messages):
+    """한 회사의 분석 진행 메시지와 결과를 현재 컨테이너에 표시합니다."""
+    # 연관 키워드 및 진행 메시지 표시 (파이프라인 실행 중 수집된 메시지)
+    st.write(f"'{company}' 연관 키워드로 검색 중: {', '.join(company_keywords)}")
+    for level, message in messages:
+        getattr(st, level)(message)
+
+    # 재평가에 사용한 상태 (재평가를 수행한 경우에만 존재)
+    reevaluation_state = final_state.get("reevaluation_state")
+
+    # 키워드 구분선 추가
+    st.markdown("---")
+
+    # 키워드별 섹션 구분
+    st.markdown(f"## 📊 {company} 분석 결과")
+
+    # 전체 뉴스 표시 (필터링 전)
+    with st.expander(f"📰 '{company}' 관련 전체 뉴스 (필터링 전)"):
+        for i, news in enumerate(final_state.get("original_news_data", []), 1):
+            date_str = news.get('date', '날짜 정보 없음')
+            url = news.get('url', 'URL 정보 없음')
+            press = news.get('press', '알 수 없음')
+            st.markdown(f"""
+            <div class="news-card">
+                <div class="news-title">{i}. {news['content']}</div>
+                <div class="news-meta">📰 {press}</div>
+                <div class="news-date">📅 {date_str}</div>
+                <div class="news-url">🔗 <a href="{url}" target="_blank">{url}</a></div>
+            </div>
+            """, unsafe_allow_html=True)
+
+    # 유효 언론사 필터링된 뉴스 표시
+    with st.expander(f"📰 '{company}' 관련 유효 언론사 뉴스"):
+        for i, news in enumerate(final_state["news_data"]):
+            date_str = news.get('date', '날짜 정보 없음')
+            url = news.get('url', 'URL 정보 없음')
+            press = news.get('press', '알 수 없음')
+            st.markdown(f"""
+            <div class="news-card">
+                <div class="news-title">{i+1}. {news['content']}</div>
+                <div class="news-meta">📰 {press}</div>
+                <div class="news-date">📅 {date_str}</div>
+                <div class="news-url">🔗 <a href="{url}" target="_blank">{url}</a></div>
+            </div>
+            """, unsafe_allow_html=True)
+
+    # 2단계: 유효 언론사 필터링 결과 표시
+    st.markdown("<div class='subtitle'>🔍 2단계: 유효 언론사 필터링 결과</div>", unsafe_allow_html=True)
+    st.markdown(f"유효 언론사 뉴스: {len(final_state['news_data'])}개")
+
+    # 3단계: 제외/보류/유지 뉴스 표시
+    st.markdown("<div class='subtitle'>🔍 3단계: 뉴스 분류 결과</div>", unsafe_allow_html=True)
+
+    # 제외된 뉴스
+    with st.expander("❌ 제외된 뉴스"):
+        for news in final_state["excluded_news"]:
+            st.markdown(f"<div class='excluded-news'>[{news['index']}] {news['title']}<br/>└ {news['reason']}</div>", unsafe_allow_html=True)
+
+    # 보류 뉴스
+    with st.expander("⚠️ 보류 뉴스"):
+        for news in final_state["borderline_news"]:
+            st.markdown(f"<div class='excluded-news'>[{news['index']}] {news['title']}<br/>└ {news['reason']}</div>", unsafe_allow_html=True)
+
+    # 유지 뉴스
+    with st.expander("✅ 유지 뉴스"):
+        for news in final_state["retained_news"]:
+            st.markdown(f"<div class='excluded-news'>[{news['index']}] {news['title']}<br/>└ {news['reason']}</div>", unsafe_allow_html=True)
+
+    # 4단계: 그룹핑 결과 표시
+    st.markdown("<div class='subtitle'>🔍 4단계: 뉴스 그룹핑 결과</div>", unsafe_allow_html=True)
+
+    with st.expander("📋 그룹핑 결과 보기"):
+        for group in final_state["grouped_news"]:
+            st.markdown(f"""
+            <div class="analysis-section">
+                <h4>그룹 {group['indices']}</h4>
+                <p>선택된 기사: {group['selected_index']}</p>
+                <p>선정 이유: {group['reason']}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+    # 5단계: 최종 선택 결과 표시
+    st.markdown("<div class='subtitle'>🔍 5단계: 최종 선택 결과</div>", unsafe_allow_html=True)
+
+    # 재평가 여부 확인 (is_reevaluated 필드 있으면 재평가된 것)
+    was_reevaluated = final_state.get("is_reevaluated", False)
+
+    # 재평가 여부에 따라 메시지와 스타일 변경
+    if was_reevaluated:
+        # 재평가가 수행된 경우 6단계 표시
+        st.warning("5단계에서 선정된 뉴스가 없어 6단계 재평가를 진행했습니다.")
+        st.markdown("<div class='subtitle'>🔍 6단계: 재평가 결과</div>", unsafe_allow_html=True)
+        st.markdown("### 📰 재평가 후 선정된 뉴스")
+        # 재평가 스타일 적용
+        news_style = "border-left: 4px solid #FFA500; background-color: #FFF8DC;"
+        reason_prefix = "<span style=\"color: #FFA500; font-weight: bold;\">재평가 후</span> 선별 이유: "
+    else:
+        # 정상적으로 5단계에서 선정된 경우
+        st.markdown("### 📰 최종 선정된 뉴스")  
+        # 일반 스타일 적용
+        news_style = ""
+        reason_prefix = "선별 이유: "
+
+    # 최종 선정된 뉴스 표시
+    for news in final_state["final_selection"]:
+        # 날짜 형식 변환
+
+        formatted_date = format_date(news)
+
+        url = news.get('url', 'URL 정보 없음')
+        press = news.get('press', '언론사 정보 없음')
+
+        # 뉴스 정보 표시
+        st.markdown(f"""
+            <div class="selected-news" style="{news_style}">
+                <div class="news-title-large">{news['title']} ({formatted_date})</div>
+                <div class="news-url">🔗 <a href="{url}" target="_blank">{url}</a></div>
+                <div class="selection-reason">
+                    • {reason_prefix}{news['reason']}
+                </div>
+                <div class="news-summary">
+                    • 키워드: {', '.join(news['keywords'])} | 관련 계열사: {', '.join(news['affiliates'])} | 언론사: {press}
+                </div>
+            </div>
+        """, unsafe_allow_html=True)
+
+        # 구분선 추가
+        st.markdown("---")
+
+    # 선정되지 않은 뉴스 표시
+    if final_state.get("not_selected_news"):
+        with st.expander("❌ 선정되지 않은 뉴스"):
+            for news in final_state["not_selected_news"]:
+                st.markdown(f"""
+                <div class="not-selected-news">
+                    <div class="news-title">{news['index']}. {news['title']}</div>
+                    <div class="importance-low">💡 중요도: {news['importance']}</div>
+                    <div class="not-selected-reason">❌ 미선정 사유: {news['reason']}</div>
+                </div>
+                """, unsafe_allow_html=True)
+
+    # 디버그 정보
+    with st.expander("디버그 정보"):
+        st.markdown("### 1단계: 제외 판단")
+        st.markdown("#### 시스템 프롬프트")
+        st.text(final_state.get("system_prompt_1", "없음"))
+        st.markdown("#### 사용자 프롬프트")
+        st.text(final_state.get("user_prompt_1", "없음"))
+        st.markdown("#### LLM 응답")
+        st.text(final_state.get("llm_response_1", "없음"))
+
+        st.markdown("### 2단계: 그룹핑")
+        st.markdown("#### 시스템 프롬프트")
+        st.text(final_state.get("system_prompt_2", "없음"))
+        st.markdown("#### 사용자 프롬프트")
+        st.text(final_state.get("user_prompt_2", "없음"))
+        st.markdown("#### LLM 응답")
+        st.text(final_state.get("llm_response_2", "없음"))
+
+        st.markdown("### 3단계: 중요도 평가")
+        st.markdown("#### 시스템 프롬프트")
+        st.text(final_state.get("system_prompt_3", "없음"))
+        st.markdown("#### 사용자 프롬프트")
+        st.text(final_state.get("user_prompt_3", "없음"))
+        st.markdown("#### LLM 응답")
+        st.text(final_state.get("llm_response_3", "없음"))
+
+        # 6단계: 재평가 정보 추가
+        if final_state.get("is_reevaluated", False):
+            st.markdown("### 4단계: 재평가")
+            st.markdown("#### 시스템 프롬프트")
+            # 실제 사용된 재평가 시스템 프롬프트 표시
+            st.text(reevaluation_state.get("system_prompt_3", "없음") if reevaluation_state else "재평가 프롬프트 정보 없음")
+            st.markdown("#### 사용자 프롬프트")
+            st.text(reevaluation_state.get("user_prompt_3", "없음") if reevaluation_state else "재평가 사용자 프롬프트 정보 없음")
+            st.markdown("#### LLM 응답")
+            st.text(reevaluation_state.get("llm_response_3", "없음") if reevaluation_state else "재평가 LLM 응답 정보 없음")
+
+    # 키워드 구분선 추가
+    st.markdown("---")
+
 # 메인 컨텐츠
 if st.button("뉴스 분석 시작", type="primary"):
     # 이메일 미리보기를 위한 전체 내용 저장
@@ -939,524 +1209,180 @@ if st.button("뉴스 분석 시작", type="primary"):
     # 모든 키워드 분석 결과를 저장할 딕셔너리
     all_results = {}
     
-    for i, company in enumerate(selected_companies, 1):
-        with st.spinner(f"'{company}' 관련 뉴스를 수집하고 분석 중입니다..."):
-            # 해당 회사의 연관 키워드 확장 (세션 상태에서 가져옴)
-            company_keywords = st.session_state.company_keyword_map.get(company, [company])
-            
-            # 연관 키워드 표시
-            st.write(f"'{company}' 연관 키워드로 검색 중: {', '.join(company_keywords)}")
-            
-            # 사용자가 수정한 기준을 기본으로 하고, 해당 회사의 추가 특화 기준만 더함
-            base_exclusion = exclusion_criteria
-            base_duplicate = duplicate_handling
-            base_selection = selection_criteria
-            
-            # 해당 회사의 추가 특화 기준만 가져오기 (세션 상태에서)
-            # 세션 상태가 초기화되지 않은 경우를 위한 안전장치
-            if 'company_additional_exclusion_criteria' not in st.session_state:
-                st.session_state.company_additional_exclusion_criteria = COMPANY_ADDITIONAL_EXCLUSION_CRITERIA.copy()
-            if 'company_additional_duplicate_handling' not in st.session_state:
-                st.session_state.company_additional_duplicate_handling = COMPANY_ADDITIONAL_DUPLICATE_HANDLING.copy()
-            if 'company_additional_selection_criteria' not in st.session_state:
-                st.session_state.company_additional_selection_criteria = COMPANY_ADDITIONAL_SELECTION_CRITERIA.copy()
-                
-            company_additional_exclusion = st.session_state.company_additional_exclusion_criteria.get(company, "")
-            company_additional_duplicate = st.session_state.company_additional_duplicate_handling.get(company, "")
-            company_additional_selection = st.session_state.company_additional_selection_criteria.get(company, "")
-            
-            # 사용자 수정 기준 + 해당 회사 특화 기준 결합
-            enhanced_exclusion_criteria = base_exclusion + company_additional_exclusion
-            enhanced_duplicate_handling = base_duplicate + company_additional_duplicate  
-            enhanced_selection_criteria = base_selection + company_additional_selection
-            
-            # initial_state 설정 부분 직전에 valid_press_dict를 딕셔너리로 변환하는 코드 추가
-            # 텍스트 에어리어의 내용을 딕셔너리로 변환
-            valid_press_config = {}
-            try:
-                # 문자열에서 딕셔너리 파싱
-                lines = valid_press_dict.strip().split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and ': ' in line:
-                        press_name, aliases_str = line.split(':', 1)
-                        try:
-                            # 문자열 형태의 리스트를 실제 리스트로 변환
-                            aliases = eval(aliases_str.strip())
-                            valid_press_config[press_name.strip()] = aliases
-                            print(f"[DEBUG] Valid press 파싱 성공: {press_name.strip()} -> {aliases}")
-                        except Exception as e:
-                            print(f"[DEBUG] Valid press 파싱 실패: {line}, 오류: {str(e)}")
-            except Exception as e:
-                print(f"[DEBUG] Valid press 전체 파싱 실패: {str(e)}")
-                # 오류 발생 시 빈 딕셔너리 사용
-                valid_press_config = {}
-            
-            print(f"[DEBUG] 파싱된 valid_press_dict: {valid_press_config}")
-            
-            # 추가 언론사도 파싱
-            additional_press_config = {}
-            try:
-                # 문자열에서 딕셔너리 파싱
-                lines = additional_press_dict.strip().split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and ': ' in line:
-                        press_name, aliases_str = line.split(':', 1)
-                        try:
-                            # 문자열 형태의 리스트를 실제 리스트로 변환
-                            aliases = eval(aliases_str.strip())
-                            additional_press_config[press_name.strip()] = aliases
-                            print(f"[DEBUG] Additional press 파싱 성공: {press_name.strip()} -> {aliases}")
-                        except Exception as e:
-                            print(f"[DEBUG] Additional press 파싱 실패: {line}, 오류: {str(e)}")
-            except Exception as e:
-                print(f"[DEBUG] Additional press 전체 파싱 실패: {str(e)}")
-                # 오류 발생 시 빈 딕셔너리 사용
-                additional_press_config = {}
-            
-            print(f"[DEBUG] 파싱된 additional_press_dict: {additional_press_config}")
-            
-            # 각 키워드별 상태 초기화
-            initial_state = {
-                "news_data": [], 
-                "filtered_news": [], 
-                "analysis": "", 
-                "keyword": company_keywords,  # 회사별 확장 키워드 리스트 전달
-                "model": selected_model,
-                "excluded_news": [],
-                "borderline_news": [],
-                "retained_news": [],
-                "grouped_news": [],
-                "final_selection": [],
-                # 회사별 enhanced 기준들 적용
-                "exclusion_criteria": enhanced_exclusion_criteria,
-                "duplicate_handling": enhanced_duplicate_handling,
-                "selection_criteria": enhanced_selection_criteria,
-                "system_prompt_1": system_prompt_1,
-                "user_prompt_1": "",
-                "llm_response_1": "",
-                "system_prompt_2": system_prompt_2,
-                "user_prompt_2": "",
-                "llm_response_2": "",
-                "system_prompt_3": system_prompt_3,
-                "user_prompt_3": "",
-                "llm_response_3": "",
-                "not_selected_news": [],
-                "original_news_data": [],
-                # 언론사 설정 추가 (파싱된 딕셔너리 사용)
-                "valid_press_dict": valid_press_config,
-                # 추가 언론사 설정 추가
-                "additional_press_dict": additional_press_config,
-                # 날짜 필터 정보 추가
-                "start_datetime": datetime.combine(start_date, start_time, KST),
-                "end_datetime": datetime.combine(end_date, end_time, KST)
-                #"start_datetime": start_datetime,
-                #"end_datetime": end_datetime
-            }
-            
-            
-            print(f"[DEBUG] start_datetime: {datetime.combine(start_date, start_time)}")
-            print(f"[DEBUG] end_datetime: {datetime.combine(end_date, end_time)}")
-            
-            # 1단계: 뉴스 수집
-            st.write("1단계: 뉴스 수집 중...")
-            state_after_collection = collect_news(initial_state)
-            
-            # 2단계: 유효 언론사 필터링
-            st.write("2단계: 유효 언론사 필터링 중...")
-            state_after_press_filter = filter_valid_press(state_after_collection)
-            
-            # 3단계: 제외 판단
-            st.write("3단계: 제외 판단 중...")
-            state_after_exclusion = filter_excluded_news(state_after_press_filter)
-            
-            # 4단계: 그룹핑
-            st.write("4단계: 그룹핑 중...")
-            state_after_grouping = group_and_select_news(state_after_exclusion)
-            
-            # 5단계: 중요도 평가
-            st.write("5단계: 중요도 평가 중...")
-            final_state = evaluate_importance(state_after_grouping)
-
-            # 6단계: 0개 선택 시 재평가 (개선된 코드)
-            if len(final_state["final_selection"]) == 0:
-                st.write("6단계: 선택된 뉴스가 없어 재평가를 시작합니다...")
-                
-                # 추가 언론사 설정 불러오기 (이미 파싱된 딕셔너리 사용)
-                additional_press = additional_press_config
-                
-                # 기존 유효 언론사에 추가 언론사 병합 (딕셔너리 병합)
-                expanded_valid_press_dict = {**valid_press_config, **additional_press}
-                
-                # 추가 언론사로 필터링한 뉴스 저장 (기존 뉴스와 구분)
-                additional_valid_news = []
-                
-                # 확장된 언론사 목록으로 원본 뉴스 재필터링
-                try:
-                    # 현재 필터링된 유효 언론사 뉴스 수집
-                    current_news_data = final_state.get("news_data", [])
-                    
-                    # 원본 뉴스 데이터 가져오기
-                    original_news_data = final_state.get("original_news_data", [])
-                    
-                    if expanded_valid_press_dict:
-                        # 확장된 언론사 목록으로 원본 뉴스 재필터링
-                        for news in original_news_data:
-                            # 이미 필터링된 뉴스는 제외
-                            if any(existing_news.get('url') == news.get('url') for existing_news in current_news_data):
-                                continue
-                                
-                            press = news.get("press", "").lower()
-                            url = news.get("url", "").lower()
-                            
-                            # 추가된 언론사 기준으로만 필터링
-                            is_valid = False
-                            for main_press, aliases in expanded_valid_press_dict.items():
-                                domain = urlparse(url).netloc.lower()
-                                # 더 유연한 매칭 적용
-                                if any(alias.lower() in press or press in alias.lower() for alias in aliases) or \
-                                   any(alias.lower() in domain or domain in alias.lower() for alias in aliases):
-                                    is_valid = True
-                                    break
-                            
-                            if is_valid:
-                                # 새 언론사 필터링된 뉴스임을 표시
-                                additional_valid_news.append(news)
-                    
-                    # 추가 유효 뉴스가 있으면 기존 news_data에 추가
-                    if additional_valid_news:
-                        st.success(f"추가 언론사 기준으로 {len(additional_valid_news)}개의 뉴스가 추가로 필터링되었습니다.")
-                        
-                        # 기존 뉴스 데이터와 병합
-                        combined_news = current_news_data + additional_valid_news
-                        reevaluation_state = final_state.copy()
-                        reevaluation_state["news_data"] = combined_news
-                        
-                        # 추가된 뉴스들에 대한 제외/유지 판단 재실행
-                        reevaluation_state = filter_excluded_news(reevaluation_state)
-                        
-                        # 그룹핑 재실행
-                        reevaluation_state = group_and_select_news(reevaluation_state)
-                    else:
-                        # 추가 뉴스가 없으면 원래 상태 복사
-                        reevaluation_state = final_state.copy()
-                        combined_news = current_news_data
-                except Exception as e:
-                    st.warning(f"추가 언론사 필터링 중 오류 발생: {str(e)}")
-                    reevaluation_state = final_state.copy()
-                    combined_news = final_state.get("news_data", [])
-                
-                # 확장된 유효 언론사 목록 문자열로 변환 (프롬프트용)
-                expanded_valid_press_str = "유효 언론사 목록:\n"
-                for press, aliases in expanded_valid_press_dict.items():
-                    expanded_valid_press_str += f"  * {press}: {aliases}\n"
-                
-                # 재평가 시스템 프롬프트 개선 - 모든 뉴스 데이터 포함
-                reevaluation_system_prompt = f"""
-                당신은 회계법인의 뉴스 분석 전문가입니다. 현재 선정된 뉴스가 없어 재평가가 필요합니다.
-                아래 4가지 방향으로 뉴스를 재검토하세요:
-
-                1. 언론사 필터링 기준 완화:
-                - 기존 유효 언론사 목록 외에도 다음 언론사의 기사를 포함하여 평가합니다:
-                  * 철강금속신문: 산업 전문지로 금속/철강 업계 소식에 특화됨
-                  * 에너지신문: 에너지 산업 전문 매체로 관련 기업 분석에 유용함
-                  * 이코노믹데일리: 경제 전문지로 추가적인 시각 제공
-
-                2. 제외 조건 재평가:
-                - 제외 기준을 유연하게 적용하여, 회계법인의 관점에서 재무적 관점으로 해석 가능한 기사들을 보류로 분류
-                - 특히 기업의 재정 혹은 전략적 변동과 연관된 기사를 보류로 전환
-
-                3. 중복 제거 재평가:
-                - 중복 기사 중에서도 언론사의 신뢰도나 기사 내용을 추가로 고려하여 가능한 경우 추가적으로 선택
-                - 재무적/전략적 관점에서 추가 정보를 제공하는 기사 우선 선택
-
-                4. 중요도 재평가:
-                - 선택 기준을 일부 충족하지 않는 기사일지라도 기업명과 관련된 재정적 또는 전략적 변동에 대해서는 중요도를 '중'으로 평가
-                - 필요하다면 중요도 '하'도 고려하여 최소 2개의 기사를 선정
-
-                [확장된 유효 언론사 목록]
-                {expanded_valid_press_str}
-
-                [기존 제외 기준]
-                {enhanced_exclusion_criteria}
+    # 이번 실행의 LLM 호출 기록 ID (이어서 실행하면 직전 실행 ID를 그대로 사용)
+    run_id = st.session_state.last_run_id if resume_last_run else new_run_id()
+    st.session_state.last_run_id = run_id
+    
+    # 단계별 체크포인트 저장소 (실패한 회사는 다음 실행에서 마지막 완료 단계 다음부터 이어서 실행)
+    checkpointer = None
+    if CHECKPOINT_SETTINGS["enabled"]:
+        from checkpoint_store import get_checkpointer
+        checkpointer = get_checkpointer(CHECKPOINT_SETTINGS["path"], CHECKPOINT_SETTINGS["ttl_days"])
+        if not resume_last_run:
+            checkpointer.prune()
+    
+    # 선택된 모든 회사의 연관 키워드를 중복 없이 한 번씩만 미리 수집
+    company_keyword_lists = {
+        company: st.session_state.company_keyword_map.get(company, [company])
+        for company in selected_companies
+    }
+    with st.spinner("선택된 기업들의 뉴스를 한 번에 수집 중입니다..."):
+        prefetched_news = prefetch_news(
+            company_keyword_lists,
+            max_workers=NEWS_FETCH_SETTINGS["max_workers"],
+            # 검색 기간을 쿼리에 포함하여 기간 내 뉴스만 수집
+            start_datetime=datetime.combine(start_date, start_time, KST),
+            end_datetime=datetime.combine(end_date, end_time, KST)
+        )
+    st.write(f"전체 연관 키워드 {sum(len(kws) for kws in company_keyword_lists.values())}개 중 "
+             f"고유 검색어 {len(prefetched_news)}개를 수집했습니다.")
+    
+    # 언론사 설정 텍스트는 회사별로 반복 파싱하지 않고 한 번만 변환 (내용별로 캐시됨)
+    valid_press_config = parse_press_config(valid_press_dict)
+    additional_press_config = parse_press_config(additional_press_dict)
+    print(f"[DEBUG] 파싱된 valid_press_dict: {dict(valid_press_config)}")
+    print(f"[DEBUG] 파싱된 additional_press_dict: {dict(additional_press_config)}")
+    
+    # 회사별 초기 상태 구성 (세션 상태는 메인 스레드에서만 읽음)
+    company_states = {}
+    for company in selected_companies:
+        # 해당 회사의 연관 키워드 확장 (세션 상태에서 가져옴)
+        company_keywords = st.session_state.company_keyword_map.get(company, [company])
 
-                [기존 중복 처리 기준]
-                {enhanced_duplicate_handling}
+        # 사용자가 수정한 기준을 기본으로 하고, 해당 회사의 추가 특화 기준만 더함
+        base_exclusion = exclusion_criteria
+        base_duplicate = duplicate_handling
+        base_selection = selection_criteria
 
-                [기존 선택 기준]
-                {enhanced_selection_criteria}
+        # 해당 회사의 추가 특화 기준만 가져오기 (세션 상태에서)
+        # 세션 상태가 초기화되지 않은 경우를 위한 안전장치
+        if 'company_additional_exclusion_criteria' not in st.session_state:
+            st.session_state.company_additional_exclusion_criteria = COMPANY_ADDITIONAL_EXCLUSION_CRITERIA.copy()
+        if 'company_additional_duplicate_handling' not in st.session_state:
+            st.session_state.company_additional_duplicate_handling = COMPANY_ADDITIONAL_DUPLICATE_HANDLING.copy()
+        if 'company_additional_selection_criteria' not in st.session_state:
+            st.session_state.company_additional_selection_criteria = COMPANY_ADDITIONAL_SELECTION_CRITERIA.copy()
 
-                [전체 뉴스 목록]
-                """
-                
-                # 모든 뉴스 데이터를 하나의 리스트로 통합 (JSON 형식으로)
-                all_news_json = []
-                for i, news in enumerate(combined_news):
-                    all_news_json.append({
-                        "index": i+1,
-                        "title": news.get('content', '제목 없음'),
-                        "url": news.get('url', ''),
-                        "date": news.get('date', ''),
-                        "press": news.get('press', '')
-                    })
-                
-                # 프롬프트에 통합된 뉴스 목록 추가
-                reevaluation_system_prompt += str(all_news_json)
-                
-                reevaluation_system_prompt += """
-                
-                [분류된 뉴스 목록]
-                - 제외된 뉴스: {[f"제목: {news['title']}, 인덱스: {news['index']}, 사유: {news.get('reason', '')}" for news in reevaluation_state["excluded_news"]]}
-                - 보류 뉴스: {[f"제목: {news['title']}, 인덱스: {news['index']}, 사유: {news.get('reason', '')}" for news in reevaluation_state["borderline_news"]]}
-                - 유지 뉴스: {[f"제목: {news['title']}, 인덱스: {news['index']}, 사유: {news.get('reason', '')}" for news in reevaluation_state["retained_news"]]}
-
-                ⚠️ 매우 중요한 지시사항 ⚠️
-                1. 반드시 최소 2개 이상의 기사를 선정해야 합니다.
-                2. 언론사와 기사 내용을 고려하여 선정 기준을 대폭 완화하세요.
-                3. 원래 '제외'로 분류했던 기사 중에서도 회계법인 관점에서 조금이라도 가치가 있는 내용이 있다면 재검토하세요.
-                4. 어떤 경우에도 2개 미만의 기사를 선정하지 마세요. 이는 절대적인 요구사항입니다.
-                5. 모든 기사가 부적합하다고 판단되더라도 그 중에서 가장 나은 2개는 선정해야 합니다.
-                6. 추가 언론사 목록의 기사들도 동등하게 고려하세요.
-
-                다음 JSON 형식으로 응답해주세요:
-                {
-                    "reevaluated_news": [
-                        {
-                            "index": 1,
-                            "title": "뉴스 제목",
-                            "press": "언론사명",
-                            "date": "발행일자",
-                            "reason": "선정 사유",
-                            "keywords": ["키워드1", "키워드2"],
-                            "affiliates": ["계열사1", "계열사2"],
-                            "importance": "중요도(상/중/하)"
-                        }
-                    ]
-                }
-                """
-                
-                # 재평가 시스템 프롬프트로 업데이트
-                reevaluation_state["system_prompt_3"] = reevaluation_system_prompt
-                
-                # 재평가 실행 (evaluate_importance 함수 재사용)
-                st.write("- 제외/중복/중요도 통합 재평가 중...")
-                reevaluation_result = evaluate_importance(reevaluation_state)
-                
-                # 재평가 결과가 있으면 최종 상태 업데이트
-                if "final_selection" in reevaluation_result and reevaluation_result["final_selection"]:
-                    final_state["final_selection"] = reevaluation_result["final_selection"]
-                    # 재평가 결과임을 표시하기 위한 필드 추가
-                    final_state["is_reevaluated"] = True
-                    st.success(f"재평가 후 {len(final_state['final_selection'])}개의 뉴스가 선택되었습니다.")
-                else:
-                    # 그래도 없으면 오류 메시지만 표시
-                    st.error("재평가 후에도 선정할 수 있는 뉴스가 없습니다.")
-
-            # 키워드별 분석 결과 저장
-            all_results[company] = final_state["final_selection"]
-            
-            # 키워드 구분선 추가
-            st.markdown("---")
-            
-            # 키워드별 섹션 구분
-            st.markdown(f"## 📊 {company} 분석 결과")
-            
-            # 전체 뉴스 표시 (필터링 전)
-            with st.expander(f"📰 '{company}' 관련 전체 뉴스 (필터링 전)"):
-                for i, news in enumerate(final_state.get("original_news_data", []), 1):
-                    date_str = news.get('date', '날짜 정보 없음')
-                    url = news.get('url', 'URL 정보 없음')
-                    press = news.get('press', '알 수 없음')
-                    st.markdown(f"""
-                    <div class="news-card">
-                        <div class="news-title">{i}. {news['content']}</div>
-                        <div class="news-meta">📰 {press}</div>
-                        <div class="news-date">📅 {date_str}</div>
-                        <div class="news-url">🔗 <a href="{url}" target="_blank">{url}</a></div>
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            # 유효 언론사 필터링된 뉴스 표시
-            with st.expander(f"📰 '{company}' 관련 유효 언론사 뉴스"):
-                for i, news in enumerate(final_state["news_data"]):
-                    date_str = news.get('date', '날짜 정보 없음')
-                    url = news.get('url', 'URL 정보 없음')
-                    press = news.get('press', '알 수 없음')
-                    st.markdown(f"""
-                    <div class="news-card">
-                        <div class="news-title">{i+1}. {news['content']}</div>
-                        <div class="news-meta">📰 {press}</div>
-                        <div class="news-date">📅 {date_str}</div>
-                        <div class="news-url">🔗 <a href="{url}" target="_blank">{url}</a></div>
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            # 2단계: 유효 언론사 필터링 결과 표시
-            st.markdown("<div class='subtitle'>🔍 2단계: 유효 언론사 필터링 결과</div>", unsafe_allow_html=True)
-            st.markdown(f"유효 언론사 뉴스: {len(final_state['news_data'])}개")
-            
-            # 3단계: 제외/보류/유지 뉴스 표시
-            st.markdown("<div class='subtitle'>🔍 3단계: 뉴스 분류 결과</div>", unsafe_allow_html=True)
-            
-            # 제외된 뉴스
-            with st.expander("❌ 제외된 뉴스"):
-                for news in final_state["excluded_news"]:
-                    st.markdown(f"<div class='excluded-news'>[{news['index']}] {news['title']}<br/>└ {news['reason']}</div>", unsafe_allow_html=True)
-            
-            # 보류 뉴스
-            with st.expander("⚠️ 보류 뉴스"):
-                for news in final_state["borderline_news"]:
-                    st.markdown(f"<div class='excluded-news'>[{news['index']}] {news['title']}<br/>└ {news['reason']}</div>", unsafe_allow_html=True)
-            
-            # 유지 뉴스
-            with st.expander("✅ 유지 뉴스"):
-                for news in final_state["retained_news"]:
-                    st.markdown(f"<div class='excluded-news'>[{news['index']}] {news['title']}<br/>└ {news['reason']}</div>", unsafe_allow_html=True)
-            
-            # 4단계: 그룹핑 결과 표시
-            st.markdown("<div class='subtitle'>🔍 4단계: 뉴스 그룹핑 결과</div>", unsafe_allow_html=True)
-            
-            with st.expander("📋 그룹핑 결과 보기"):
-                for group in final_state["grouped_news"]:
-                    st.markdown(f"""
-                    <div class="analysis-section">
-                        <h4>그룹 {group['indices']}</h4>
-                        <p>선택된 기사: {group['selected_index']}</p>
-                        <p>선정 이유: {group['reason']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            # 5단계: 최종 선택 결과 표시
-            st.markdown("<div class='subtitle'>🔍 5단계: 최종 선택 결과</div>", unsafe_allow_html=True)
-            
-            # 재평가 여부 확인 (is_reevaluated 필드 있으면 재평가된 것)
-            was_reevaluated = final_state.get("is_reevaluated", False)
-            
-            # 재평가 여부에 따라 메시지와 스타일 변경
-            if was_reevaluated:
-                # 재평가가 수행된 경우 6단계 표시
-                st.warning("5단계에서 선정된 뉴스가 없어 6단계 재평가를 진행했습니다.")
-                st.markdown("<div class='subtitle'>🔍 6단계: 재평가 결과</div>", unsafe_allow_html=True)
-                st.markdown("### 📰 재평가 후 선정된 뉴스")
-                # 재평가 스타일 적용
-                news_style = "border-left: 4px solid #FFA500; background-color: #FFF8DC;"
-                reason_prefix = "<span style=\"color: #FFA500; font-weight: bold;\">재평가 후</span> 선별 이유: "
-            else:
-                # 정상적으로 5단계에서 선정된 경우
-                st.markdown("### 📰 최종 선정된 뉴스")  
-                # 일반 스타일 적용
-                news_style = ""
-                reason_prefix = "선별 이유: "
-            
-            # 최종 선정된 뉴스 표시
-            for news in final_state["final_selection"]:
-                # 날짜 형식 변환
-                
-                date_str = format_date(news.get('date', ''))
-                
-                try:
-                    # YYYY-MM-DD 형식으로 가정
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                    formatted_date = date_obj.strftime('%m/%d')
-                except Exception as e:
-                    try:
-                        # GMT 형식 시도
-                        date_obj = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %Z')
-                        formatted_date = date_obj.strftime('%m/%d')
-                    except Exception as e:
-                        formatted_date = date_str if date_str else '날짜 정보 없음'
-
-                url = news.get('url', 'URL 정보 없음')
-                press = news.get('press', '언론사 정보 없음')
-                
-                # 뉴스 정보 표시
-                st.markdown(f"""
-                    <div class="selected-news" style="{news_style}">
-                        <div class="news-title-large">{news['title']} ({formatted_date})</div>
-                        <div class="news-url">🔗 <a href="{url}" target="_blank">{url}</a></div>
-                        <div class="selection-reason">
-                            • {reason_prefix}{news['reason']}
-                        </div>
-                        <div class="news-summary">
-                            • 키워드: {', '.join(news['keywords'])} | 관련 계열사: {', '.join(news['affiliates'])} | 언론사: {press}
-                        </div>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                # 구분선 추가
-                st.markdown("---")
-            
-            # 선정되지 않은 뉴스 표시
-            if final_state.get("not_selected_news"):
-                with st.expander("❌ 선정되지 않은 뉴스"):
-                    for news in final_state["not_selected_news"]:
-                        st.markdown(f"""
-                        <div class="not-selected-news">
-                            <div class="news-title">{news['index']}. {news['title']}</div>
-                            <div class="importance-low">💡 중요도: {news['importance']}</div>
-                            <div class="not-selected-reason">❌ 미선정 사유: {news['reason']}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-            
-            # 디버그 정보
-            with st.expander("디버그 정보"):
-                st.markdown("### 1단계: 제외 판단")
-                st.markdown("#### 시스템 프롬프트")
-                st.text(final_state.get("system_prompt_1", "없음"))
-                st.markdown("#### 사용자 프롬프트")
-                st.text(final_state.get("user_prompt_1", "없음"))
-                st.markdown("#### LLM 응답")
-                st.text(final_state.get("llm_response_1", "없음"))
-                
-                st.markdown("### 2단계: 그룹핑")
-                st.markdown("#### 시스템 프롬프트")
-                st.text(final_state.get("system_prompt_2", "없음"))
-                st.markdown("#### 사용자 프롬프트")
-                st.text(final_state.get("user_prompt_2", "없음"))
-                st.markdown("#### LLM 응답")
-                st.text(final_state.get("llm_response_2", "없음"))
-                
-                st.markdown("### 3단계: 중요도 평가")
-                st.markdown("#### 시스템 프롬프트")
-                st.text(final_state.get("system_prompt_3", "없음"))
-                st.markdown("#### 사용자 프롬프트")
-                st.text(final_state.get("user_prompt_3", "없음"))
-                st.markdown("#### LLM 응답")
-                st.text(final_state.get("llm_response_3", "없음"))
-                
-                # 6단계: 재평가 정보 추가
-                if final_state.get("is_reevaluated", False):
-                    st.markdown("### 4단계: 재평가")
-                    st.markdown("#### 시스템 프롬프트")
-                    # 실제 사용된 재평가 시스템 프롬프트 표시
-                    st.text(reevaluation_state.get("system_prompt_3", "없음") if 'reevaluation_state' in locals() else "재평가 프롬프트 정보 없음")
-                    st.markdown("#### 사용자 프롬프트")
-                    st.text(reevaluation_state.get("user_prompt_3", "없음") if 'reevaluation_state' in locals() else "재평가 사용자 프롬프트 정보 없음")
-                    st.markdown("#### LLM 응답")
-                    st.text(reevaluation_state.get("llm_response_3", "없음") if 'reevaluation_state' in locals() else "재평가 LLM 응답 정보 없음")
-            
-            # 이메일 내용 추가
-            email_content += f"{i}. {company}\n"
-            for news in final_state["final_selection"]:
-                # 날짜 형식 변환
-                date_str = news.get('date', '')
-                try:
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                    formatted_date = date_obj.strftime('%m/%d')
-                except Exception as e:
-                    try:
-                        date_obj = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %Z')
-                        formatted_date = date_obj.strftime('%m/%d')
-                    except Exception as e:
-                        formatted_date = date_str if date_str else '날짜 정보 없음'
+        company_additional_exclusion = st.session_state.company_additional_exclusion_criteria.get(company, "")
+        company_additional_duplicate = st.session_state.company_additional_duplicate_handling.get(company, "")
+        company_additional_selection = st.session_state.company_additional_selection_criteria.get(company, "")
+
+        # 사용자 수정 기준 + 해당 회사 특화 기준 결합
+        enhanced_exclusion_criteria = base_exclusion + company_additional_exclusion
+        enhanced_duplicate_handling = base_duplicate + company_additional_duplicate  
+        enhanced_selection_criteria = base_selection + company_additional_selection
+
+        # 각 키워드별 상태 초기화 (회사별 enhanced 기준들 적용)
+        initial_state = build_initial_state(
+            company,
+            company_keywords,  # 회사별 확장 키워드 리스트 전달
+            model=selected_model,
+            exclusion_criteria=enhanced_exclusion_criteria,
+            duplicate_handling=enhanced_duplicate_handling,
+            selection_criteria=enhanced_selection_criteria,
+            system_prompts=(system_prompt_1, system_prompt_2, system_prompt_3),
+            valid_press_config=valid_press_config,
+            additional_press_config=additional_press_config,
+            start_datetime=datetime.combine(start_date, start_time, KST),
+            end_datetime=datetime.combine(end_date, end_time, KST),
+            prefetched_news=prefetched_news,  # 회사 간 공유되는 사전 수집 결과
+            fetch_max_workers=NEWS_FETCH_SETTINGS["max_workers"],
+            use_llm_cache=use_llm_cache,
+            use_article_store=use_article_store,
+            run_id=run_id
+        )
+        company_states[company] = (company_keywords, initial_state)
+    
+    print(f"[DEBUG] start_datetime: {datetime.combine(start_date, start_time)}")
+    print(f"[DEBUG] end_datetime: {datetime.combine(end_date, end_time)}")
+    
+    # 회사별 파이프라인을 병렬로 실행하고, 끝나는 순서대로 각자의 영역에 결과 표시
+    company_messages = {company: [] for company in selected_companies}
+    final_states = {}
+    
+    # 스트리밍으로 받은 회사별 항목 ((단계, 응답 키, 인덱스) → 항목, 재시도 응답은 덮어씀)
+    company_stream_items = {company: {} for company in selected_companies}
+    stream_lock = threading.Lock()
+    
+    def make_stream_callback(company):
+        items = company_stream_items[company]
+        def on_item(stage, key, item):
+            # 작업 스레드에서 호출되므로 화면은 메인 스레드가 그리고 여기서는 기록만 함
+            with stream_lock:
+                items[(stage, key, str(item.get("index", item.get("selected_index"))))] = item
+        return on_item
+    
+    def run_company(company):
+        # 작업 스레드에서는 화면에 쓰지 않고 진행/오류 메시지를 기록만 함 (회사별 결과 영역에 표시)
+        messages = company_messages[company]
+        return run_company_pipeline(
+            company_states[company][1],
+            valid_press_config,
+            additional_press_config,
+            notify=lambda level, message: messages.append((level, message)),
+            on_item=make_stream_callback(company) if use_streaming else None,
+            checkpointer=checkpointer
+        )
+    
+    progress_text = st.empty()
+    progress_bar = st.progress(0.0)
+    live_preview = st.empty()
+    with st.spinner(f"{len(selected_companies)}개 기업의 뉴스를 동시에 분석 중입니다..."):
+        with ThreadPoolExecutor(max_workers=max(1, min(company_workers, len(selected_companies)))) as executor:
+            futures = {executor.submit(run_company, company): company for company in selected_companies}
+            pending = set(futures)
+            done = 0
+            while pending:
+                # 일정 간격으로 깨어나 진행 중인 회사의 미리보기를 갱신
+                finished, pending = wait(pending, timeout=STREAMING_SETTINGS["poll_interval"],
+                                         return_when=FIRST_COMPLETED)
+                if use_streaming:
+                    running = {futures[future] for future in pending}
+                    with stream_lock:
+                        preview = format_live_preview({
+                            company: dict(company_stream_items[company])
+                            for company in selected_companies
+                            if company in running and company_stream_items[company]
+                        })
+                    if preview:
+                        live_preview.markdown(preview)
+                    else:
+                        live_preview.empty()
                 
-                url = news.get('url', '')
-                email_content += f"  - {news['title']} ({formatted_date}) {url}\n"
-            email_content += "\n"
+                for future in finished:
+                    company = futures[future]
+                    done += 1
+                    progress_bar.progress(done / len(futures))
+                    progress_text.write(f"분석 완료: {done}/{len(futures)}개 기업 (방금 완료: {company})")
+                    
+                    with st.container():
+                        try:
+                            final_state = future.result()
+                        except Exception as e:
+                            st.error(f"'{company}' 분석 중 오류가 발생했습니다: {str(e)}")
+                            all_results[company] = []
+                            continue
+                        
+                        # 키워드별 분석 결과 저장
+                        final_states[company] = final_state
+                        all_results[company] = final_state["final_selection"]
+                        render_company_result(company, company_states[company][0], final_state, company_messages[company])
+    
+    # 회사/단계별 LLM 사용량 및 처리 시간 요약
+    if TELEMETRY_SETTINGS["enabled"]:
+        render_telemetry_summary(get_run_telemetry(run_id, TELEMETRY_SETTINGS["log_dir"]))
+        close_run(run_id)
+    
+    # 이메일 내용 추가 (선택한 기업 순서대로)
+    for i, company in enumerate(selected_companies, 1):
+        email_content += f"{i}. {company}\n"
+        for news in all_results.get(company, []):
+            # 날짜 형식 변환
+            formatted_date = format_date(news)
             
-            # 키워드 구분선 추가
-            st.markdown("---")
+            url = news.get('url', '')
+            email_content += f"  - {news['title']} ({formatted_date}) {url}\n"
+        email_content += "\n"
 
     # 모든 키워드 분석이 끝난 후 이메일 미리보기 섹션 추가
     st.markdown("<div class='subtitle'>📧 이메일 미리보기</div>", unsafe_allow_html=True)
@@ -1496,16 +1422,7 @@ if st.button("뉴스 분석 시작", type="primary"):
         else:
             for news in news_list:
                 # 날짜 형식 변환
-                date_str = news.get('date', '')
-                try:
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                    formatted_date = date_obj.strftime('%m/%d')
-                except Exception as e:
-                    try:
-                        date_obj = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %Z')
-                        formatted_date = date_obj.strftime('%m/%d')
-                    except Exception as e:
-                        formatted_date = date_str if date_str else '날짜 정보 없음'
+                formatted_date = format_date(news)
                 
                 url = news.get('url', '')
                 title = news.get('title', '')
@@ -0,0 +1,68 @@
+from typing import Dict, Iterable, Optional
+
+
+class ArticleRegistry:
+    """
+    한 회사 분석 실행의 기사를 original_index와 URL로 바로 찾을 수 있게 하는 색인입니다.
+
+    단계마다 news_data를 처음부터 훑는 대신 이 색인으로 상수 시간에 조회합니다.
+    같은 키의 기사가 여러 번 추가되면 먼저 추가된 기사를 유지합니다.
+    """
+
+    def __init__(self, articles: Iterable[dict] = ()):
+        self.by_index: Dict[int, dict] = {}
+        self.by_url: Dict[str, dict] = {}
+        # 색인을 만든 원본 리스트와 그 길이 (state에 보관한 색인이 최신인지 확인용)
+        self.source = None
+        self.source_size = 0
+        for article in articles:
+            self.add(article)
+
+    def add(self, article: dict):
+        """기사를 색인에 추가합니다."""
+        index = article.get("original_index")
+        if index is not None:
+            self.by_index.setdefault(index, article)
+        url = article.get("url")
+        if url:
+            self.by_url.setdefault(url, article)
+
+    def get(self, index) -> Optional[dict]:
+        """original_index로 기사를 찾습니다. (LLM이 문자열로 돌려준 인덱스도 허용)"""
+        article = self.by_index.get(index)
+        if article is None and isinstance(index, str):
+            try:
+                article = self.by_index.get(int(index))
+            except ValueError:
+                return None
+        return article
+
+    def get_by_url(self, url: str) -> Optional[dict]:
+        """URL로 기사를 찾습니다."""
+        return self.by_url.get(url)
+
+    def has_url(self, url: str) -> bool:
+        return url in self.by_url
+
+    def __contains__(self, index) -> bool:
+        return self.get(index) is not None
+
+    def __len__(self) -> int:
+        return len(self.by_index)
+
+
+def get_article_registry(state: dict) -> ArticleRegistry:
+    """
+    state["news_data"]의 기사 색인을 반환합니다.
+
+    만든 색인은 state["article_registry"]에 보관해 다음 단계에서 재사용하고,
+    news_data가 다른 리스트로 바뀌었거나 길이가 달라졌으면 새로 만듭니다.
+    """
+    news_data = state.get("news_data", [])
+    registry = state.get("article_registry")
+    if registry is None or registry.source is not news_data or registry.source_size != len(news_data):
+        registry = ArticleRegistry(news_data)
+        registry.source = news_data
+        registry.source_size = len(news_data)
+        state["article_registry"] = registry
+    return registry
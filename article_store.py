@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from date_utils import news_published_at
+
+
+def url_hash(url: str) -> str:
+    """기사 URL의 해시 (저장소의 기사 식별자)"""
+    return hashlib.sha1((url or "").strip().encode("utf-8")).hexdigest()
+
+
+def make_criteria_hash(*parts) -> str:
+    """판단 결과를 재사용할 수 있는 조건(프롬프트, 기준, 모델 등)의 해시"""
+    payload = json.dumps([str(part) for part in parts], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArticleStore:
+    """
+    회사별로 분석한 기사와 단계별 판단 결과를 SQLite 파일에 보관하는 저장소입니다.
+
+    판단 결과는 (기사 URL 해시, 회사, 단계, 기준 해시)별로 저장되므로, 기간이 겹치는 다음 실행에서
+    같은 기준으로 이미 판단한 기사는 LLM에 다시 보내지 않고 저장된 판단을 사용할 수 있습니다.
+    기준(프롬프트/제외·선택 기준/모델)이 바뀌면 기준 해시가 달라져 새로 판단합니다.
+    """
+
+    def __init__(self, path: str = ".cache/article_store.sqlite", verdict_ttl_days: int = 14):
+        """
+        Args:
+            path (str): SQLite 파일 경로 (기본값: .cache/article_store.sqlite)
+            verdict_ttl_days (int): 저장된 판단을 재사용할 수 있는 기간(일) (기본값: 14)
+        """
+        self.path = path
+        self.verdict_ttl_days = verdict_ttl_days
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS articles (
+                    url_hash TEXT NOT NULL,
+                    company TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    press TEXT,
+                    published_at REAL,
+                    first_seen_at REAL NOT NULL,
+                    last_seen_at REAL NOT NULL,
+                    PRIMARY KEY (url_hash, company)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS verdicts (
+                    url_hash TEXT NOT NULL,
+                    company TEXT NOT NULL,
+                    stage INTEGER NOT NULL,
+                    criteria_hash TEXT NOT NULL,
+                    verdict TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (url_hash, company, stage, criteria_hash)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_url_hash ON articles (url_hash)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_company ON articles (company)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles (published_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_verdicts_created_at ON verdicts (created_at)")
+
+    def record_articles(self, company: str, news_list: Iterable[dict]):
+        """분석한 기사를 저장합니다. (이미 있으면 마지막으로 본 시각만 갱신)"""
+        now = time.time()
+        rows = []
+        for news in news_list:
+            url = news.get("url")
+            if not url:
+                continue
+            published_at = news_published_at(news)
+            rows.append((
+                url_hash(url), company, url, news.get("content", news.get("title", "")), news.get("press", ""),
+                published_at.timestamp() if published_at else None, now, now
+            ))
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO articles (url_hash, company, url, title, press, published_at, first_seen_at, last_seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url_hash, company) DO UPDATE SET last_seen_at = excluded.last_seen_at",
+                rows
+            )
+
+    def get_verdicts(self, company: str, stage: int, criteria_hash: str,
+                     urls: Iterable[str]) -> Dict[str, dict]:
+        """
+        같은 기준으로 저장된 판단을 {URL: 판단 dict}로 반환합니다. (없거나 재사용 기간이 지난 URL은 제외)
+        """
+        hashes = {url_hash(url): url for url in urls if url}
+        keys = list(hashes)
+        oldest = time.time() - self.verdict_ttl_days * 86400
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._conn.execute(
+                    "SELECT url_hash, verdict FROM verdicts "
+                    "WHERE company = ? AND stage = ? AND criteria_hash = ? AND created_at >= ? "
+                    f"AND url_hash IN ({','.join('?' * len(batch))})",
+                    [company, stage, criteria_hash, oldest] + batch
+                ).fetchall()
+                for key, verdict in rows:
+                    found[hashes[key]] = json.loads(verdict)
+            self.stats["hits"] += len(found)
+            self.stats["misses"] += len(keys) - len(found)
+        return found
+
+    def put_verdicts(self, company: str, stage: int, criteria_hash: str, verdicts: Dict[str, dict]):
+        """{URL: 판단 dict}를 저장합니다. (같은 기준의 기존 판단은 교체)"""
+        now = time.time()
+        rows = [
+            (url_hash(url), company, stage, criteria_hash, json.dumps(verdict, ensure_ascii=False, default=str), now)
+            for url, verdict in verdicts.items() if url
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO verdicts (url_hash, company, stage, criteria_hash, verdict, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def prune(self, older_than_days: Optional[int] = None):
+        """재사용 기간이 지난 판단을 삭제합니다."""
+        days = older_than_days if older_than_days is not None else self.verdict_ttl_days
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM verdicts WHERE created_at < ?", (time.time() - days * 86400,))
+
+
+_article_stores = {}
+_article_stores_lock = threading.Lock()
+
+
+def get_article_store(path: str = ".cache/article_store.sqlite", verdict_ttl_days: int = 14) -> ArticleStore:
+    """경로별로 하나의 ArticleStore를 공유하여 반환합니다."""
+    with _article_stores_lock:
+        store = _article_stores.get(path)
+        if store is None:
+            store = ArticleStore(path, verdict_ttl_days)
+            _article_stores[path] = store
+        else:
+            store.verdict_ttl_days = verdict_ttl_days
+        return store
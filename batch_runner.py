@@ -0,0 +1,466 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Batch Runner
+------------
+Streamlit 화면 없이 활성화된 카테고리(ACTIVE_CATEGORIES)의 모든 회사를 분석하고
+카테고리별 결과 파일(JSON, Markdown)과 실행 요약(summary.json)을 저장하는 배치 실행 진입점입니다.
+
+예시:
+    python batch_runner.py                               # 활성화된 모든 카테고리
+    python batch_runner.py --categories Anchor --workers 2
+    python batch_runner.py --mode process --processes 3    # 회사를 3개 작업 프로세스에 나눠 실행
+    python batch_runner.py --resume 20250101_080000_1a2b3c  # 실패한 실행을 마지막 완료 단계부터 이어서 실행
+    python batch_runner.py --companies 삼성 SK --start "2025-01-01 08:00" --end "2025-01-02 08:00"
+
+종료 코드: 0 = 모든 회사 분석 성공, 1 = 일부 회사 분석 실패, 2 = 잘못된 인자
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import dotenv
+
+from config import (
+    COMPANY_CATEGORIES,
+    ACTIVE_CATEGORIES,
+    COMPANY_KEYWORD_MAP,
+    TRUSTED_PRESS_ALIASES,
+    ADDITIONAL_PRESS_ALIASES,
+    SYSTEM_PROMPT_1,
+    SYSTEM_PROMPT_2,
+    SYSTEM_PROMPT_3,
+    EXCLUSION_CRITERIA,
+    DUPLICATE_HANDLING,
+    SELECTION_CRITERIA,
+    COMPANY_ADDITIONAL_EXCLUSION_CRITERIA,
+    COMPANY_ADDITIONAL_DUPLICATE_HANDLING,
+    COMPANY_ADDITIONAL_SELECTION_CRITERIA,
+    GPT_MODELS,
+    DEFAULT_GPT_MODEL,
+    NEWS_FETCH_SETTINGS,
+    PIPELINE_SETTINGS,
+    BATCH_SETTINGS,
+    LLM_CACHE_SETTINGS,
+    ARTICLE_STORE_SETTINGS,
+    TELEMETRY_SETTINGS,
+    CHECKPOINT_SETTINGS,
+)
+from date_utils import KST, format_news_date
+from news_ai import prefetch_news
+from pipeline import build_initial_state, run_company_pipeline
+from press_matcher import PressConfig, get_press_matcher
+from reporting import ConsoleReporter
+from telemetry import new_run_id, get_run_telemetry, close_run
+
+
+def parse_datetime(value: str) -> datetime:
+    """'YYYY-MM-DD HH:MM' 또는 'YYYY-MM-DD' 형식의 한국 시간 문자열을 datetime으로 변환합니다."""
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=KST)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"날짜 형식이 올바르지 않습니다 (YYYY-MM-DD [HH:MM]): {value}")
+
+
+def default_date_range(now: Optional[datetime] = None):
+    """앱과 같은 기본 검색 기간 (전날 08:00 ~ 오늘 08:00, 한국 시간)"""
+    now = now or datetime.now(KST)
+    eight = datetime.strptime("08:00", "%H:%M").time()
+    start = datetime.combine((now - timedelta(days=1)).date(), eight, KST)
+    end = datetime.combine(now.date(), eight, KST)
+    return start, end
+
+
+def select_companies(categories: Optional[List[str]] = None,
+                     companies: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """
+    분석할 {카테고리: [회사, ...]}를 반환합니다.
+
+    categories를 지정하지 않으면 ACTIVE_CATEGORIES에서 활성화된 카테고리를 사용하고,
+    companies를 지정하면 해당 카테고리 중 지정한 회사만 남깁니다.
+    """
+    if categories is None:
+        categories = [category for category in COMPANY_CATEGORIES if ACTIVE_CATEGORIES.get(category, False)]
+    selected = {}
+    for category in categories:
+        members = COMPANY_CATEGORIES[category]
+        if companies is not None:
+            members = [company for company in members if company in companies]
+        if members:
+            selected[category] = list(members)
+    return selected
+
+
+def build_company_state(company: str, context: dict) -> dict:
+    """기본 기준에 회사별 추가 기준을 결합해 한 회사의 초기 상태를 만듭니다."""
+    args = context["args"]
+    return build_initial_state(
+        company,
+        context["keyword_map"].get(company, [company]),
+        model=args.model,
+        exclusion_criteria=EXCLUSION_CRITERIA + COMPANY_ADDITIONAL_EXCLUSION_CRITERIA.get(company, ""),
+        duplicate_handling=DUPLICATE_HANDLING + COMPANY_ADDITIONAL_DUPLICATE_HANDLING.get(company, ""),
+        selection_criteria=SELECTION_CRITERIA + COMPANY_ADDITIONAL_SELECTION_CRITERIA.get(company, ""),
+        system_prompts=(SYSTEM_PROMPT_1, SYSTEM_PROMPT_2, SYSTEM_PROMPT_3),
+        valid_press_config=context["valid_press_config"],
+        additional_press_config=context["additional_press_config"],
+        start_datetime=args.start,
+        end_datetime=args.end,
+        prefetched_news=context["prefetched_news"],
+        fetch_max_workers=NEWS_FETCH_SETTINGS["max_workers"],
+        use_llm_cache=args.use_llm_cache,
+        use_article_store=args.use_article_store,
+        run_id=context["run_id"]
+    )
+
+
+def summarize_news(news: dict) -> dict:
+    """결과 파일에 저장할 선정 뉴스 항목"""
+    return {
+        "title": news.get("title", ""),
+        "url": news.get("url", ""),
+        "press": news.get("press", ""),
+        "date": format_news_date(news.get("published_at") or news.get("date", "")),
+        "importance": news.get("importance", ""),
+        "reason": news.get("reason", ""),
+        "keywords": news.get("keywords", []),
+        "affiliates": news.get("affiliates", []),
+    }
+
+
+def format_markdown(category: str, companies: List[str], results: Dict[str, dict], args) -> str:
+    """카테고리 결과를 이메일 본문과 같은 순서의 Markdown으로 변환합니다."""
+    lines = [
+        f"# [Client Intelligence] {category}",
+        "",
+        f"- 검색 기간: {args.start:%Y-%m-%d %H:%M} ~ {args.end:%Y-%m-%d %H:%M} (KST)",
+        f"- 모델: {args.model}",
+        "",
+    ]
+    for i, company in enumerate(companies, 1):
+        result = results[company]
+        lines.append(f"## {i}. {company}")
+        if result["status"] != "ok":
+            lines.append(f"- 분석 실패: {result['error']}")
+        elif not result["final_selection"]:
+            lines.append("- 선정된 뉴스가 없습니다.")
+        for news in result["final_selection"]:
+            lines.append(f"- [{news['title']}]({news['url']}) ({news['date']}) {news['press']}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_category_outputs(output_dir: str, selected: Dict[str, List[str]], results: Dict[str, dict],
+                           args, run_id: str) -> List[str]:
+    """카테고리별 JSON/Markdown 결과 파일을 output_dir/run_id 아래에 저장하고 경로 목록을 반환합니다."""
+    run_dir = os.path.join(output_dir, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+    paths = []
+    for category, companies in selected.items():
+        payload = {
+            "run_id": run_id,
+            "category": category,
+            "start_datetime": args.start.isoformat(),
+            "end_datetime": args.end.isoformat(),
+            "model": args.model,
+            "companies": {company: results[company] for company in companies},
+        }
+        json_path = os.path.join(run_dir, f"{category}.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+        md_path = os.path.join(run_dir, f"{category}.md")
+        with open(md_path, "w", encoding="utf-8") as f:
+            f.write(format_markdown(category, companies, results, args))
+        paths.extend([json_path, md_path])
+    return paths
+
+
+def get_run_checkpointer(context: dict):
+    """체크포인트를 사용하도록 설정되어 있으면 공유 checkpointer를, 아니면 None을 반환합니다."""
+    if not context["args"].use_checkpoint:
+        return None
+    # LangGraph 체크포인트 모듈은 사용할 때만 불러옴
+    from checkpoint_store import get_checkpointer
+    return get_checkpointer(CHECKPOINT_SETTINGS["path"], CHECKPOINT_SETTINGS["ttl_days"])
+
+
+def run_company(company: str, context: dict) -> dict:
+    """
+    한 회사를 분석하고 결과 파일에 필요한 내용만 담은 간단한 결과를 반환합니다.
+
+    전체 상태(뉴스 목록, 프롬프트, 응답 등)는 작업 프로세스에서 부모 프로세스로 보내지 않습니다.
+    파이프라인이 예외를 내거나 재시도 후에도 결과를 얻지 못한 단계(stage_errors)가 있으면 status는 "error"입니다.
+    """
+    started = time.perf_counter()
+    valid_press_config = context["valid_press_config"]
+    additional_press_config = context["additional_press_config"]
+    initial_state = build_company_state(company, context)
+    # 진행/오류 메시지를 회사명과 함께 콘솔에 출력
+    initial_state["reporter"] = ConsoleReporter(prefix=f"{company}: ")
+    try:
+        final_state = run_company_pipeline(initial_state, valid_press_config, additional_press_config,
+                                           checkpointer=get_run_checkpointer(context))
+    except Exception as e:
+        print(f"[ERROR] '{company}' 분석 중 오류가 발생했습니다: {str(e)}")
+        return {"status": "error", "error": str(e), "final_selection": [],
+                "elapsed": round(time.perf_counter() - started, 3)}
+    selection = [summarize_news(news) for news in final_state.get("final_selection", [])]
+    # 단계 함수가 처리한 오류(API 키 오류, LLM 장애 등)도 실패로 판정 (받은 결과는 그대로 남김)
+    stage_errors = final_state.get("stage_errors") or []
+    if stage_errors:
+        print(f"[ERROR] '{company}' 분석 중 실패한 단계가 있습니다: {'; '.join(stage_errors)}")
+        return {"status": "error", "error": "; ".join(stage_errors), "final_selection": selection,
+                "elapsed": round(time.perf_counter() - started, 3)}
+    return {"status": "ok", "error": None, "final_selection": selection,
+            "elapsed": round(time.perf_counter() - started, 3)}
+
+
+def run_companies(companies: List[str], context: dict, workers: int) -> Dict[str, dict]:
+    """회사들을 스레드 풀에서 동시에 분석하고 {회사: 결과}를 반환합니다."""
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(companies)))) as executor:
+        futures = {executor.submit(run_company, company, context): company for company in companies}
+        for future in as_completed(futures):
+            company = futures[future]
+            results[company] = future.result()
+            print(f"[INFO] 분석 완료: {company} ({len(results[company]['final_selection'])}개 선정, "
+                  f"{results[company]['elapsed']:.1f}초)")
+    return results
+
+
+def telemetry_totals(run_id: str) -> dict:
+    """현재 프로세스에서 기록한 LLM 호출 수와 토큰 합계 (기록을 메모리에서 정리)"""
+    if not TELEMETRY_SETTINGS["enabled"]:
+        return {"llm_calls": 0, "tokens": 0}
+    run = get_run_telemetry(run_id, TELEMETRY_SETTINGS["log_dir"])
+    totals = {
+        "llm_calls": len(run.records),
+        "tokens": sum(total["prompt_tokens"] + total["completion_tokens"] for total in run.summary()),
+    }
+    close_run(run_id)
+    return totals
+
+
+def worker_timing(worker: str, companies: List[str], started: float, cpu_started: float, run_id: str) -> dict:
+    """작업자(스레드 모드의 메인 프로세스 또는 작업 프로세스) 하나의 처리 시간 요약"""
+    return {
+        "worker": worker,
+        "companies": companies,
+        "wall_time": round(time.perf_counter() - started, 3),
+        "cpu_time": round(time.process_time() - cpu_started, 3),
+        **telemetry_totals(run_id),
+    }
+
+
+# 작업 프로세스에서 공유하는 읽기 전용 데이터 (프로세스마다 initializer에서 한 번만 전달받음)
+_worker_context = None
+
+
+def _init_worker(context: dict):
+    """작업 프로세스 초기화: 공유 데이터를 보관하고 언론사 매처를 미리 컴파일합니다."""
+    global _worker_context
+    _worker_context = context
+    # 전체 LLM 동시 호출 수 상한을 프로세스 수로 나눠 rate limit 보호 유지
+    PIPELINE_SETTINGS["llm_concurrency"] = max(1, PIPELINE_SETTINGS["llm_concurrency"] // context["processes"])
+    get_press_matcher(context["valid_press_config"])
+    get_press_matcher({**context["valid_press_config"], **context["additional_press_config"]})
+
+
+def _run_shard(companies: List[str]):
+    """작업 프로세스에서 맡은 회사들을 스레드 풀로 분석하고 (결과, 처리 시간 요약)을 반환합니다."""
+    context = _worker_context
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    results = run_companies(companies, context, context["args"].workers)
+    return results, worker_timing(f"pid {os.getpid()}", companies, started, cpu_started, context["run_id"])
+
+
+def shard_companies(companies: List[str], shards: int) -> List[List[str]]:
+    """회사들을 순서대로 번갈아 나눠 카테고리별 회사가 여러 프로세스에 고르게 퍼지도록 합니다."""
+    return [companies[i::shards] for i in range(shards) if companies[i::shards]]
+
+
+def run_process_pool(companies: List[str], context: dict):
+    """회사들을 작업 프로세스에 나눠 분석하고 ({회사: 결과}, [작업자별 처리 시간])을 반환합니다."""
+    shards = shard_companies(companies, context["processes"])
+    results = {}
+    workers = []
+    # 부모 프로세스의 SQLite 연결(캐시, 체크포인트)을 물려받지 않도록 spawn으로 작업 프로세스 시작
+    with ProcessPoolExecutor(max_workers=len(shards), initializer=_init_worker,
+                             initargs=(dict(context, processes=len(shards)),),
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {executor.submit(_run_shard, shard): shard for shard in shards}
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                shard_results, timing = future.result()
+            except Exception as e:
+                # 작업 프로세스가 비정상 종료된 경우 해당 회사들을 실패로 기록
+                print(f"[ERROR] 작업 프로세스 오류 ({', '.join(shard)}): {str(e)}")
+                shard_results = {company: {"status": "error", "error": str(e), "final_selection": [], "elapsed": 0.0}
+                                 for company in shard}
+                timing = {"worker": "failed", "companies": shard, "wall_time": 0.0, "cpu_time": 0.0,
+                          "llm_calls": 0, "tokens": 0}
+            results.update(shard_results)
+            workers.append(timing)
+    return results, workers
+
+
+def write_run_summary(output_dir: str, run_id: str, summary: dict) -> str:
+    """실행 요약(모드, 소요 시간, 작업자별 처리 시간, 실패 기업)을 output_dir/run_id/summary.json에 저장합니다."""
+    path = os.path.join(output_dir, run_id, "summary.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def run_batch(args) -> int:
+    """선택된 회사들을 스레드 또는 프로세스 풀에서 분석하고 결과 파일을 저장한 뒤 종료 코드를 반환합니다."""
+    selected = select_companies(args.categories, args.companies)
+    # 여러 카테고리에 속한 회사는 한 번만 분석
+    companies = list(dict.fromkeys(company for members in selected.values() for company in members))
+    if not companies:
+        print("[ERROR] 분석할 회사가 없습니다. (카테고리 활성화 설정 또는 인자를 확인하세요)")
+        return 2
+
+    # 이어서 실행하면 같은 실행 ID를 사용해 회사별 체크포인트의 마지막 완료 단계 다음부터 실행
+    run_id = args.resume or new_run_id()
+    print(f"[INFO] 실행 ID: {run_id} ({args.mode} 모드{', 이어서 실행' if args.resume else ''})")
+    print(f"[INFO] 분석 대상: {len(companies)}개 기업 ({', '.join(selected)})")
+    print(f"[INFO] 검색 기간: {args.start:%Y-%m-%d %H:%M} ~ {args.end:%Y-%m-%d %H:%M} (KST)")
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+
+    keyword_map = {company: COMPANY_KEYWORD_MAP.get(company, [company]) for company in companies}
+    fetch_companies = companies
+    if args.use_checkpoint:
+        from checkpoint_store import get_checkpointer, make_thread_id
+        checkpointer = get_checkpointer(CHECKPOINT_SETTINGS["path"], CHECKPOINT_SETTINGS["ttl_days"])
+        checkpointer.prune()
+        if args.resume:
+            # 체크포인트가 있는 회사는 저장된 상태에서 이어가므로 뉴스를 다시 수집하지 않음
+            fetch_companies = [company for company in companies
+                               if not checkpointer.has_thread(make_thread_id(run_id, company))]
+            print(f"[INFO] 체크포인트에서 이어서 실행할 기업 {len(companies) - len(fetch_companies)}개")
+
+    # 모든 회사의 검색어를 중복 없이 한 번만 수집
+    prefetched_news = prefetch_news(
+        {company: keyword_map[company] for company in fetch_companies},
+        max_workers=NEWS_FETCH_SETTINGS["max_workers"],
+        start_datetime=args.start,
+        end_datetime=args.end
+    )
+    print(f"[INFO] 고유 검색어 {len(prefetched_news)}개를 수집했습니다.")
+
+    # 모든 회사(작업 프로세스 포함)가 읽기 전용으로 공유하는 데이터
+    context = {
+        "args": args,
+        "run_id": run_id,
+        "keyword_map": keyword_map,
+        "prefetched_news": prefetched_news,
+        "valid_press_config": PressConfig(TRUSTED_PRESS_ALIASES),
+        "additional_press_config": PressConfig(ADDITIONAL_PRESS_ALIASES),
+        "processes": args.processes,
+    }
+
+    if args.mode == "process":
+        results, workers = run_process_pool(companies, context)
+    else:
+        results = run_companies(companies, context, args.workers)
+        workers = []
+    # 메인 프로세스의 처리 시간 (뉴스 수집, 스레드 모드 분석, 결과 취합 포함)
+    workers.insert(0, worker_timing("main", companies if args.mode != "process" else [],
+                                    started, cpu_started, run_id))
+    elapsed = time.perf_counter() - started
+
+    for path in write_category_outputs(args.output_dir, selected, results, args, run_id):
+        print(f"[INFO] 결과 저장: {path}")
+
+    failed = [company for company in companies if results[company]["status"] != "ok"]
+    summary_path = write_run_summary(args.output_dir, run_id, {
+        "run_id": run_id,
+        "mode": args.mode,
+        "elapsed": round(elapsed, 3),
+        "companies": len(companies),
+        "failed": failed,
+        "workers": workers,
+        "company_elapsed": {company: results[company]["elapsed"] for company in companies},
+    })
+
+    for worker in workers:
+        print(f"[INFO] 작업자 {worker['worker']}: 기업 {len(worker['companies'])}개, "
+              f"소요 {worker['wall_time']:.1f}초, CPU {worker['cpu_time']:.1f}초, "
+              f"LLM 호출 {worker['llm_calls']}회, 토큰 {worker['tokens']}개")
+    print(f"[INFO] 실행 요약 저장: {summary_path}")
+    print(f"[INFO] 전체 소요 시간 {elapsed:.1f}초, 성공 {len(companies) - len(failed)}개, 실패 {len(failed)}개")
+    if failed:
+        print(f"[ERROR] 분석 실패 기업: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="활성화된 카테고리의 회사 뉴스를 Streamlit 없이 분석합니다.")
+    parser.add_argument("--categories", nargs="+", choices=list(COMPANY_CATEGORIES),
+                        help="분석할 카테고리 (기본값: ACTIVE_CATEGORIES에서 활성화된 카테고리)")
+    parser.add_argument("--companies", nargs="+", help="선택한 카테고리 중 분석할 회사만 지정")
+    parser.add_argument("--workers", type=int, default=PIPELINE_SETTINGS["company_workers"],
+                        help="동시에 분석할 기업 수 (process 모드에서는 작업 프로세스당)")
+    parser.add_argument("--mode", choices=["thread", "process"], default=BATCH_SETTINGS["mode"],
+                        help="thread: 한 프로세스에서 스레드로 실행, process: 회사를 여러 작업 프로세스에 나눠 실행")
+    parser.add_argument("--processes", type=int, default=BATCH_SETTINGS["processes"],
+                        help="process 모드의 작업 프로세스 수")
+    parser.add_argument("--model", default=DEFAULT_GPT_MODEL, choices=list(GPT_MODELS), help="분석에 사용할 GPT 모델")
+    parser.add_argument("--output-dir", default=BATCH_SETTINGS["output_dir"], help="결과 파일 폴더 (output-dir/<실행 ID>/<카테고리>.json|md)")
+    parser.add_argument("--start", type=parse_datetime, help="검색 시작 (기본값: 전날 08:00, 한국 시간)")
+    parser.add_argument("--end", type=parse_datetime, help="검색 종료 (기본값: 오늘 08:00, 한국 시간)")
+    parser.add_argument("--no-llm-cache", dest="use_llm_cache", action="store_false",
+                        default=LLM_CACHE_SETTINGS["enabled"], help="LLM 응답 캐시를 사용하지 않음")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="실패한 실행을 같은 실행 ID로 다시 실행 (회사별로 마지막 완료 단계 다음부터 이어서 실행)")
+    parser.add_argument("--no-checkpoint", dest="use_checkpoint", action="store_false",
+                        default=CHECKPOINT_SETTINGS["enabled"], help="단계별 체크포인트를 저장하지 않음")
+    parser.add_argument("--no-article-store", dest="use_article_store", action="store_false",
+                        default=ARTICLE_STORE_SETTINGS["enabled"], help="저장된 기사 판단을 재사용하지 않음")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # 환경 변수(.env) 로드 (OPENAI_API_KEY 등)
+    dotenv.load_dotenv(override=True)
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    default_start, default_end = default_date_range()
+    args.start = args.start or default_start
+    args.end = args.end or default_end
+    if args.start >= args.end:
+        parser.error("검색 시작 시각은 종료 시각보다 앞서야 합니다.")
+    if args.workers < 1 or args.processes < 1:
+        parser.error("--workers와 --processes는 1 이상이어야 합니다.")
+    if args.resume and not args.use_checkpoint:
+        parser.error("--resume은 체크포인트를 사용할 때만 지정할 수 있습니다.")
+    if args.companies:
+        known = {company for members in COMPANY_CATEGORIES.values() for company in members}
+        unknown = [company for company in args.companies if company not in known]
+        if unknown:
+            parser.error(f"COMPANY_CATEGORIES에 없는 회사입니다: {', '.join(unknown)}")
+
+    return run_batch(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -138,6 +138,13 @@ DUPLICATE_HANDLING = """중복 뉴스가 존재할 경우 다음 우선순위로
    - 더 구체적이고 명확한 제목의 기사 우선
    - 핵심 키워드가 포함된 제목 우선"""
 
+# DUPLICATE_HANDLING의 언론사 우선순위 (로컬 중복 묶음의 대표 기사 선택에 사용, 숫자가 작을수록 우선)
+PRESS_PRIORITY = {
+    "한국경제": 1, "매일경제": 1, "조선비즈": 1, "파이낸셜뉴스": 1,
+    "조선일보": 2, "중앙일보": 2, "동아일보": 2,
+    "연합뉴스": 3, "뉴스핌": 3, "뉴시스": 3,
+}
+
 SELECTION_CRITERIA = """다음 기준에 해당하는 뉴스가 있다면 반드시 선택해야 합니다:
 
 1. 재무/실적 관련 정보 (최우선 순위)
@@ -176,6 +183,117 @@ GPT_MODELS = {
     "gpt-3.5-turbo": "아주 저렴, 간단한 분류 작업에 적당"
 }
 
+# 뉴스 수집 설정
+NEWS_FETCH_SETTINGS = {
+    "max_workers": 8  # 키워드별 RSS 피드 동시 요청 수 상한
+}
+
+# 회사별 파이프라인 병렬 실행 설정
+PIPELINE_SETTINGS = {
+    "company_workers": 4,  # 동시에 분석할 기업 수 (사이드바에서 변경 가능)
+    "llm_concurrency": 4,  # 전체 기업을 합쳐 동시에 진행할 LLM 호출 수 상한 (rate limit 보호)
+    "async_llm_concurrency": 64  # 비동기(ainvoke) 실행 시 이벤트 루프당 동시 LLM 호출 수 상한
+}
+
+# RSS 피드 캐시 설정
+FEED_CACHE_SETTINGS = {
+    "enabled": True,
+    "path": ".cache/feed_cache.sqlite",
+    "ttl_seconds": 600,  # 이 시간 안의 재실행은 네트워크 요청 없이 캐시 사용, 이후에는 조건부 요청으로 재검증
+    "max_entries": 2000  # 보관할 최대 피드(쿼리 URL) 수
+}
+
+# LLM 응답 캐시 설정 (모델/프롬프트가 같은 호출은 저장된 응답 재사용)
+LLM_CACHE_SETTINGS = {
+    "enabled": True,
+    "path": ".cache/llm_cache.sqlite",
+    "ttl_seconds": 86400,  # 저장된 응답을 사용할 수 있는 시간(초)
+    "max_entries": 5000  # 보관할 최대 응답 수
+}
+
+# 1단계 제외 판단 청크 설정 (뉴스가 많으면 나누어 동시에 분류한 뒤 병합)
+EXCLUSION_CHUNK_SETTINGS = {
+    "enabled": True,
+    "chunk_token_budget": 1500,  # 청크 하나의 뉴스 목록 토큰 수 상한
+    "max_items_per_chunk": 20  # 프롬프트의 '카테고리별 최대 20개' 제한에 걸려 누락되지 않도록 청크당 뉴스 수 제한
+}
+
+# 2단계 그룹핑 전 로컬 중복 묶음 설정 (제목 문자 n-gram MinHash + LSH)
+NEAR_DUPLICATE_SETTINGS = {
+    "enabled": True,
+    "threshold": 0.85,  # 같은 기사로 묶을 제목 유사도(Jaccard), 숫자나 대비어(상승/하락 등)가 다르면 묶지 않음
+    "candidate_threshold": 0.5,  # 묶지 않은 대표 기사 중 이 유사도 이상인 쌍은 LLM 그룹핑에 중복 후보로 알려줌
+    "ngram": 3,  # 문자 n-gram 길이
+    "num_perm": 64,  # MinHash 해시 함수 수
+    "bands": 16,  # LSH 밴드 수 (num_perm의 약수)
+    "default_press_rank": 4  # PRESS_PRIORITY에 없는 언론사의 순위 (4순위: 기타 언론사)
+}
+
+# 임베딩 기반 의미 중복 묶음 설정 (선택 사항, 표현만 다른 같은 사건의 기사를 그룹핑 전에 묶음)
+EMBEDDING_DEDUP_SETTINGS = {
+    "enabled": False,
+    "provider": "openai",  # "openai" (OpenAI 임베딩 API) 또는 "local" (sentence-transformers 설치 필요)
+    "model": "text-embedding-3-small",
+    "threshold": 0.88,  # 같은 사건으로 묶을 코사인 유사도
+    "cache_path": ".cache/embeddings.sqlite",  # 정규화된 제목별 벡터 캐시
+    "batch_size": 256
+}
+
+# LLM 구조화 응답 설정 (JSON 모드로 요청하고 스키마 검증 실패 시 형식 수정만 다시 요청)
+STRUCTURED_OUTPUT_SETTINGS = {
+    "json_mode": True,  # response_format=json_object 사용 (지원하지 않는 모델/엔드포인트면 False)
+    "max_repair_attempts": 1  # 검증 실패 응답에 대한 형식 수정 요청 횟수 (실패 시 전체 프롬프트 재요청)
+}
+
+# LLM 응답 스트리밍 설정 (응답을 조각 단위로 받아 완성된 항목부터 화면에 미리 표시)
+STREAMING_SETTINGS = {
+    "enabled": True,  # 앱에서 스트리밍 미리보기 기본값
+    "item_keys": ["excluded", "borderline", "retained", "groups", "final_selection", "not_selected"],  # 항목을 꺼낼 응답 키
+    "poll_interval": 0.5  # 앱에서 진행 중인 항목을 다시 그리는 간격(초)
+}
+
+# LLM 호출 기록 설정 (회사/단계별 토큰, 처리 시간, 재시도, 캐시 사용을 실행별 JSONL로 저장)
+TELEMETRY_SETTINGS = {
+    "enabled": True,
+    "log_dir": "logs"  # 실행 로그 폴더 (logs/run_<실행 ID>.jsonl)
+}
+
+# 단계별 모델 설정 (1단계는 저가 모델로 분류하고 불확실한 뉴스만 사이드바에서 선택한 모델로 다시 판단)
+STAGE_MODEL_ROUTING = {
+    "enabled": True,
+    "stage_models": {
+        1: "gpt-4.1-mini",  # 제외 판단 (뉴스 수가 가장 많은 단계)
+        2: None,  # 그룹핑 (None이면 사이드바에서 선택한 모델)
+        3: None  # 중요도 평가
+    },
+    "escalation": {
+        "enabled": True,
+        "categories": ["borderline"],  # 상위 모델로 다시 판단할 분류
+        "min_confidence": 0.7  # 확신도(confidence)가 이보다 낮은 판단도 다시 판단
+    }
+}
+
+# 기사 저장소 설정 (기간이 겹치는 다음 실행에서 같은 기준으로 이미 판단한 기사는 저장된 판단 재사용)
+ARTICLE_STORE_SETTINGS = {
+    "enabled": True,
+    "path": ".cache/article_store.sqlite",
+    "verdict_ttl_days": 14  # 저장된 판단을 재사용할 수 있는 기간(일)
+}
+
+# 그래프 체크포인트 설정 (실행 ID:회사별로 노드마다 상태를 저장해 실패한 실행을 마지막 완료 단계부터 이어서 실행)
+CHECKPOINT_SETTINGS = {
+    "enabled": True,
+    "path": ".cache/checkpoints.sqlite",
+    "ttl_days": 3  # 체크포인트 보관 기간(일)
+}
+
+# 배치 실행 설정 (batch_runner.py)
+BATCH_SETTINGS = {
+    "mode": "thread",  # "thread": 한 프로세스에서 스레드로 실행, "process": 회사를 여러 프로세스에 나눠 실행
+    "processes": 3,  # process 모드의 작업 프로세스 수 (LLM 동시 호출 수 상한은 프로세스 수로 나눠 적용)
+    "output_dir": "output"  # 결과 파일 폴더 (output/<실행 ID>/<카테고리>.json|md)
+}
+
 # Default GPT model to use
 #DEFAULT_GPT_MODEL = "gpt-4.1"
 DEFAULT_GPT_MODEL = "gpt-4.1"
@@ -0,0 +1,91 @@
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional, Union
+
+# 한국 시간대(KST) 정의
+KST = timezone(timedelta(hours=9))
+
+# RFC-822 형식이 아닌 발행일 문자열에 사용할 형식 (우선순위 순, 시간대 정보 없음 → KST로 간주)
+FALLBACK_DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',             # YYYY-MM-DD HH:MM:SS
+    '%Y-%m-%d',                      # YYYY-MM-DD
+    '%Y년 %m월 %d일',                # 한국어 형식
+    '%m/%d/%Y',                      # MM/DD/YYYY
+    '%d/%m/%Y',                      # DD/MM/YYYY
+    '%Y.%m.%d',                      # YYYY.MM.DD
+    '%m.%d.%Y',                      # MM.DD.YYYY
+)
+
+
+def struct_to_kst(parsed: time.struct_time) -> datetime:
+    """feedparser의 *_parsed 값(UTC struct_time)을 KST datetime으로 변환합니다."""
+    return datetime(*parsed[:6], tzinfo=timezone.utc).astimezone(KST)
+
+
+@lru_cache(maxsize=8192)
+def parse_news_date(date_str: str) -> Optional[datetime]:
+    """
+    발행일 문자열을 KST 기준의 tz-aware datetime으로 변환합니다.
+
+    RSS의 RFC-822 형식(예: 'Mon, 01 Jan 2024 12:00:00 GMT')을 먼저 해석하고,
+    실패하면 FALLBACK_DATE_FORMATS를 차례로 시도합니다. 같은 문자열은 한 번만 파싱합니다.
+
+    Returns:
+        Optional[datetime]: KST datetime, 해석할 수 없으면 None
+    """
+    if not date_str:
+        return None
+
+    try:
+        parsed = parsedate_to_datetime(date_str)
+    except (TypeError, ValueError, IndexError):
+        parsed = None
+
+    if parsed is not None:
+        # 시간대가 '-0000'이면 naive로 반환되므로 UTC로 간주
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(KST)
+
+    for date_format in FALLBACK_DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, date_format).replace(tzinfo=KST)
+        except ValueError:
+            continue
+
+    return None
+
+
+def entry_published_at(entry) -> Optional[datetime]:
+    """피드 항목의 발행일을 KST datetime으로 반환합니다. (published_parsed 우선 사용)"""
+    parsed = entry.get('published_parsed')
+    if parsed:
+        return struct_to_kst(parsed)
+    return parse_news_date(entry.get('published', ''))
+
+
+def news_published_at(news: dict) -> Optional[datetime]:
+    """뉴스 항목의 정규화된 발행일을 반환합니다. (published_at이 없으면 date 문자열을 파싱)"""
+    published_at = news.get('published_at')
+    if isinstance(published_at, datetime):
+        return published_at
+    if isinstance(published_at, str) and published_at:
+        try:
+            parsed = datetime.fromisoformat(published_at)
+        except ValueError:
+            # 형식이 잘못된 값은 발행일 정보가 없는 것으로 처리 (수집 전체를 중단하지 않음)
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=KST)
+    return parse_news_date(news.get('date', ''))
+
+
+def format_news_date(value: Union[datetime, str, None], fmt: str = '%m/%d') -> str:
+    """발행일(datetime 또는 문자열)을 KST 기준 fmt 형식으로 표시합니다. 해석할 수 없으면 원본 문자열을 반환합니다."""
+    if isinstance(value, datetime):
+        return value.astimezone(KST).strftime(fmt)
+    parsed = parse_news_date(value) if value else None
+    if parsed is None:
+        return value if value else '날짜 정보 없음'
+    return parsed.strftime(fmt)
@@ -0,0 +1,199 @@
+import re
+import zlib
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from date_utils import KST, news_published_at
+
+# 해시 연산에 사용하는 메르센 소수 (2^31 - 1)
+_MERSENNE_PRIME = (1 << 31) - 1
+
+# 제목 끝의 ' - 언론사' 패턴과 [단독]/(종합) 같은 말머리
+_PRESS_SUFFIX_PATTERN = re.compile(r"\s*-\s*[가-힣A-Za-z0-9\s]+$")
+_TAG_PATTERN = re.compile(r"[\[\(【<][^\]\)】>]{1,10}[\]\)】>]")
+_NON_WORD_PATTERN = re.compile(r"[^0-9a-z가-힣]")
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+# 제목이 거의 같아도 뜻이 반대인 기사를 구분하는 대비어 (한쪽에만 있거나 서로 다르면 묶지 않음)
+CONTRAST_TERMS = (
+    "상승", "하락", "급등", "급락", "인상", "인하", "증가", "감소", "확대", "축소",
+    "흑자", "적자", "상향", "하향", "개선", "악화", "호조", "부진", "매수", "매도",
+    "승인", "불허", "찬성", "반대", "합병", "분할", "인수", "매각", "채용", "감원",
+)
+
+
+def normalize_title(title: str) -> str:
+    """비교용 제목 정규화 (언론사 접미사, 말머리, 공백/문장부호 제거, 소문자화)"""
+    title = _PRESS_SUFFIX_PATTERN.sub("", title or "")
+    title = _TAG_PATTERN.sub("", title)
+    return _NON_WORD_PATTERN.sub("", title.lower())
+
+
+def title_details(title: str) -> Tuple[frozenset, frozenset]:
+    """제목의 숫자(1분기, 5%, 6조원의 숫자 등)와 대비어 집합"""
+    title = _TAG_PATTERN.sub("", _PRESS_SUFFIX_PATTERN.sub("", title or ""))
+    numbers = frozenset(_NUMBER_PATTERN.findall(title.replace(",", "")))
+    terms = frozenset(term for term in CONTRAST_TERMS if term in title)
+    return numbers, terms
+
+
+def has_conflicting_details(title_a: str, title_b: str) -> bool:
+    """두 제목의 숫자나 대비어가 다르면 True (제목이 비슷해도 다른 사안일 수 있음)"""
+    return title_details(title_a) != title_details(title_b)
+
+
+def jaccard(a: set, b: set) -> float:
+    """두 집합의 Jaccard 유사도"""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def char_ngrams(text: str, n: int = 3) -> set:
+    """문자 n-gram 집합 (n보다 짧은 문자열은 전체를 하나의 n-gram으로 사용)"""
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class MinHasher:
+    """문자 n-gram 집합의 MinHash 시그니처를 계산합니다. (같은 seed면 항상 같은 결과)"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles: set) -> np.ndarray:
+        if not shingles:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) & _MERSENNE_PRIME for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+
+class UnionFind:
+    """인덱스 묶음을 합치는 서로소 집합 (가장 작은 인덱스가 대표)"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x: int, y: int):
+        root_x, root_y = self.find(x), self.find(y)
+        if root_x != root_y:
+            self.parent[max(root_x, root_y)] = min(root_x, root_y)
+
+
+def press_rank(news: dict, press_priority: Mapping[str, int], default_rank: int) -> int:
+    """DUPLICATE_HANDLING의 언론사 우선순위 (숫자가 작을수록 우선, 목록에 없으면 default_rank)"""
+    for press in (news.get("matched_press"), news.get("press")):
+        if press and press in press_priority:
+            return press_priority[press]
+    return default_rank
+
+
+def pick_representative(cluster: List[dict], press_priority: Mapping[str, int],
+                        default_rank: int) -> dict:
+    """
+    중복 묶음의 대표 기사를 선택합니다.
+
+    DUPLICATE_HANDLING 기준과 같이 언론사 우선순위 → 최신 발행 → 더 긴(구체적인) 제목 순으로 비교합니다.
+    """
+    oldest = datetime.min.replace(tzinfo=KST)
+
+    def sort_key(news):
+        published_at = news_published_at(news) or oldest
+        return (
+            press_rank(news, press_priority, default_rank),
+            -published_at.timestamp() if published_at != oldest else float("inf"),
+            -len(news.get("content", "")),
+        )
+
+    return min(cluster, key=sort_key)
+
+
+def cluster_near_duplicates(news_list: List[dict], threshold: float = 0.85, ngram: int = 3,
+                            num_perm: int = 64, bands: int = 16,
+                            press_priority: Optional[Mapping[str, int]] = None,
+                            default_rank: int = 4) -> List[Dict]:
+    """
+    제목의 문자 n-gram MinHash와 LSH로 거의 같은 기사(같은 통신 기사 재송고 등)를 묶습니다.
+
+    LSH 밴드가 하나라도 같은 쌍만 후보로 삼고, n-gram 집합의 Jaccard 유사도가 threshold 이상이면서
+    숫자와 대비어가 같은 쌍만 같은 묶음으로 합칩니다. ("1분기" vs "2분기", "상승" vs "하락"은 묶지 않음)
+    애매한 쌍은 묶지 않고 LLM 그룹핑에 맡깁니다. (find_similar_pairs 참고) 입력 순서를 유지합니다.
+
+    Args:
+        news_list (List[dict]): 'content'(제목)를 포함한 뉴스 목록
+        threshold (float): 같은 묶음으로 판단할 Jaccard 유사도 (기본값: 0.85)
+        ngram (int): 문자 n-gram 길이 (기본값: 3)
+        num_perm (int): MinHash 해시 함수 수 (기본값: 64)
+        bands (int): LSH 밴드 수, num_perm의 약수여야 함 (기본값: 16)
+        press_priority (Optional[Mapping[str, int]]): 대표 기사 선택용 언론사 우선순위
+        default_rank (int): 우선순위 목록에 없는 언론사의 순위 (기본값: 4)
+
+    Returns:
+        List[Dict]: {"representative": 대표 기사, "members": 묶음의 기사 목록} 리스트
+    """
+    if not news_list:
+        return []
+
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm=num_perm)
+    shingles = [char_ngrams(normalize_title(news.get("content", "")), ngram) for news in news_list]
+    signatures = [hasher.signature(shingle_set) for shingle_set in shingles]
+    details = [title_details(news.get("content", "")) for news in news_list]
+
+    union_find = UnionFind(len(news_list))
+    for band in range(bands):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            key = signature[band * rows:(band + 1) * rows].tobytes()
+            buckets.setdefault(key, []).append(i)
+        for members in buckets.values():
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    if union_find.find(i) == union_find.find(j):
+                        continue
+                    # LSH 후보는 실제 Jaccard 유사도로 확인 (시그니처 추정 오차로 잘못 묶지 않도록)
+                    if details[i] == details[j] and jaccard(shingles[i], shingles[j]) >= threshold:
+                        union_find.union(i, j)
+
+    groups = {}
+    for i in range(len(news_list)):
+        groups.setdefault(union_find.find(i), []).append(news_list[i])
+
+    return [
+        {"representative": pick_representative(members, press_priority or {}, default_rank),
+         "members": members}
+        for members in groups.values()
+    ]
+
+
+def find_similar_pairs(news_list: List[dict], min_similarity: float = 0.5,
+                       ngram: int = 3) -> List[Tuple[int, int]]:
+    """
+    제목의 문자 n-gram Jaccard 유사도가 min_similarity 이상인 (i, j) 위치 쌍을 반환합니다. (i < j)
+
+    로컬에서 묶지 않은 대표 기사 중 같은 사안일 수 있는 쌍을 LLM 그룹핑 프롬프트에 후보로 알려줄 때 사용합니다.
+    """
+    shingles = [char_ngrams(normalize_title(news.get("content", "")), ngram) for news in news_list]
+    return [
+        (i, j)
+        for i in range(len(shingles))
+        for j in range(i + 1, len(shingles))
+        if jaccard(shingles[i], shingles[j]) >= min_similarity
+    ]
@@ -0,0 +1,209 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from dedup import UnionFind, has_conflicting_details, normalize_title, pick_representative
+
+
+class OpenAIEmbeddingProvider:
+    """OpenAI 임베딩 API(langchain_openai.OpenAIEmbeddings)로 제목을 벡터화합니다."""
+
+    def __init__(self, model: str = "text-embedding-3-small", batch_size: int = 256):
+        from langchain_openai import OpenAIEmbeddings
+
+        self.name = f"openai:{model}"
+        self._embeddings = OpenAIEmbeddings(model=model, chunk_size=batch_size)
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return self._embeddings.embed_documents(list(texts))
+
+
+class SentenceTransformerProvider:
+    """로컬 sentence-transformers 모델로 제목을 벡터화합니다. (sentence-transformers 설치 필요)"""
+
+    def __init__(self, model: str = "jhgan/ko-sroberta-multitask", batch_size: int = 256):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = f"local:{model}"
+        self.batch_size = batch_size
+        self._model = SentenceTransformer(model)
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return self._model.encode(list(texts), batch_size=self.batch_size).tolist()
+
+
+class VectorCache:
+    """
+    (임베딩 모델, 정규화된 제목) 해시별 벡터를 SQLite 파일에 보관하는 캐시입니다.
+
+    한 번 임베딩한 제목은 다음 실행에서 API를 다시 호출하지 않고 재사용합니다.
+    저장 항목 수가 max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다.
+    """
+
+    def __init__(self, path: str = ".cache/embeddings.sqlite", max_entries: int = 200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS vectors (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_accessed_at ON vectors (accessed_at)")
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """저장된 벡터를 {키: float32 벡터}로 반환합니다. (없는 키는 제외)"""
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = list(keys[start:start + 500])
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+            if found:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE vectors SET accessed_at = ? WHERE key = ?", [(now, key) for key in found]
+                    )
+            self.stats["hits"] += len(found)
+            self.stats["misses"] += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, vectors: Mapping[str, np.ndarray]):
+        """벡터를 저장하고 용량을 넘으면 오래된 항목을 정리합니다."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector, accessed_at) VALUES (?, ?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in vectors.items()]
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM vectors WHERE key IN "
+                    "(SELECT key FROM vectors ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+
+
+class EmbeddingIndex:
+    """
+    제목 임베딩을 캐시와 함께 관리하고, 코사인 유사도로 같은 사건의 기사를 묶습니다.
+
+    provider는 name 속성과 embed(texts) -> 벡터 리스트 메서드만 있으면 되므로
+    테스트용 가짜 구현이나 다른 임베딩 모델로 교체할 수 있습니다.
+    """
+
+    def __init__(self, provider, cache: Optional[VectorCache] = None):
+        self.provider = provider
+        self.cache = cache
+
+    def _key(self, normalized_title: str) -> str:
+        return hashlib.sha1(f"{self.provider.name}\n{normalized_title}".encode("utf-8")).hexdigest()
+
+    def embed_titles(self, titles: Sequence[str]) -> np.ndarray:
+        """제목 목록을 행 단위로 L2 정규화된 (n, d) 행렬로 변환합니다."""
+        normalized = [normalize_title(title) or title for title in titles]
+        keys = [self._key(title) for title in normalized]
+
+        vectors = self.cache.get_many(keys) if self.cache else {}
+        missing = {}
+        for key, title in zip(keys, normalized):
+            if key not in vectors and key not in missing:
+                missing[key] = title
+
+        if missing:
+            embedded = self.provider.embed(list(missing.values()))
+            new_vectors = {key: np.asarray(vector, dtype=np.float32)
+                           for key, vector in zip(missing, embedded)}
+            vectors.update(new_vectors)
+            if self.cache:
+                self.cache.put_many(new_vectors)
+
+        matrix = np.vstack([vectors[key] for key in keys]).astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def cluster(self, titles: Sequence[str], threshold: float,
+                can_merge: Optional[Callable[[str, str], bool]] = None) -> List[List[int]]:
+        """
+        코사인 유사도가 threshold 이상인 제목끼리 묶어 인덱스 목록의 리스트로 반환합니다.
+        (can_merge를 지정하면 can_merge(제목, 제목)이 True인 쌍만 묶음)
+        """
+        if not titles:
+            return []
+        matrix = self.embed_titles(titles)
+        similarity = matrix @ matrix.T
+        union_find = UnionFind(len(titles))
+        for i, j in np.argwhere(np.triu(similarity >= threshold, k=1)):
+            if can_merge is None or can_merge(titles[i], titles[j]):
+                union_find.union(int(i), int(j))
+
+        groups = {}
+        for i in range(len(titles)):
+            groups.setdefault(union_find.find(i), []).append(i)
+        return list(groups.values())
+
+
+def merge_semantic_duplicates(clusters: List[Dict], index: EmbeddingIndex, threshold: float,
+                              press_priority: Optional[Mapping[str, int]] = None,
+                              default_rank: int = 4) -> List[Dict]:
+    """
+    제목 유사도로 만든 묶음(cluster_near_duplicates 결과)의 대표 기사끼리 임베딩 유사도를 비교해
+    표현만 다른 같은 사건의 묶음을 합치고, 합쳐진 묶음의 대표 기사를 다시 선택합니다.
+    숫자나 대비어(상승/하락 등)가 다른 제목은 임베딩이 비슷해도 합치지 않습니다.
+    """
+    if len(clusters) < 2:
+        return clusters
+
+    titles = [cluster["representative"].get("content", "") for cluster in clusters]
+    merged = []
+    for group in index.cluster(titles, threshold,
+                               can_merge=lambda a, b: not has_conflicting_details(a, b)):
+        members = [news for i in group for news in clusters[i]["members"]]
+        merged.append({
+            "representative": pick_representative(members, press_priority or {}, default_rank),
+            "members": members
+        })
+    return merged
+
+
+_embedding_indexes = {}
+_embedding_indexes_lock = threading.Lock()
+
+
+def get_embedding_index(provider: str = "openai", model: str = "text-embedding-3-small",
+                        cache_path: Optional[str] = ".cache/embeddings.sqlite",
+                        batch_size: int = 256) -> EmbeddingIndex:
+    """(제공자, 모델, 캐시 경로)별로 하나의 EmbeddingIndex를 공유하여 반환합니다."""
+    key = (provider, model, cache_path)
+    with _embedding_indexes_lock:
+        index = _embedding_indexes.get(key)
+        if index is None:
+            if provider == "openai":
+                embedding_provider = OpenAIEmbeddingProvider(model, batch_size=batch_size)
+            elif provider == "local":
+                embedding_provider = SentenceTransformerProvider(model, batch_size=batch_size)
+            else:
+                raise ValueError(f"지원하지 않는 임베딩 제공자입니다: {provider}")
+            index = EmbeddingIndex(embedding_provider, VectorCache(cache_path) if cache_path else None)
+            _embedding_indexes[key] = index
+        return index
@@ -0,0 +1,157 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Optional
+
+
+def _encode_value(value):
+    """JSON으로 저장할 수 없는 값(발행일 datetime)을 변환합니다."""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"JSON으로 저장할 수 없는 값입니다: {type(value)}")
+
+
+def _decode_value(obj):
+    """_encode_value로 저장한 datetime을 복원합니다."""
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class CachedFeed:
+    """캐시에 저장된 피드 한 건 (파싱된 항목, 검증용 헤더, 수집 시각)"""
+
+    def __init__(self, url: str, entries: List[Dict], etag: Optional[str],
+                 last_modified: Optional[str], fetched_at: float):
+        self.url = url
+        self.entries = entries
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def validation_headers(self) -> Dict[str, str]:
+        """조건부 요청에 사용할 If-None-Match / If-Modified-Since 헤더를 만듭니다."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class FeedCache:
+    """
+    쿼리 URL별 RSS 피드 결과를 SQLite 파일에 보관하는 캐시입니다.
+
+    TTL 이내의 항목은 네트워크 요청 없이 그대로 사용하고, TTL이 지난 항목은
+    저장해 둔 ETag/Last-Modified로 조건부 요청을 보내 재검증합니다.
+    저장 항목 수가 max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다.
+    """
+
+    def __init__(self, path: str = ".cache/feed_cache.sqlite", ttl_seconds: int = 600,
+                 max_entries: int = 2000):
+        """
+        Args:
+            path (str): SQLite 캐시 파일 경로 (기본값: .cache/feed_cache.sqlite)
+            ttl_seconds (int): 재검증 없이 사용할 수 있는 시간(초) (기본값: 600)
+            max_entries (int): 보관할 최대 피드 수 (기본값: 2000)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS feeds (
+                    url TEXT PRIMARY KEY,
+                    entries TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_feeds_accessed_at ON feeds (accessed_at)")
+
+    def get(self, url: str) -> Optional[CachedFeed]:
+        """URL에 해당하는 캐시 항목을 반환합니다. (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT entries, etag, last_modified, fetched_at FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE feeds SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        entries, etag, last_modified, fetched_at = row
+        return CachedFeed(url, json.loads(entries, object_hook=_decode_value), etag, last_modified, fetched_at)
+
+    def is_fresh(self, cached: CachedFeed) -> bool:
+        """TTL 이내에 수집된 항목인지 확인합니다."""
+        return time.time() - cached.fetched_at < self.ttl_seconds
+
+    def put(self, url: str, entries: List[Dict], etag: Optional[str] = None,
+            last_modified: Optional[str] = None):
+        """피드 결과를 저장하고 용량을 넘으면 오래된 항목을 정리합니다."""
+        now = time.time()
+        payload = json.dumps(entries, ensure_ascii=False, default=_encode_value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feeds (url, entries, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, payload, etag, last_modified, now, now)
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM feeds").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM feeds WHERE url IN "
+                    "(SELECT url FROM feeds ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.stats["evictions"] += overflow
+
+    def touch(self, url: str):
+        """304 응답으로 재검증된 항목의 수집 시각을 갱신합니다."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE feeds SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+            )
+
+    def record(self, kind: str):
+        """hits / misses / revalidated 카운터를 증가시킵니다."""
+        with self._lock:
+            self.stats[kind] += 1
+
+    def clear(self):
+        """모든 캐시 항목을 삭제합니다."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM feeds")
+
+
+_feed_caches = {}
+_feed_caches_lock = threading.Lock()
+
+
+def get_feed_cache(path: str = ".cache/feed_cache.sqlite", ttl_seconds: int = 600,
+                   max_entries: int = 2000) -> FeedCache:
+    """경로별로 하나의 FeedCache를 공유하여 반환합니다."""
+    with _feed_caches_lock:
+        cache = _feed_caches.get(path)
+        if cache is None:
+            cache = FeedCache(path, ttl_seconds, max_entries)
+            _feed_caches[path] = cache
+        else:
+            cache.ttl_seconds = ttl_seconds
+            cache.max_entries = max_entries
+        return cache
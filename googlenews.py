@@ -1,6 +1,85 @@
 import feedparser
+import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import quote
 from typing import List, Dict, Optional
+from date_utils import entry_published_at
+
+# 구글 뉴스 RSS가 한 번의 요청에 돌려주는 최대 항목 수
+RSS_MAX_ITEMS = 100
+
+
+class FeedResponse:
+    """전송 계층이 돌려주는 피드 응답 (상태 코드, 본문 바이트, 소문자 키의 응답 헤더)"""
+
+    def __init__(self, status_code: int, content: bytes, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {k.lower(): v for k, v in (headers or {}).items()}
+
+
+class RequestsTransport:
+    """
+    keep-alive 커넥션 풀을 공유하는 requests 기반 피드 전송 계층입니다.
+
+    gzip 압축 응답, 요청 타임아웃, 일시적 오류에 대한 재시도(지수 백오프)를 처리합니다.
+    fetch(url, headers) 메서드만 구현하면 다른 전송 계층으로 교체할 수 있습니다.
+    """
+
+    def __init__(self, timeout: float = 10.0, retries: int = 3, backoff_factor: float = 0.5,
+                 pool_maxsize: int = 16):
+        """
+        Args:
+            timeout (float): 연결/응답 대기 시간(초) (기본값: 10.0)
+            retries (int): 연결 오류 및 429/5xx 응답에 대한 최대 재시도 횟수 (기본값: 3)
+            backoff_factor (float): 재시도 간 지수 백오프 계수 (기본값: 0.5)
+            pool_maxsize (int): 호스트별로 유지할 최대 커넥션 수 (기본값: 16)
+        """
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": "Mozilla/5.0 (compatible; news-clipping/1.0)",
+            "Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8",
+            "Accept-Encoding": "gzip, deflate",
+        })
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FeedResponse:
+        """URL의 피드 본문을 바이트로 가져옵니다. (gzip 응답은 자동으로 해제됨)"""
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        return FeedResponse(response.status_code, response.content, dict(response.headers))
+
+    def close(self):
+        """커넥션 풀을 정리합니다."""
+        self.session.close()
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> RequestsTransport:
+    """프로세스 전체에서 공유하는 기본 전송 계층을 반환합니다."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = RequestsTransport()
+        return _default_transport
 
 
 class GoogleNews:
@@ -8,47 +87,180 @@ class GoogleNews:
     구글 뉴스를 검색하고 결과를 반환하는 클래스입니다.
     """
 
-    def __init__(self):
-        """GoogleNews 클래스를 초기화합니다."""
+    def __init__(self, max_workers: int = 8, transport=None, cache=None):
+        """
+        GoogleNews 클래스를 초기화합니다.
+
+        Args:
+            max_workers (int): search_many에서 동시에 요청할 최대 피드 수 (기본값: 8)
+            transport: fetch(url, headers)를 제공하는 전송 계층 (기본값: 공유 RequestsTransport)
+            cache: 쿼리 URL별 피드 캐시 (FeedCache, 기본값: None이면 캐시 사용 안 함)
+        """
         self.base_url = "https://news.google.com/rss"
+        self.max_workers = max(1, max_workers)
+        self.transport = transport or get_default_transport()
+        self.cache = cache
 
-    def search_by_keyword(self, keyword: Optional[str] = None, k: int = 20) -> List[Dict[str, str]]:
+    def search_by_keyword(self, keyword: Optional[str] = None, k: int = 20,
+                          start: Optional[datetime] = None,
+                          end: Optional[datetime] = None) -> List[Dict[str, str]]:
         """
         키워드로 뉴스를 검색합니다.
 
+        기간(start, end)을 지정하면 after:/before: 검색 연산자로 기간을 쿼리에 포함하고,
+        결과가 RSS 최대 항목 수에 걸리면 기간을 나누어 다시 검색해 누락 없이 수집합니다.
+
         Args:
             keyword (Optional[str]): 검색할 키워드 (기본값: None)
-            k (int): 검색할 뉴스의 최대 개수 (기본값: 20)
+            k (int): 검색할 뉴스의 최대 개수, 기간을 지정한 경우 하위 기간별 최대 개수 (기본값: 20)
+            start (Optional[datetime]): 검색 기간 시작 (기본값: None)
+            end (Optional[datetime]): 검색 기간 종료 (기본값: None)
 
         Returns:
-            List[Dict[str, str]]: URL, 제목, 언론사, 발행일을 포함한 딕셔너리 리스트
+            List[Dict[str, str]]: URL, 제목, 언론사, 발행일(문자열 및 KST datetime)을 포함한 딕셔너리 리스트
         """
-        # URL 생성
-        if keyword:
-            encoded_keyword = quote(keyword)
-            url = f"{self.base_url}/search?q={encoded_keyword}&hl=ko&gl=KR&ceid=KR:ko"
+        if keyword and start and end:
+            # 기간별 검색 (상한에 걸리면 하위 기간으로 분할)
+            entries = self._search_window(keyword, start.date(), end.date(), k)
         else:
-            url = f"{self.base_url}?hl=ko&gl=KR&ceid=KR:ko"
-        
-        # 뉴스 데이터 파싱
-        news_data = feedparser.parse(url)
+            # URL 생성
+            if keyword:
+                url = self._search_url(keyword)
+            else:
+                url = f"{self.base_url}?hl=ko&gl=KR&ceid=KR:ko"
+
+            # 캐시 또는 공유 커넥션 풀에서 피드 항목 가져오기
+            entries = self._fetch_entries(url, keyword)[:k]
         
         # 수집된 뉴스가 없는 경우
-        if not news_data.entries:
+        if not entries:
             print(f"'{keyword}' 관련 뉴스를 찾을 수 없습니다.")
             return []
-            
+
+        return entries
+
+    def _search_url(self, query: str) -> str:
+        """검색어로 RSS 검색 URL을 만듭니다."""
+        return f"{self.base_url}/search?q={quote(query)}&hl=ko&gl=KR&ceid=KR:ko"
+
+    def _search_window(self, keyword: str, start_date: date, end_date: date, k: int) -> List[Dict[str, str]]:
+        """
+        start_date ~ end_date 기간의 뉴스를 검색합니다.
+
+        구글 뉴스의 날짜 연산자는 UTC 기준 날짜 단위이므로 앞뒤로 하루씩 여유를 두고,
+        정확한 시각 필터링은 호출 측에서 수행합니다. 결과가 RSS 최대 항목 수에 도달하면
+        기간을 절반으로 나누어 하루 단위까지 재귀적으로 검색한 뒤 URL 기준으로 병합합니다.
+        """
+        query = (f"{keyword} after:{(start_date - timedelta(days=1)).isoformat()} "
+                 f"before:{(end_date + timedelta(days=1)).isoformat()}")
+        feed_entries = self._fetch_entries(self._search_url(query), keyword)
+        entries = feed_entries[:k]
+
+        if len(feed_entries) < RSS_MAX_ITEMS or start_date >= end_date:
+            return entries
+
+        middle = start_date + (end_date - start_date) // 2
+        print(f"'{keyword}' {start_date}~{end_date} 검색 결과가 {len(feed_entries)}개로 상한에 도달하여 기간을 나눠 재검색합니다.")
+        sub_entries = (self._search_window(keyword, start_date, middle, k)
+                       + self._search_window(keyword, middle + timedelta(days=1), end_date, k))
+
+        # URL 기준 중복 제거 후 병합
+        merged = []
+        seen_urls = set()
+        for entry in entries + sub_entries:
+            if entry["url"] not in seen_urls:
+                seen_urls.add(entry["url"])
+                merged.append(entry)
+        return merged
+
+    def _fetch_entries(self, url: str, keyword: Optional[str]) -> List[Dict[str, str]]:
+        """
+        피드 URL의 항목을 가져옵니다.
+
+        캐시가 TTL 이내면 그대로 사용하고, 만료된 경우 ETag/Last-Modified로
+        조건부 요청을 보내 304 응답이면 캐시된 항목을 재사용합니다.
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached and self.cache.is_fresh(cached):
+            self.cache.record("hits")
+            return cached.entries
+
+        headers = cached.validation_headers() if cached else None
+        try:
+            response = self.transport.fetch(url, headers=headers)
+        except requests.RequestException as e:
+            print(f"'{keyword}' 피드 요청 실패: {e}")
+            # 요청이 실패하면 만료된 캐시라도 사용
+            return cached.entries if cached else []
+
+        if response.status_code == 304 and cached:
+            self.cache.touch(url)
+            self.cache.record("revalidated")
+            return cached.entries
+
+        if response.status_code != 200:
+            print(f"'{keyword}' 피드 요청 실패: HTTP {response.status_code}")
+            return cached.entries if cached else []
+
+        news_data = feedparser.parse(response.content, response_headers=response.headers)
+
         # 결과 가공
-        result = []
-        for entry in news_data.entries[:k]:
+        entries = []
+        for entry in news_data.entries:
             # source 태그에서 직접 언론사 정보 추출
             press = entry.get('source', {}).get('title', '알 수 없음')
             
-            result.append({
+            entries.append({
                 "url": entry.link, 
                 "content": entry.title,  # 제목은 그대로 사용
                 "press": press,
-                "date": entry.get('published', '날짜 정보 없음')
+                "date": entry.get('published', '날짜 정보 없음'),
+                "published_at": entry_published_at(entry)  # 수집 시 KST datetime으로 정규화
             })
 
-        return result
+        if self.cache:
+            self.cache.record("misses")
+            self.cache.put(
+                url,
+                entries,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified")
+            )
+
+        return entries
+
+    def search_many(self, keywords: List[str], k: int = 20,
+                    max_workers: Optional[int] = None,
+                    start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> List[List[Dict[str, str]]]:
+        """
+        여러 키워드를 동시에 검색합니다.
+
+        Args:
+            keywords (List[str]): 검색할 키워드 리스트
+            k (int): 키워드별 검색할 뉴스의 최대 개수 (기본값: 20)
+            max_workers (Optional[int]): 동시 요청 수 상한 (기본값: 생성자에 지정한 값)
+            start (Optional[datetime]): 검색 기간 시작 (기본값: None)
+            end (Optional[datetime]): 검색 기간 종료 (기본값: None)
+
+        Returns:
+            List[List[Dict[str, str]]]: 입력 키워드 순서와 동일한 순서의 키워드별 검색 결과
+        """
+        if not keywords:
+            return []
+
+        workers = min(max_workers or self.max_workers, len(keywords))
+
+        def search(keyword):
+            try:
+                return self.search_by_keyword(keyword, k=k, start=start, end=end)
+            except Exception as e:
+                print(f"키워드 '{keyword}' 검색 중 오류 발생: {e}")
+                return []
+
+        if workers <= 1:
+            return [search(keyword) for keyword in keywords]
+
+        # executor.map은 완료 순서와 무관하게 입력 순서대로 결과를 돌려줌
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(search, keywords))
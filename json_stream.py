@@ -0,0 +1,90 @@
+import json
+from typing import Iterable, List, Optional, Tuple
+
+
+class JSONItemStream:
+    """
+    스트리밍으로 들어오는 LLM 응답 조각에서 최상위 배열의 항목을 완성되는 즉시 꺼내는 증분 파서입니다.
+
+    {"excluded": [{...}, {...}], "retained": [...]} 형태의 응답에서 item_keys에 해당하는
+    배열의 객체 항목이 닫히는 순간 (키, 항목 dict)를 반환하므로, 전체 응답을 기다리지 않고
+    항목을 처리할 수 있습니다. 첫 '{' 이전의 코드 블록 표시(```json) 등은 무시합니다.
+    """
+
+    def __init__(self, item_keys: Optional[Iterable[str]] = None):
+        """
+        Args:
+            item_keys (Optional[Iterable[str]]): 항목을 꺼낼 최상위 키 목록 (기본값: None이면 모든 배열)
+        """
+        self.item_keys = set(item_keys) if item_keys is not None else None
+        self._buffer = []  # 현재 수집 중인 항목의 글자들
+        self._stack = []  # 열린 괄호 ('{' 또는 '[')
+        self._in_string = False
+        self._escaped = False
+        self._string = []  # 최상위 객체에서 읽고 있는 문자열 (키 후보)
+        self._last_string = None
+        self._current_key = None  # 현재 값이 속한 최상위 키
+        self._done = False
+
+    def _collecting(self) -> bool:
+        # 최상위 객체 → 배열 → 항목 객체 안에 있는 동안 수집
+        return len(self._stack) >= 3
+
+    def feed(self, text: str) -> List[Tuple[str, dict]]:
+        """응답 조각을 추가하고 새로 완성된 (최상위 키, 항목) 목록을 반환합니다."""
+        items = []
+        for char in text:
+            if self._done:
+                break
+
+            if self._in_string:
+                if self._collecting():
+                    self._buffer.append(char)
+                elif len(self._stack) == 1:
+                    self._string.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_string = "".join(self._string[:-1])
+                continue
+
+            if not self._stack and char != "{":
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string = []
+            elif char == ":" and len(self._stack) == 1:
+                self._current_key = self._last_string
+            elif char in "{[":
+                self._stack.append(char)
+                if char == "{" and len(self._stack) == 3 and self._stack[1] == "[":
+                    self._buffer = []
+            elif char in "}]":
+                if self._collecting():
+                    self._buffer.append(char)
+                self._stack.pop()
+                if char == "}" and len(self._stack) == 2 and self._stack[1] == "[":
+                    item = self._parse_item()
+                    if item is not None:
+                        items.append((self._current_key, item))
+                if not self._stack:
+                    self._done = True
+                continue
+
+            if self._collecting():
+                self._buffer.append(char)
+        return items
+
+    def _parse_item(self) -> Optional[dict]:
+        if self.item_keys is not None and self._current_key not in self.item_keys:
+            return None
+        try:
+            item = json.loads("".join(self._buffer))
+        except json.JSONDecodeError:
+            return None
+        return item if isinstance(item, dict) else None
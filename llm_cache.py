@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+def make_cache_key(model: str, temperature: float, system_prompt: str, user_prompt: str,
+                   response_format: str = "") -> str:
+    """
+    (모델, temperature, 시스템 프롬프트, 사용자 프롬프트)의 내용 해시를 캐시 키로 만듭니다.
+
+    response_format(예: "json_object")을 지정한 호출은 일반 호출과 다른 키를 사용합니다.
+    """
+    parts = [model, temperature, system_prompt, user_prompt]
+    if response_format:
+        parts.append(response_format)
+    payload = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    프롬프트 내용 해시별 LLM 응답을 SQLite 파일에 보관하는 캐시입니다.
+
+    같은 모델/프롬프트로 다시 호출하면 LLM을 호출하지 않고 저장된 응답을 그대로 사용합니다.
+    TTL이 지난 항목은 사용하지 않고, 저장 항목 수가 max_entries를 넘으면
+    가장 오래 사용되지 않은 항목부터 삭제합니다.
+    """
+
+    def __init__(self, path: str = ".cache/llm_cache.sqlite", ttl_seconds: int = 86400,
+                 max_entries: int = 5000):
+        """
+        Args:
+            path (str): SQLite 캐시 파일 경로 (기본값: .cache/llm_cache.sqlite)
+            ttl_seconds (int): 저장된 응답을 사용할 수 있는 시간(초) (기본값: 86400)
+            max_entries (int): 보관할 최대 응답 수 (기본값: 5000)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        """키에 해당하는 응답을 반환합니다. (없거나 TTL이 지났으면 None)"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] >= self.ttl_seconds:
+                self.stats["misses"] += 1
+                if row is not None:
+                    with self._conn:
+                        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+        return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        """응답을 저장하고 용량을 넘으면 오래된 항목을 정리합니다."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.stats["evictions"] += overflow
+
+    def delete(self, key: str):
+        """키에 해당하는 응답을 삭제합니다."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        """모든 캐시 항목을 삭제합니다."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+
+_llm_caches = {}
+_llm_caches_lock = threading.Lock()
+
+
+def get_llm_cache(path: str = ".cache/llm_cache.sqlite", ttl_seconds: int = 86400,
+                  max_entries: int = 5000) -> LLMCache:
+    """경로별로 하나의 LLMCache를 공유하여 반환합니다."""
+    with _llm_caches_lock:
+        cache = _llm_caches.get(path)
+        if cache is None:
+            cache = LLMCache(path, ttl_seconds, max_entries)
+            _llm_caches[path] = cache
+        else:
+            cache.ttl_seconds = ttl_seconds
+            cache.max_entries = max_entries
+        return cache
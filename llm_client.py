@@ -0,0 +1,141 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import httpx
+
+from config import PIPELINE_SETTINGS
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+class LLMClientRegistry:
+    """
+    (모델, temperature, base URL)별로 ChatOpenAI 클라이언트를 하나씩 만들어 재사용하는 레지스트리입니다.
+
+    모든 클라이언트가 keep-alive 커넥션 풀(httpx)을 공유하므로 단계/회사/재시도마다
+    새 HTTP 클라이언트를 만들고 TLS 핸드셰이크를 반복하지 않습니다.
+    여러 회사를 동시에 분석할 때는 semaphore로 전체 LLM 동시 호출 수를 제한합니다.
+    비동기 호출(ainvoke)은 이벤트 루프별 async_semaphore()로 별도 제한하며, 비동기 커넥션은
+    만들어진 이벤트 루프에서만 쓸 수 있으므로 비동기 커넥션 풀과 클라이언트도 이벤트 루프별로 따로 둡니다.
+    """
+
+    def __init__(self, timeout: float = 120.0, max_connections: int = 32,
+                 max_keepalive_connections: int = 16, max_concurrency: int = 4,
+                 max_async_concurrency: int = 64):
+        """
+        Args:
+            timeout (float): LLM 요청 대기 시간(초) (기본값: 120.0)
+            max_connections (int): 공유 커넥션 풀의 최대 커넥션 수 (기본값: 32)
+            max_keepalive_connections (int): 유지할 최대 keep-alive 커넥션 수 (기본값: 16)
+            max_concurrency (int): 스레드에서 동시에 진행할 최대 LLM 호출 수 (기본값: 4)
+            max_async_concurrency (int): 이벤트 루프별로 동시에 진행할 최대 비동기 LLM 호출 수 (기본값: 64)
+        """
+        self.timeout = timeout
+        self.semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.max_async_concurrency = max(1, max_async_concurrency)
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._http_client = None
+        self._clients: Dict[Tuple[str, float, Optional[str]], "ChatOpenAI"] = {}
+        # 이벤트 루프 → (비동기 커넥션 풀, 클라이언트 dict)
+        self._loop_clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, model: str, temperature: float = 0.1, base_url: Optional[str] = None) -> "ChatOpenAI":
+        """
+        조건에 맞는 ChatOpenAI 클라이언트를 반환합니다. (없으면 생성 후 보관)
+
+        실행 중인 이벤트 루프에서 호출하면 그 루프의 비동기 커넥션 풀을 사용하는 클라이언트를 반환합니다.
+
+        Args:
+            model (str): 사용할 모델명
+            temperature (float): 샘플링 온도 (기본값: 0.1)
+            base_url (Optional[str]): API 주소 (기본값: None이면 OPENAI_BASE_URL 환경변수 또는 OpenAI 기본값)
+        """
+        base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        key = (model, temperature, base_url)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._lock:
+            if loop is None:
+                clients, http_async_client = self._clients, None
+            else:
+                entry = self._loop_clients.get(loop)
+                if entry is None:
+                    entry = (httpx.AsyncClient(limits=self._limits, timeout=self.timeout), {})
+                    self._loop_clients[loop] = entry
+                http_async_client, clients = entry
+            client = clients.get(key)
+            if client is None:
+                # langchain_openai는 불러오는 데 시간이 오래 걸리므로 처음 클라이언트를 만들 때 불러옴
+                from langchain_openai import ChatOpenAI
+                if self._http_client is None:
+                    self._http_client = httpx.Client(limits=self._limits, timeout=self.timeout)
+                client = ChatOpenAI(
+                    model_name=model,
+                    temperature=temperature,
+                    openai_api_base=base_url,
+                    http_client=self._http_client,
+                    http_async_client=http_async_client,
+                    stream_usage=True,  # 스트리밍 응답에도 토큰 사용량 포함
+                )
+                clients[key] = client
+            return client
+
+    def async_semaphore(self) -> asyncio.Semaphore:
+        """현재 이벤트 루프에서 사용할 비동기 LLM 호출 제한 semaphore를 반환합니다."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._async_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_async_concurrency)
+                self._async_semaphores[loop] = semaphore
+            return semaphore
+
+    async def aclose_loop(self):
+        """현재 이벤트 루프의 클라이언트를 비우고 비동기 커넥션 풀을 닫습니다. (루프를 닫기 전에 호출)"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._loop_clients.pop(loop, None)
+        if entry is not None:
+            await entry[0].aclose()
+
+    def close(self):
+        """보관 중인 클라이언트를 비우고 커넥션 풀을 정리합니다."""
+        with self._lock:
+            self._clients.clear()
+            # 비동기 커넥션 풀은 각 이벤트 루프에서 aclose_loop()로 닫음
+            self._loop_clients.clear()
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    """프로세스 전체에서 공유하는 LLM 클라이언트 레지스트리를 반환합니다."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = LLMClientRegistry(
+                max_concurrency=PIPELINE_SETTINGS["llm_concurrency"],
+                max_async_concurrency=PIPELINE_SETTINGS["async_llm_concurrency"]
+            )
+        return _default_registry
+
+
+def get_llm(model: str, temperature: float = 0.1, base_url: Optional[str] = None) -> "ChatOpenAI":
+    """공유 레지스트리에서 ChatOpenAI 클라이언트를 가져옵니다."""
+    return get_llm_registry().get(model, temperature, base_url)
@@ -1,23 +1,33 @@
-from typing import List, Dict, Any, TypedDict
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, END
+from typing import List, Dict, Any, Generator, Mapping, TypedDict
+from llm_client import get_llm, get_llm_registry
 from googlenews import GoogleNews
+from feed_cache import get_feed_cache
+from config import (FEED_CACHE_SETTINGS, LLM_CACHE_SETTINGS, EXCLUSION_CHUNK_SETTINGS,
+                    NEAR_DUPLICATE_SETTINGS, PRESS_PRIORITY, EMBEDDING_DEDUP_SETTINGS,
+                    STRUCTURED_OUTPUT_SETTINGS, STREAMING_SETTINGS, TELEMETRY_SETTINGS,
+                    STAGE_MODEL_ROUTING, ARTICLE_STORE_SETTINGS)
+from dedup import cluster_near_duplicates, find_similar_pairs
+from embedding_index import get_embedding_index, merge_semantic_duplicates
+from token_utils import chunk_by_token_budget, count_tokens
+from llm_cache import get_llm_cache, make_cache_key
+from schemas import ExclusionResult, GroupingResult, EvaluationResult, validate_output, schema_description
+from json_stream import JSONItemStream
+from telemetry import get_run_telemetry
 import operator
 import dotenv
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import json
 import re
 import os
-from datetime import datetime, timedelta, timezone
-import streamlit as st
+from datetime import datetime, timedelta
+from date_utils import KST, news_published_at
 import time
-from urllib.parse import urlparse
-
-import dotenv #pwc
-dotenv.load_dotenv(override=True) #pwc
-
-# 한국 시간대(KST) 정의
-KST = timezone(timedelta(hours=9))
+from press_matcher import get_press_matcher, parse_press_config
+from article_registry import get_article_registry
+from article_store import get_article_store, make_criteria_hash
+from reporting import get_reporter
 
 # 상태 타입 정의
 class AgentState(TypedDict):
@@ -45,6 +55,20 @@ class AgentState(TypedDict):
     original_news_data: List[dict]
     start_datetime: datetime
     end_datetime: datetime
+    fetch_max_workers: int
+    use_feed_cache: bool
+    use_llm_cache: bool
+    use_article_store: bool
+    model: str
+    company: str
+    run_id: str
+    exclusion_criteria: str
+    duplicate_handling: str
+    selection_criteria: str
+    valid_press_dict: Any
+    additional_press_dict: Any
+    prefetched_news: Dict[str, List[dict]]
+    stage_errors: List[str]
 
 # 신뢰할 수 있는 언론사 목록 (기본값으로만 사용)
 TRUSTED_PRESS_ALIASES = {
@@ -67,64 +91,385 @@ TRUSTED_PRESS_ALIASES = {
     "헤럴드경제": ["헤럴드경제", "herald", "heraldcorp", "heraldcorp.com"]
 }
 
-# 헬퍼 함수: LLM 호출
-def call_llm(state: AgentState, system_prompt: str, user_prompt: str, stage: int = 1) -> str:
-    """LLM을 호출하고 응답을 반환하는 함수"""
+# LLM 호출 요청 (단계 제너레이터가 yield하면 동기/비동기 실행기가 처리, 리스트로 yield하면 동시에 호출)
+# json_mode가 True면 JSON 객체로만 응답하도록 요청 (response_format=json_object)
+# kind는 실행 기록용 호출 종류 ("call": 첫 호출, "retry": 전체 프롬프트 재요청, "repair": 형식 수정 요청,
+# "escalation": 상위 모델 재판단), model이 None이면 state["model"] 사용
+# schema를 지정하면 그 스키마로 검증에 성공한 응답만 응답 캐시에 저장
+LLMCall = namedtuple("LLMCall", ["system_prompt", "user_prompt", "stage", "json_mode", "kind", "model", "schema"],
+                     defaults=(False, "call", None, None))
+
+# 헬퍼 함수: 단계별 모델 선택
+def get_stage_model(state: AgentState, stage: int) -> str:
+    """STAGE_MODEL_ROUTING에 단계별 모델이 지정되어 있으면 그 모델을, 아니면 state["model"]을 반환합니다."""
+    if STAGE_MODEL_ROUTING["enabled"]:
+        model = STAGE_MODEL_ROUTING["stage_models"].get(stage)
+        if model:
+            return model
+    return state.get("model", "gpt-4o")
+
+# 헬퍼 함수: 회사명
+def _state_company(state: AgentState) -> str:
+    """state["company"]가 없으면 첫 번째 검색 키워드를 회사명으로 사용합니다."""
+    keywords = state.get("keyword") or [""]
+    return state.get("company") or (keywords if isinstance(keywords, str) else keywords[0])
+
+# 헬퍼 함수: 단계 실패 기록
+def _report_stage_failure(state: AgentState, message: str) -> AgentState:
+    """
+    단계 오류를 reporter로 알리고 state["stage_errors"]에 남깁니다. (재시도 후에도 결과를 얻지 못한 경우)
+
+    뉴스가 없어 판단할 것이 없는 경우는 실패로 기록하지 않습니다.
+    배치 실행은 이 기록이 있는 회사를 실패로 판정합니다.
+    """
+    get_reporter(state).error(message)
+    state["stage_errors"] = list(state.get("stage_errors") or []) + [message]
+    return state
+
+# 헬퍼 함수: 기사 저장소
+def _get_article_store(state: AgentState):
+    """기사 저장소를 사용하도록 설정되어 있으면 저장소를, 아니면 None을 반환합니다."""
+    if not state.get("use_article_store", ARTICLE_STORE_SETTINGS["enabled"]):
+        return None
     try:
-        # LLM 초기화
-        llm = ChatOpenAI(
-            #openai_api_key=os.getenv("OPENAI_API_KEY"), #pwc
-            #openai_api_base=os.getenv("OPENAI_BASE_URL"), #pwc
-            #model_name = "openai.gpt-4.1-2025-04-14",
-            model_name=state.get("model", "gpt-4o"),
-            temperature=0.1,
-            #max_tokens=2000
+        return get_article_store(ARTICLE_STORE_SETTINGS["path"], ARTICLE_STORE_SETTINGS["verdict_ttl_days"])
+    except Exception as e:
+        print(f"[DEBUG] 기사 저장소를 열 수 없어 모든 뉴스를 새로 판단합니다: {str(e)}")
+        return None
+
+# 재시도 전 대기 요청 (초)
+Sleep = namedtuple("Sleep", ["seconds"])
+
+# 헬퍼 함수: 프롬프트 저장 및 출력
+def _record_prompts(state: AgentState, system_prompt: str, user_prompt: str, stage: int):
+    """단계별 프롬프트를 상태에 저장하고 디버그 출력합니다."""
+    if stage == 1:
+        state["system_prompt_1"] = system_prompt
+        state["user_prompt_1"] = user_prompt
+    elif stage == 2:
+        state["system_prompt_2"] = system_prompt
+        state["user_prompt_2"] = user_prompt
+    elif stage == 3:
+        state["system_prompt_3"] = system_prompt
+        state["user_prompt_3"] = user_prompt
+
+    # 디버그 출력
+    print(f"\n=== {stage}단계: 프롬프트 ===")
+    print("\n[System Prompt]:")
+    print(system_prompt)
+    print("\n[User Prompt]:")
+    print(user_prompt)
+
+# 헬퍼 함수: 응답 캐시 조회
+def _lookup_llm_cache(state: AgentState, model: str, temperature: float,
+                      system_prompt: str, user_prompt: str, stage: int, response_format: str = "",
+                      kind: str = "call", schema=None):
+    """
+    응답 캐시를 확인하여 (캐시, 캐시 키, 캐시된 응답 또는 None)을 반환합니다.
+
+    전체 프롬프트 재요청(kind="retry")은 같은 응답을 다시 받지 않도록 캐시를 확인하지 않고,
+    schema 검증에 실패하는 캐시 응답은 삭제하고 사용하지 않습니다.
+    """
+    if not state.get("use_llm_cache", LLM_CACHE_SETTINGS["enabled"]):
+        return None, None, None
+
+    cache = get_llm_cache(
+        LLM_CACHE_SETTINGS["path"],
+        ttl_seconds=LLM_CACHE_SETTINGS["ttl_seconds"],
+        max_entries=LLM_CACHE_SETTINGS["max_entries"]
+    )
+    cache_key = make_cache_key(model, temperature, system_prompt, user_prompt, response_format)
+    if kind == "retry":
+        return cache, cache_key, None
+    result = cache.get(cache_key)
+    if result is not None and not _is_cacheable(result, schema):
+        print(f"\n[DEBUG] {stage}단계: 스키마 검증에 실패하는 캐시 응답을 삭제하고 다시 호출")
+        cache.delete(cache_key)
+        return cache, cache_key, None
+    if result is not None:
+        print(f"\n[DEBUG] {stage}단계: 캐시된 LLM 응답 사용")
+    return cache, cache_key, result
+
+# 헬퍼 함수: 캐시 저장 가능 여부
+def _is_cacheable(result: str, schema=None) -> bool:
+    """응답이 비어 있지 않고 schema가 있으면 그 스키마로 검증에 성공하는지 확인합니다."""
+    if not result:
+        return False
+    if schema is None:
+        return True
+    try:
+        _validate_response(result, schema)
+        return True
+    except (json.JSONDecodeError, ValueError):
+        return False
+
+# 헬퍼 함수: 응답 저장 및 출력
+def _record_response(state: AgentState, result: str, stage: int):
+    """단계별 LLM 응답을 상태에 저장하고 디버그 출력합니다."""
+    if stage == 1:
+        state["llm_response_1"] = result
+    elif stage == 2:
+        state["llm_response_2"] = result
+    elif stage == 3:
+        state["llm_response_3"] = result
+        
+    print(f"\n=== {stage}단계: LLM 응답 ===")
+    print(result)
+
+# 헬퍼 함수: 호출 기록
+def _record_telemetry(state: AgentState, stage: int, kind: str, model: str, system_prompt: str,
+                      user_prompt: str, result: str, usage: dict, started: float, waited: float,
+                      cache_hit: bool = False, error: str = None):
+    """LLM 호출 하나의 토큰 수, 처리 시간, 재시도/캐시 사용 여부를 실행 로그에 남깁니다."""
+    if not TELEMETRY_SETTINGS["enabled"]:
+        return
+    try:
+        if error:
+            prompt_tokens, completion_tokens, token_source = 0, 0, "none"
+        elif cache_hit:
+            prompt_tokens, completion_tokens, token_source = 0, 0, "cache"
+        elif usage:
+            prompt_tokens = usage.get("input_tokens", 0)
+            completion_tokens = usage.get("output_tokens", 0)
+            token_source = "usage"
+        else:
+            # 응답 메타데이터에 사용량이 없으면 토크나이저로 추정
+            prompt_tokens = count_tokens(system_prompt, model) + count_tokens(user_prompt, model)
+            completion_tokens = count_tokens(result or "", model)
+            token_source = "estimate"
+
+        get_run_telemetry(state.get("run_id"), TELEMETRY_SETTINGS["log_dir"]).record(
+            _state_company(state), stage, model,
+            kind=kind,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            token_source=token_source,
+            wall_time=time.perf_counter() - started,
+            wait_time=waited,
+            cache_hit=cache_hit,
+            error=error
         )
+    except Exception as e:
+        print(f"[DEBUG] LLM 호출 기록 중 오류: {str(e)}")
+
+# 헬퍼 함수: 스트리밍 항목 전달
+def _stream_item_feeder(stage: int, on_item):
+    """
+    응답 조각을 받아 완성된 항목을 on_item(단계, 최상위 키, 항목)으로 전달하는 함수를 반환합니다.
+
+    형식 수정 요청이나 재시도 응답의 항목도 다시 전달되므로, 받는 쪽은 (단계, 키, 인덱스)로 덮어써야 합니다.
+    """
+    parser = JSONItemStream(STREAMING_SETTINGS["item_keys"])
+
+    def feed(text: str):
+        for key, item in parser.feed(text):
+            try:
+                on_item(stage, key, item)
+            except Exception as e:
+                print(f"[DEBUG] 스트리밍 항목 전달 중 오류: {str(e)}")
+
+    return feed
+
+# 헬퍼 함수: LLM 호출
+def call_llm(state: AgentState, system_prompt: str, user_prompt: str, stage: int = 1,
+             json_mode: bool = False, kind: str = "call", model: str = None, schema=None) -> str:
+    """
+    LLM을 호출하고 응답을 반환하는 함수 (json_mode면 JSON 객체 응답을 요청, model을 생략하면 state["model"] 사용)
+
+    schema를 지정하면 그 스키마로 검증에 성공한 응답만 응답 캐시에 저장합니다.
 
-        # 메시지 구성
+    state["on_stream_item"] 콜백이 있으면 응답을 스트리밍으로 받아 항목이 완성될 때마다 전달합니다.
+    호출마다 토큰 수와 처리 시간을 실행 로그(telemetry)에 기록합니다.
+    """
+    started = time.perf_counter()
+    waited = 0.0
+    try:
+        model = model or state.get("model", "gpt-4o")
+        temperature = 0.1
+
+        # 공유 레지스트리에서 LLM 클라이언트 가져오기 (커넥션 풀 재사용)
+        llm = get_llm(model, temperature=temperature)
+        response_format = "json_object" if json_mode else ""
+        on_item = state.get("on_stream_item")
+        if json_mode:
+            llm = llm.bind(response_format={"type": response_format})
+
+        # 메시지 구성 (LangChain은 첫 호출 시에만 불러옴)
+        from langchain_core.messages import HumanMessage, SystemMessage
         messages = [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
 
         # 프롬프트 저장
-        if stage == 1:
-            state["system_prompt_1"] = system_prompt
-            state["user_prompt_1"] = user_prompt
-        elif stage == 2:
-            state["system_prompt_2"] = system_prompt
-            state["user_prompt_2"] = user_prompt
-        elif stage == 3:
-            state["system_prompt_3"] = system_prompt
-            state["user_prompt_3"] = user_prompt
-
-        # 디버그 출력
-        print(f"\n=== {stage}단계: 프롬프트 ===")
-        print("\n[System Prompt]:")
-        print(system_prompt)
-        print("\n[User Prompt]:")
-        print(user_prompt)
+        _record_prompts(state, system_prompt, user_prompt, stage)
+
+        # 응답 캐시 확인 (같은 모델/프롬프트면 저장된 응답 사용)
+        cache, cache_key, result = _lookup_llm_cache(state, model, temperature, system_prompt, user_prompt,
+                                                     stage, response_format, kind, schema)
 
         # LLM 호출
-        result = llm.invoke(messages).content
+        cache_hit = result is not None
+        usage = None
+        if result is None:
+            # 전체 회사를 합친 LLM 동시 호출 수 제한
+            wait_started = time.perf_counter()
+            with get_llm_registry().semaphore:
+                waited = time.perf_counter() - wait_started
+                if on_item:
+                    # 스트리밍 (응답 조각을 증분 파서에 전달, 사용량은 마지막 조각에 포함)
+                    feed = _stream_item_feeder(stage, on_item)
+                    parts = []
+                    for chunk in llm.stream(messages):
+                        parts.append(chunk.content)
+                        usage = chunk.usage_metadata or usage
+                        feed(chunk.content)
+                    result = "".join(parts)
+                else:
+                    response = llm.invoke(messages)
+                    result = response.content
+                    usage = response.usage_metadata
+            # 검증에 실패한 응답은 저장하지 않음 (재시도/다음 실행에서 같은 응답을 다시 받지 않도록)
+            if cache and _is_cacheable(result, schema):
+                cache.put(cache_key, model, result)
+        elif on_item:
+            # 캐시된 응답도 항목 단위로 전달
+            _stream_item_feeder(stage, on_item)(result)
         
         # 응답 저장
-        if stage == 1:
-            state["llm_response_1"] = result
-        elif stage == 2:
-            state["llm_response_2"] = result
-        elif stage == 3:
-            state["llm_response_3"] = result
-            
-        print(f"\n=== {stage}단계: LLM 응답 ===")
-        print(result)
+        _record_response(state, result, stage)
+        _record_telemetry(state, stage, kind, model, system_prompt, user_prompt, result, usage, started, waited,
+                          cache_hit=cache_hit)
         
         return result
     
     except Exception as e:
-        st.error(f"LLM 호출 중 오류가 발생했습니다: {str(e)}")
+        _record_telemetry(state, stage, kind, model or state.get("model", "gpt-4o"), system_prompt, user_prompt,
+                          "", None, started, waited, error=str(e))
+        get_reporter(state).error(f"LLM 호출 중 오류가 발생했습니다: {str(e)}")
         return ""
 
+# 헬퍼 함수: 비동기 LLM 호출
+async def acall_llm(state: AgentState, system_prompt: str, user_prompt: str, stage: int = 1,
+                    json_mode: bool = False, kind: str = "call", model: str = None, schema=None) -> str:
+    """call_llm의 비동기 버전 (ainvoke 사용, 대기 중에 이벤트 루프를 점유하지 않음)"""
+    started = time.perf_counter()
+    waited = 0.0
+    try:
+        model = model or state.get("model", "gpt-4o")
+        temperature = 0.1
+
+        # 공유 레지스트리에서 LLM 클라이언트 가져오기 (비동기 커넥션 풀 재사용)
+        llm = get_llm(model, temperature=temperature)
+        response_format = "json_object" if json_mode else ""
+        on_item = state.get("on_stream_item")
+        if json_mode:
+            llm = llm.bind(response_format={"type": response_format})
+
+        # 메시지 구성 (LangChain은 첫 호출 시에만 불러옴)
+        from langchain_core.messages import HumanMessage, SystemMessage
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+
+        # 프롬프트 저장
+        _record_prompts(state, system_prompt, user_prompt, stage)
+
+        # 응답 캐시 확인 (같은 모델/프롬프트면 저장된 응답 사용)
+        cache, cache_key, result = _lookup_llm_cache(state, model, temperature, system_prompt, user_prompt,
+                                                     stage, response_format, kind, schema)
+
+        # LLM 호출
+        cache_hit = result is not None
+        usage = None
+        if result is None:
+            # 이벤트 루프별 LLM 동시 호출 수 제한
+            wait_started = time.perf_counter()
+            async with get_llm_registry().async_semaphore():
+                waited = time.perf_counter() - wait_started
+                if on_item:
+                    # 스트리밍 (응답 조각을 증분 파서에 전달, 사용량은 마지막 조각에 포함)
+                    feed = _stream_item_feeder(stage, on_item)
+                    parts = []
+                    async for chunk in llm.astream(messages):
+                        parts.append(chunk.content)
+                        usage = chunk.usage_metadata or usage
+                        feed(chunk.content)
+                    result = "".join(parts)
+                else:
+                    response = await llm.ainvoke(messages)
+                    result = response.content
+                    usage = response.usage_metadata
+            # 검증에 실패한 응답은 저장하지 않음 (재시도/다음 실행에서 같은 응답을 다시 받지 않도록)
+            if cache and _is_cacheable(result, schema):
+                cache.put(cache_key, model, result)
+        elif on_item:
+            # 캐시된 응답도 항목 단위로 전달
+            _stream_item_feeder(stage, on_item)(result)
+
+        # 응답 저장
+        _record_response(state, result, stage)
+        _record_telemetry(state, stage, kind, model, system_prompt, user_prompt, result, usage, started, waited,
+                          cache_hit=cache_hit)
+
+        return result
+
+    except Exception as e:
+        _record_telemetry(state, stage, kind, model or state.get("model", "gpt-4o"), system_prompt, user_prompt,
+                          "", None, started, waited, error=str(e))
+        get_reporter(state).error(f"LLM 호출 중 오류가 발생했습니다: {str(e)}")
+        return ""
+
+# 헬퍼 함수: 단계 실행기
+def run_stage(steps: Generator, state: AgentState) -> AgentState:
+    """단계 제너레이터가 요청하는 LLM 호출/대기를 동기로 처리하고 최종 상태를 반환합니다."""
+    try:
+        request = next(steps)
+        while True:
+            if isinstance(request, LLMCall):
+                response = call_llm(state, request.system_prompt, request.user_prompt, stage=request.stage,
+                                    json_mode=request.json_mode, kind=request.kind, model=request.model,
+                                    schema=request.schema)
+            elif isinstance(request, list):
+                # 여러 호출을 동시에 실행 (각 호출은 상태 사본에 프롬프트/응답 기록)
+                with ThreadPoolExecutor(max_workers=len(request)) as executor:
+                    response = list(executor.map(
+                        lambda call: call_llm(dict(state), call.system_prompt, call.user_prompt, stage=call.stage,
+                                              json_mode=call.json_mode, kind=call.kind, model=call.model,
+                                              schema=call.schema),
+                        request
+                    ))
+            else:
+                time.sleep(request.seconds)
+                response = None
+            request = steps.send(response)
+    except StopIteration as stop:
+        return stop.value
+
+async def arun_stage(steps: Generator, state: AgentState) -> AgentState:
+    """단계 제너레이터가 요청하는 LLM 호출/대기를 비동기로 처리하고 최종 상태를 반환합니다."""
+    try:
+        request = next(steps)
+        while True:
+            if isinstance(request, LLMCall):
+                response = await acall_llm(state, request.system_prompt, request.user_prompt, stage=request.stage,
+                                           json_mode=request.json_mode, kind=request.kind, model=request.model,
+                                           schema=request.schema)
+            elif isinstance(request, list):
+                # 여러 호출을 동시에 실행 (각 호출은 상태 사본에 프롬프트/응답 기록)
+                response = list(await asyncio.gather(*(
+                    acall_llm(dict(state), call.system_prompt, call.user_prompt, stage=call.stage,
+                              json_mode=call.json_mode, kind=call.kind, model=call.model, schema=call.schema)
+                    for call in request
+                )))
+            else:
+                await asyncio.sleep(request.seconds)
+                response = None
+            request = steps.send(response)
+    except StopIteration as stop:
+        return stop.value
+
 # 헬퍼 함수: JSON 파싱
 def parse_json_response(response: str) -> dict:
     """LLM 응답에서 JSON을 추출하고 파싱하는 함수"""
@@ -164,6 +509,121 @@ def parse_json_response(response: str) -> dict:
         print(f"원본 응답: {response}")
         raise e
 
+# 헬퍼 함수: 응답 스키마 검증
+def _validate_response(response: str, schema) -> dict:
+    """LLM 응답을 JSON으로 파싱하고 단계별 스키마로 검증합니다. (실패 시 JSONDecodeError/ValueError)"""
+    return validate_output(parse_json_response(response), schema)
+
+# 헬퍼 함수: 형식 수정 요청 생성
+def _build_repair_call(response: str, error: Exception, schema, stage: int, model: str = None) -> LLMCall:
+    """스키마 검증에 실패한 응답을 형식만 바로잡도록 요청하는 LLMCall (뉴스 목록 등 원래 프롬프트는 다시 보내지 않음)"""
+    system_prompt = "당신은 JSON 응답 형식을 바로잡는 도우미입니다. 응답의 내용은 바꾸지 말고, 주어진 JSON 스키마에 맞는 JSON 객체만 반환합니다."
+    repair_prompt = f"""아래 응답이 요구된 JSON 스키마 검증에 실패했습니다.
+응답에 담긴 내용(인덱스, 제목, 사유 등)은 그대로 유지하고 형식만 스키마에 맞게 고쳐서 JSON 객체로만 응답해주세요.
+
+[검증 오류]
+{str(error)}
+
+[JSON 스키마]
+{schema_description(schema)}
+
+[원래 응답]
+{response}"""
+    return LLMCall(system_prompt, repair_prompt, stage, STRUCTURED_OUTPUT_SETTINGS["json_mode"], "repair", model,
+                   schema)
+
+# 헬퍼 함수: 응답 검증 및 형식 수정
+def _validate_responses(state: AgentState, responses: List[str], schema, stage: int,
+                        model: str = None) -> Generator:
+    """
+    응답 목록을 스키마로 검증하고, 검증에 실패한 응답은 전체 프롬프트를 다시 보내는 대신
+    오류와 원래 응답만 담은 형식 수정 요청으로 바로잡습니다. (수정 요청이 여러 개면 동시에 호출,
+    형식 수정은 원래 응답을 만든 model로 요청)
+
+    Returns:
+        List[tuple]: 응답별 (검증된 dict 또는 None, 최종 응답, 마지막 오류 또는 None)
+    """
+    outcomes = []
+    for response in responses:
+        try:
+            outcomes.append((_validate_response(response, schema), response, None))
+        except (json.JSONDecodeError, ValueError) as e:
+            outcomes.append((None, response, e))
+
+    for _ in range(STRUCTURED_OUTPUT_SETTINGS["max_repair_attempts"]):
+        # 빈 응답(LLM 호출 오류)은 고칠 내용이 없으므로 전체 프롬프트 재요청에 맡김
+        failed = [i for i, (data, response, error) in enumerate(outcomes) if data is None and response]
+        if not failed:
+            break
+        print(f"\n[DEBUG] {stage}단계: 스키마 검증 실패 응답 {len(failed)}개 형식 수정 요청")
+        calls = [_build_repair_call(outcomes[i][1], outcomes[i][2], schema, stage, model) for i in failed]
+        if len(calls) == 1:
+            original_prompt = state.get(f"user_prompt_{stage}", "")
+            repaired = [(yield calls[0])]
+            # 디버그 정보에 원래 프롬프트와 수정 요청을 함께 남김
+            state[f"user_prompt_{stage}"] = f"{original_prompt}\n\n[형식 수정 요청]\n{calls[0].user_prompt}"
+        else:
+            repaired = yield calls
+
+        for i, response in zip(failed, repaired):
+            try:
+                outcomes[i] = (_validate_response(response, schema), response, None)
+            except (json.JSONDecodeError, ValueError) as e:
+                outcomes[i] = (None, response or outcomes[i][1], e)
+
+    return outcomes
+
+# 헬퍼 함수: 검색어 정규화
+def normalize_query(keyword: str) -> str:
+    """같은 검색어를 한 번만 요청하도록 공백과 대소문자를 정규화하는 함수"""
+    return re.sub(r'\s+', ' ', keyword.strip()).lower()
+
+# 헬퍼 함수: 검색 계획 생성
+def build_fetch_plan(company_keywords: Dict[str, List[str]]) -> Dict[str, str]:
+    """회사별 연관 키워드 전체에서 중복을 제거해 {정규화된 검색어: 실제 검색어} 계획을 만드는 함수"""
+    plan = {}
+    for keywords in company_keywords.values():
+        for kw in keywords:
+            key = normalize_query(kw)
+            if key and key not in plan:
+                plan[key] = kw.strip()
+    return plan
+
+# 헬퍼 함수: 검색 계획 실행
+def search_fetch_plan(plan: Dict[str, str], max_results: int = 100, max_workers: int = 8,
+                      use_feed_cache: bool = True, start_datetime: datetime = None,
+                      end_datetime: datetime = None) -> Dict[str, List[dict]]:
+    """검색 계획의 고유 검색어를 한 번씩 동시에 검색하여 {정규화된 검색어: 결과}를 반환하는 함수 (기간은 검색 쿼리에 포함)"""
+    # 피드 캐시 설정 (재실행 시 네트워크 요청 최소화)
+    feed_cache = None
+    if use_feed_cache:
+        feed_cache = get_feed_cache(
+            FEED_CACHE_SETTINGS["path"],
+            ttl_seconds=FEED_CACHE_SETTINGS["ttl_seconds"],
+            max_entries=FEED_CACHE_SETTINGS["max_entries"]
+        )
+
+    # GoogleNews 객체 생성 (동시 요청 수 상한 적용)
+    news = GoogleNews(max_workers=max_workers, cache=feed_cache)
+    results = news.search_many(list(plan.values()), k=max_results,
+                               start=start_datetime, end=end_datetime)
+
+    if feed_cache:
+        print(f"피드 캐시 통계: {feed_cache.stats}")
+
+    return dict(zip(plan.keys(), results))
+
+# 여러 회사 공통 뉴스 사전 수집 함수
+def prefetch_news(company_keywords: Dict[str, List[str]], max_workers: int = 8,
+                  use_feed_cache: bool = True, start_datetime: datetime = None,
+                  end_datetime: datetime = None) -> Dict[str, List[dict]]:
+    """선택된 모든 회사의 검색어를 중복 없이 한 번씩만 수집하는 함수 (결과는 state의 prefetched_news로 전달)"""
+    plan = build_fetch_plan(company_keywords)
+    total_keywords = sum(len(keywords) for keywords in company_keywords.values())
+    print(f"전체 검색어 {total_keywords}개 중 고유 검색어 {len(plan)}개 수집 중...")
+    return search_fetch_plan(plan, max_workers=max_workers, use_feed_cache=use_feed_cache,
+                             start_datetime=start_datetime, end_datetime=end_datetime)
+
 # 뉴스 수집기 함수
 def collect_news(state: AgentState) -> AgentState:
     """뉴스를 수집하는 함수"""
@@ -178,23 +638,34 @@ def collect_news(state: AgentState) -> AgentState:
         start_datetime = state.get("start_datetime")
         end_datetime = state.get("end_datetime")
         
-        # GoogleNews 객체 생성
-        news = GoogleNews()
-        
         # keyword가 문자열이면 리스트로 변환, 아니면 그대로 사용
         if isinstance(keyword, str):
             keywords_to_search = [keyword]
         else:
             keywords_to_search = keyword
-        
+
+        # 여러 회사가 함께 미리 수집한 결과가 있으면 재사용하고, 없는 검색어만 새로 검색
+        search_results = dict(state.get("prefetched_news") or {})
+        plan = build_fetch_plan({"keyword": keywords_to_search})
+        missing_plan = {key: kw for key, kw in plan.items() if key not in search_results}
+        if missing_plan:
+            print(f"키워드 {len(missing_plan)}개 동시 검색 중...")
+            search_results.update(search_fetch_plan(
+                missing_plan,
+                max_results=max_results,
+                max_workers=state.get("fetch_max_workers", 8),
+                use_feed_cache=state.get("use_feed_cache", FEED_CACHE_SETTINGS["enabled"]),
+                start_datetime=start_datetime,
+                end_datetime=end_datetime
+            ))
+
         # 모든 키워드에 대한 뉴스 수집
         all_news_data = []
-        
-        # 각 키워드별로 뉴스 검색 및 결과 병합
+
+        # 키워드 순서대로 결과 병합 (항목은 회사별로 수정되므로 복사해서 사용)
         for kw in keywords_to_search:
-            print(f"키워드 '{kw}' 검색 중...")
-            news_results = news.search_by_keyword(kw, k=max_results)
-            all_news_data.extend(news_results)
+            news_results = search_results.get(normalize_query(kw), [])
+            all_news_data.extend(dict(news_item) for news_item in news_results)
             print(f"키워드 '{kw}' 검색 결과: {len(news_results)}개")
         
         # 중복 URL 제거 (같은 URL이면 중복으로 간주)
@@ -211,6 +682,12 @@ def collect_news(state: AgentState) -> AgentState:
         
         # 날짜 필터링
         if start_datetime and end_datetime:
+            # 시간대 정보가 없는 범위는 KST로 간주
+            if start_datetime.tzinfo is None:
+                start_datetime = start_datetime.replace(tzinfo=KST)
+            if end_datetime.tzinfo is None:
+                end_datetime = end_datetime.replace(tzinfo=KST)
+            
             print(f"\n=== 날짜 필터링 시작 ===")
             print(f"필터링 범위: {start_datetime} ~ {end_datetime}")
             
@@ -225,77 +702,33 @@ def collect_news(state: AgentState) -> AgentState:
             }
             
             for news_item in unique_news_data:
-                try:
-                    # 뉴스 날짜 파싱
-                    news_date_str = news_item.get('date', '')
-                    if not news_date_str:
-                        date_parsing_stats["no_date"] += 1
-                        # 날짜 정보가 없는 뉴스는 포함 (최신 뉴스일 가능성)
-                        filtered_news.append(news_item)
-                        continue
-                    
-                    news_date = None
-                    
-                    # 다양한 날짜 형식 처리 (우선순위 순)
-                    date_formats = [
-                        '%a, %d %b %Y %H:%M:%S %Z',      # GMT 형식: Mon, 01 Jan 2024 12:00:00 GMT
-                        '%a, %d %b %Y %H:%M:%S GMT',     # GMT 형식 (명시적)
-                        '%Y-%m-%d %H:%M:%S',             # YYYY-MM-DD HH:MM:SS
-                        '%Y-%m-%d',                      # YYYY-MM-DD
-                        '%Y년 %m월 %d일',                # 한국어 형식
-                        '%m/%d/%Y',                      # MM/DD/YYYY
-                        '%d/%m/%Y',                      # DD/MM/YYYY
-                        '%Y.%m.%d',                      # YYYY.MM.DD
-                        '%m.%d.%Y',                      # MM.DD.YYYY
-                    ]
-                    
-                    for date_format in date_formats:
-                        try:
-                            news_date = datetime.strptime(news_date_str, date_format)
-                            break
-                        except ValueError:
-                            continue
-                    
-                    if news_date is None:
-                        date_parsing_stats["parse_failed"] += 1
-                        print(f"날짜 파싱 실패: '{news_date_str}' - 포함하여 처리")
-                        # 파싱 실패한 뉴스도 포함 (최신 뉴스일 가능성)
-                        filtered_news.append(news_item)
-                        continue
-                    
-                    date_parsing_stats["parse_success"] += 1
-                    
-                    # GMT 시간대 변환 전 날짜 기록
-                    original_news_date = news_date
-                    
-                    # 시간대 처리: GMT 시간을 한국 시간(KST)으로 변환
-                    if 'GMT' in news_date_str or 'Z' in news_date_str:
-                        # GMT 시간에 9시간 추가하여 KST로 변환
-                        news_date = news_date + timedelta(hours=9)
-                        # 첫 몇 개 뉴스에 대해서만 변환 정보 출력
-                        if date_parsing_stats["parse_success"] <= 3:
-                            print(f"GMT→KST 변환: {original_news_date} → {news_date}")
-                    
-                    # 파싱된 날짜에 KST 시간대 추가 (시간대가 없는 경우)
-                    if news_date.tzinfo is None:
-                        news_date = news_date.replace(tzinfo=KST)
-                    
-                    # 시간까지 고려한 정확한 범위 체크 (08:00 기준)
-                    if start_datetime <= news_date <= end_datetime:
-                        date_parsing_stats["in_range"] += 1
-                        filtered_news.append(news_item)
-                    else:
-                        date_parsing_stats["out_of_range"] += 1
-                        # 범위 외 뉴스 중 첫 몇 개만 출력
-                        if date_parsing_stats["out_of_range"] <= 3:
-                            print(f"시간 범위 외: {news_date} (범위: {start_datetime} ~ {end_datetime})")
-                        
-                except Exception as e:
+                # 수집 시 정규화된 KST 발행일 사용 (없으면 문자열을 한 번만 파싱)
+                news_date_str = news_item.get('date', '')
+                if not news_date_str and not news_item.get('published_at'):
+                    date_parsing_stats["no_date"] += 1
+                    # 날짜 정보가 없는 뉴스는 포함 (최신 뉴스일 가능성)
+                    filtered_news.append(news_item)
+                    continue
+                
+                news_date = news_published_at(news_item)
+                if news_date is None:
                     date_parsing_stats["parse_failed"] += 1
-                    print(f"날짜 처리 오류: {e} - 뉴스 포함하여 처리")
-                    # 오류 발생한 뉴스도 포함
+                    # 파싱 실패한 뉴스도 포함 (최신 뉴스일 가능성)
                     filtered_news.append(news_item)
                     continue
+                
+                date_parsing_stats["parse_success"] += 1
+                news_item["published_at"] = news_date
+                
+                # 시간까지 고려한 정확한 범위 체크 (08:00 기준)
+                if start_datetime <= news_date <= end_datetime:
+                    date_parsing_stats["in_range"] += 1
+                    filtered_news.append(news_item)
+                else:
+                    date_parsing_stats["out_of_range"] += 1
+                    # 범위 외 뉴스 중 첫 몇 개만 출력
+                    if date_parsing_stats["out_of_range"] <= 3:
+                        print(f"시간 범위 외: {news_date} (범위: {start_datetime} ~ {end_datetime})")
             
             unique_news_data = filtered_news
             
@@ -327,7 +760,7 @@ def collect_news(state: AgentState) -> AgentState:
         return state
     except Exception as e:
         print(f"뉴스 수집 중 오류 발생: {e}")
-        return state
+        return _report_stage_failure(state, f"뉴스 수집 중 오류가 발생했습니다: {str(e)}")
 
 def filter_valid_press(state: AgentState) -> AgentState:
     """유효 언론사 필터링"""
@@ -336,28 +769,12 @@ def filter_valid_press(state: AgentState) -> AgentState:
     # UI에서 설정한 유효 언론사 목록 가져오기
     valid_press_dict_str = state.get("valid_press_dict", "")
     
-    # UI 설정 값이 문자열이면 딕셔너리로 파싱
+    # UI 설정 값이 문자열이면 파싱 (같은 내용은 한 번만 파싱됨)
     valid_press_config = {}
     if isinstance(valid_press_dict_str, str) and valid_press_dict_str.strip():
-        print("\n[DEBUG] UI에서 설정한 언론사 문자열 파싱 시작")
-        try:
-            # 문자열에서 딕셔너리 파싱
-            lines = valid_press_dict_str.strip().split('\n')
-            for line in lines:
-                line = line.strip()
-                if line and ': ' in line:
-                    press_name, aliases_str = line.split(':', 1)
-                    try:
-                        # 문자열 형태의 리스트를 실제 리스트로 변환
-                        aliases = eval(aliases_str.strip())
-                        valid_press_config[press_name.strip()] = aliases
-                        print(f"[DEBUG] 파싱 성공: {press_name.strip()} -> {aliases}")
-                    except Exception as e:
-                        print(f"[DEBUG] 파싱 실패: {line}, 오류: {str(e)}")
-        except Exception as e:
-            print(f"[DEBUG] 전체 파싱 실패: {str(e)}")
-    # UI 설정 값이 이미 딕셔너리면 그대로 사용
-    elif isinstance(valid_press_dict_str, dict):
+        valid_press_config = parse_press_config(valid_press_dict_str)
+    # UI 설정 값이 이미 딕셔너리(또는 PressConfig)면 그대로 사용
+    elif isinstance(valid_press_dict_str, Mapping):
         valid_press_config = valid_press_dict_str
         print("\n[DEBUG] UI에서 설정한 언론사 딕셔너리 직접 사용")
     
@@ -371,86 +788,21 @@ def filter_valid_press(state: AgentState) -> AgentState:
     for press, aliases in valid_press_config.items():
         print(f"- {press}: {aliases}")
     
-    # 문자열 정규화 함수
-    def normalize_string(s):
-        """문자열을 정규화하여 비교하기 쉽게 만듭니다."""
-        if not s:
-            return ""
-        # 소문자로 변환, 선행/후행 공백 제거, 연속된 공백을 하나로 변환
-        return re.sub(r'\s+', ' ', s.lower().strip())
+    # 설정별로 한 번만 컴파일된 매처 사용 (회사/재평가 간 재사용)
+    matcher = get_press_matcher(valid_press_config)
     
     # 유효 언론사 뉴스 필터링 함수
     def filter_news(news_list):
         valid_news = []
         for i, news in enumerate(news_list):
-            # 원본 데이터 저장
-            original_press = news.get("press", "")
-            original_url = news.get("url", "")
-            
-            # 정규화된 값 생성
-            press = normalize_string(original_press)
-            url = normalize_string(original_url)
+            match = matcher.match(news.get("press", ""), news.get("url", ""))
             
-            print(f"\n=== 뉴스 #{i+1} 필터링 검사 ===")
-            print(f"제목: {news.get('content', '제목 없음')}")
-            print(f"언론사: '{original_press}' (정규화: '{press}')")
-            print(f"URL: {original_url}")
-            domain = urlparse(url).netloc
-            print(f"도메인: {domain}")
-            
-            # 언론사명이나 URL이 신뢰할 수 있는 언론사 목록에 포함되는지 확인
-            is_valid = False
-            matched_press = None
-            matched_alias = None
-            
-            for main_press, aliases in valid_press_config.items():
-                # 별칭들도 정규화
-                normalized_aliases = [normalize_string(alias) for alias in aliases]
-                
-                # 디버깅을 위한 상세 출력
-                press_match_found = False
-                domain_match_found = False
-                
-                # 1. 언론사명 매칭 검사 - 완전 일치 또는 포함 관계 확인
-                for alias in normalized_aliases:
-                    if press == alias or press in alias or alias in press:
-                        press_match_found = True
-                        matched_press = main_press
-                        matched_alias = alias
-                        print(f"✓ 언론사명 매칭 성공: '{press}' 매칭됨 '{alias}' (언론사: {main_press})")
-                        is_valid = True
-                        break
-                
-                # 2. URL 도메인 매칭 검사 (언론사명으로 매칭되지 않은 경우)
-                if not is_valid:
-                    for alias in normalized_aliases:
-                        if domain and (alias in domain or domain in alias):
-                            domain_match_found = True
-                            matched_press = main_press
-                            matched_alias = alias
-                            print(f"✓ 도메인 매칭 성공: '{domain}' 매칭됨 '{alias}' (언론사: {main_press})")
-                            is_valid = True
-                            break
-                
-                if not press_match_found and not domain_match_found:
-                    # 매칭 실패 정보 출력 (너무 상세한 로그는 제거)
-                    # print(f"✗ '{main_press}'의 별칭들과 매칭 실패: {aliases}")
-                    pass
-                
-                if is_valid:
-                    break
-            
-            if is_valid:
-                print(f"✅ 결과: 유효한 언론사 '{matched_press}'로 인식됨 (매칭된 별칭: '{matched_alias}')")
+            if match:
                 # 매칭된 정보 추가
-                news["matched_press"] = matched_press
-                news["matched_alias"] = matched_alias
+                news["matched_press"], news["matched_alias"] = match
                 valid_news.append(news)
             else:
-                print(f"❌ 결과: 유효하지 않은 언론사로 인식됨")
-                # 실패한 경우 상세 로그
-                print(f"[DEBUG] 실패 세부 정보 - 언론사: '{press}', 도메인: '{domain}'")
-                print(f"[DEBUG] 사용 중인 유효 언론사 목록의 키: {list(valid_press_config.keys())}")
+                print(f"❌ 뉴스 #{i+1} 유효하지 않은 언론사: '{news.get('press', '')}' - {news.get('content', '제목 없음')}")
         
         return valid_news
     
@@ -481,9 +833,104 @@ def filter_valid_press(state: AgentState) -> AgentState:
     state["news_data"] = valid_press_news
     return state
 
+# 헬퍼 함수: 제외 판단 청크 분할
+def split_exclusion_chunks(news_data: List[dict], model: str) -> List[List[dict]]:
+    """뉴스 목록을 EXCLUSION_CHUNK_SETTINGS의 토큰 예산/최대 개수에 맞는 청크로 나눕니다."""
+    if not EXCLUSION_CHUNK_SETTINGS["enabled"]:
+        return [news_data]
+
+    lines = [
+        f"{news.get('original_index')}. {news['content']} ({news.get('press', '알 수 없음')})\n"
+        for news in news_data
+    ]
+    ranges = chunk_by_token_budget(
+        lines,
+        EXCLUSION_CHUNK_SETTINGS["chunk_token_budget"],
+        EXCLUSION_CHUNK_SETTINGS["max_items_per_chunk"],
+        model
+    )
+    return [news_data[start:end] for start, end in ranges]
+
+# 헬퍼 함수: 인덱스 정규화
+def _to_index(value):
+    """LLM 응답의 인덱스(숫자 또는 숫자 문자열)를 정수로 변환합니다. (변환할 수 없으면 None)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+# 헬퍼 함수: 제외 판단 결과 병합
+def merge_exclusion_results(chunks: List[List[dict]], classifications: List[dict]) -> Dict[str, List[dict]]:
+    """
+    청크별 제외/보류/유지 분류 결과를 original_index 기준으로 병합합니다.
+
+    청크에 없는 인덱스는 무시하고, 같은 뉴스가 여러 카테고리에 있으면 유지 > 보류 > 제외 순으로
+    하나만 남깁니다. 어느 카테고리에도 없는 뉴스는 보류로 추가하여 모든 뉴스가 분류되도록 합니다.
+    """
+    merged = {"excluded": [], "borderline": [], "retained": []}
+    classified = set()
+
+    for chunk, classification in zip(chunks, classifications):
+        chunk_news = {news.get("original_index"): news for news in chunk}
+
+        for category in ["retained", "borderline", "excluded"]:
+            for item in (classification or {}).get(category, []):
+                original_index = _to_index(item.get("index"))
+                if original_index not in chunk_news:
+                    print(f"[DEBUG] 분류 결과의 알 수 없는 인덱스 무시: {item.get('index')}")
+                    continue
+                if original_index in classified:
+                    continue
+                # 상태 업데이트 시 원래 인덱스 유지
+                item["index"] = original_index
+                item["original_index"] = original_index
+                classified.add(original_index)
+                merged[category].append(item)
+
+        for original_index, news in chunk_news.items():
+            if original_index not in classified:
+                merged["borderline"].append({
+                    "index": original_index,
+                    "title": news.get("content", ""),
+                    "reason": "분류 결과에서 누락되어 보류로 처리",
+                    "original_index": original_index,
+                    "unclassified": True
+                })
+                classified.add(original_index)
+
+    return merged
+
+# 헬퍼 함수: 상위 모델 재판단 대상 선택
+def select_escalation_targets(merged: Dict[str, List[dict]], categories: List[str],
+                              min_confidence: float) -> List[int]:
+    """
+    저가 모델의 분류 결과 중 categories에 속하거나 확신도(confidence)가 min_confidence보다 낮은
+    뉴스의 original_index 목록을 반환합니다. (확신도를 응답하지 않은 항목은 분류만으로 판단)
+    """
+    targets = []
+    for category in ["excluded", "borderline", "retained"]:
+        for item in merged.get(category, []):
+            confidence = item.get("confidence")
+            if category in categories or (confidence is not None and confidence < min_confidence):
+                targets.append(item["original_index"])
+    return targets
+
+# 헬퍼 함수: 상위 모델 재판단 결과 반영
+def apply_escalation(merged: Dict[str, List[dict]], reclassified: Dict[str, List[dict]]) -> Dict[str, List[dict]]:
+    """재판단한 뉴스의 기존 분류를 상위 모델의 분류로 교체합니다. (재판단 항목에는 escalated 표시)"""
+    escalated = {item["original_index"] for items in reclassified.values() for item in items}
+    result = {}
+    for category in ["excluded", "borderline", "retained"]:
+        kept = [item for item in merged.get(category, []) if item["original_index"] not in escalated]
+        for item in reclassified.get(category, []):
+            item["escalated"] = True
+            kept.append(item)
+        result[category] = kept
+    return result
+
 # 1단계: 뉴스 제외 판단
-def filter_excluded_news(state: AgentState) -> AgentState:
-    """뉴스를 제외/보류/유지로 분류하는 함수"""
+def _exclusion_steps(state: AgentState) -> Generator:
+    """뉴스를 제외/보류/유지로 분류하는 단계 (LLM 호출은 LLMCall로 요청)"""
     try:
         # 시스템 프롬프트 설정
         system_prompt = state.get("system_prompt_1", "당신은 회계법인의 뉴스 분석 전문가입니다. 뉴스의 중요성을 판단하여 제외/보류/유지로 분류하는 작업을 수행합니다. 특히 회계법인의 관점에서 중요하지 않은 뉴스(예: 단순 홍보, CSR 활동, 이벤트 등)를 식별하고, 회계 감리나 재무 관련 이슈는 반드시 유지하도록 합니다.")
@@ -491,18 +938,20 @@ def filter_excluded_news(state: AgentState) -> AgentState:
         # 뉴스 데이터 준비
         news_data = state.get("news_data", [])
         if not news_data:
-            st.error("분석할 뉴스가 없습니다.")
+            get_reporter(state).error("분석할 뉴스가 없습니다.")
             return state
             
-        # 뉴스 목록 문자열 생성 - 원래 인덱스 사용
-        news_list = ""
-        for news in news_data:
-            press = news.get('press', '알 수 없음')
-            original_index = news.get('original_index')
-            news_list += f"{original_index}. {news['content']} ({press})\n"
-            
-        # 제외 판단 프롬프트
-        exclusion_prompt = f"""아래 뉴스 목록을 회계법인의 관점에서 분석하여 제외/보류/유지로 분류해주세요.
+        # 청크별 제외 판단 프롬프트 생성
+        def build_exclusion_prompt(chunk):
+            # 뉴스 목록 문자열 생성 - 원래 인덱스 사용
+            news_list = ""
+            for news in chunk:
+                press = news.get('press', '알 수 없음')
+                original_index = news.get('original_index')
+                news_list += f"{original_index}. {news['content']} ({press})\n"
+                
+            # 제외 판단 프롬프트
+            exclusion_prompt = f"""아래 뉴스 목록을 회계법인의 관점에서 분석하여 제외/보류/유지로 분류해주세요.
 각 뉴스의 번호는 고유 식별자이므로 변경하지 말고 그대로 응답에 사용해주세요.
 
 [뉴스 목록]
@@ -515,6 +964,7 @@ def filter_excluded_news(state: AgentState) -> AgentState:
 1. 제외/보류/유지 사유는 간단명료하게 작성
 2. 각 카테고리별 최대 20개까지만 포함
 3. 응답은 완전한 JSON 형식이어야 함
+4. 각 판단의 확신도를 0~1 사이 숫자(confidence)로 작성
 
 다음과 같은 JSON 형식으로 응답해주세요:
 {{
@@ -522,73 +972,238 @@ def filter_excluded_news(state: AgentState) -> AgentState:
     {{
       "index": 1,
       "title": "뉴스 제목",
-      "reason": "제외 사유"
+      "reason": "제외 사유",
+      "confidence": 0.9
     }}
   ],
   "borderline": [
     {{
       "index": 2,
       "title": "뉴스 제목",
-      "reason": "보류 사유"
+      "reason": "보류 사유",
+      "confidence": 0.5
     }}
   ],
   "retained": [
     {{
       "index": 3,
       "title": "뉴스 제목",
-      "reason": "유지 사유"
+      "reason": "유지 사유",
+      "confidence": 0.8
     }}
   ]
 }}"""
+            return exclusion_prompt
 
-        # 최대 3번까지 시도
+
+        # 1단계 모델 (STAGE_MODEL_ROUTING에 지정된 저가 모델, 없으면 선택한 모델)
+        stage_model = get_stage_model(state, 1)
+
+        # 같은 기준으로 이미 판단한 기사는 LLM에 보내지 않고 저장된 판단 사용
+        store = _get_article_store(state)
+        company = _state_company(state)
+        criteria_hash = make_criteria_hash(
+            "exclusion", system_prompt, state.get("exclusion_criteria", ""),
+            stage_model, state.get("model", "gpt-4o"), STAGE_MODEL_ROUTING
+        )
+        stored_verdicts = {}
+        if store:
+            store.record_articles(company, news_data)
+            stored_verdicts = store.get_verdicts(company, 1, criteria_hash, [news.get("url") for news in news_data])
+            if stored_verdicts:
+                print(f"\n[DEBUG] 1단계: 저장된 판단 {len(stored_verdicts)}개 재사용, "
+                      f"새 뉴스 {len(news_data) - len(stored_verdicts)}개만 분류합니다.")
+        new_news = [news for news in news_data if news.get("url") not in stored_verdicts]
+
+        # 뉴스 목록을 토큰 예산에 맞는 청크로 분할 (청크가 여러 개면 동시에 분류)
+        chunks = split_exclusion_chunks(new_news, stage_model) if new_news else []
+        exclusion_prompts = [build_exclusion_prompt(chunk) for chunk in chunks]
+        if len(chunks) > 1:
+            print(f"\n[DEBUG] 뉴스 {len(new_news)}개를 {len(chunks)}개 청크로 나누어 분류합니다.")
+
+        classifications = [None] * len(chunks)
+        responses = [""] * len(chunks)
+        json_mode = STRUCTURED_OUTPUT_SETTINGS["json_mode"]
+
+        # 최대 3번까지 시도 (형식 수정으로도 검증에 실패한 청크만 전체 프롬프트로 다시 요청)
         max_retries = 3
-        for attempt in range(max_retries):
-            try:
+        for attempt in range(max_retries if chunks else 0):
+            pending = [i for i, classification in enumerate(classifications) if classification is None]
+            kind = "retry" if attempt else "call"
+            if len(chunks) == 1:
                 # LLM 호출 (헬퍼 함수 사용)
-                result = call_llm(state, system_prompt, exclusion_prompt, stage=1)
-                
-                # JSON 파싱 (헬퍼 함수 사용)
-                classification = parse_json_response(result)
-                
-                # 필수 필드 확인
-                if not all(key in classification for key in ["excluded", "borderline", "retained"]):
-                    raise ValueError("필수 필드가 누락되었습니다.")
-                
-                # 상태 업데이트 시 원래 인덱스 유지
-                for category in ["excluded", "borderline", "retained"]:
-                    for item in classification.get(category, []):
-                        original_index = item['index']
-                        item['original_index'] = original_index
-                
-                state["excluded_news"] = classification.get("excluded", [])
-                state["borderline_news"] = classification.get("borderline", [])
-                state["retained_news"] = classification.get("retained", [])
-                
-                print("\n[분류 결과]")
-                print(f"제외: {len(state['excluded_news'])}개")
-                print(f"보류: {len(state['borderline_news'])}개")
-                print(f"유지: {len(state['retained_news'])}개")
-                
-                # 성공적으로 파싱되면 루프 종료
+                results = [(yield LLMCall(system_prompt, exclusion_prompts[0], 1, json_mode, kind, stage_model,
+                                          ExclusionResult))]
+            else:
+                # 청크별 LLM 동시 호출
+                results = yield [LLMCall(system_prompt, exclusion_prompts[i], 1, json_mode, kind, stage_model,
+                                         ExclusionResult)
+                                 for i in pending]
+
+            # 스키마 검증 (실패한 응답은 형식 수정 요청으로 바로잡음)
+            outcomes = yield from _validate_responses(state, results, ExclusionResult, 1, stage_model)
+
+            errors = []
+            for i, (classification, result, error) in zip(pending, outcomes):
+                responses[i] = result
+                if classification is None:
+                    print(f"\n청크 {i + 1}/{len(chunks)} 파싱 시도 {attempt + 1} 실패: {str(error)}")
+                    errors.append(error)
+                else:
+                    classifications[i] = classification
+
+            # 모든 청크가 성공적으로 파싱되면 루프 종료
+            if not errors:
                 break
-                
-            except (json.JSONDecodeError, ValueError) as e:
-                print(f"\n파싱 시도 {attempt + 1} 실패: {str(e)}")
-                if attempt == max_retries - 1:  # 마지막 시도에서도 실패
-                    st.error(f"분류 결과 파싱 중 오류가 발생했습니다: {str(e)}")
-                    return state
-                # 다음 시도를 위해 잠시 대기
-                time.sleep(1)
+            if attempt == max_retries - 1:  # 마지막 시도에서도 실패
+                if all(classification is None for classification in classifications):
+                    return _report_stage_failure(state, f"분류 결과 파싱 중 오류가 발생했습니다: {str(errors[-1])}")
+                break
+            # 다음 시도를 위해 잠시 대기
+            yield Sleep(1)
+
+        # 여러 청크로 나눈 경우 디버그 정보용 프롬프트/응답을 합쳐서 저장
+        if not chunks:
+            state["system_prompt_1"] = system_prompt
+            state["user_prompt_1"] = f"(모든 뉴스 {len(news_data)}개에 저장된 판단을 사용하여 LLM을 호출하지 않음)"
+            state["llm_response_1"] = ""
+        elif len(chunks) > 1:
+            state["system_prompt_1"] = system_prompt
+            state["user_prompt_1"] = "\n\n".join(
+                f"[청크 {i + 1}/{len(chunks)}]\n{prompt}" for i, prompt in enumerate(exclusion_prompts))
+            state["llm_response_1"] = "\n\n".join(
+                f"[청크 {i + 1}/{len(chunks)}]\n{response}" for i, response in enumerate(responses))
+
+        # original_index 기준으로 병합 (분류에서 누락된 뉴스는 보류로 처리)
+        merged = merge_exclusion_results(chunks, classifications)
+
+        # 저가 모델의 보류/확신도 낮은 판단만 선택한 모델로 다시 판단
+        strong_model = state.get("model", "gpt-4o")
+        escalation = STAGE_MODEL_ROUTING["escalation"]
+        if STAGE_MODEL_ROUTING["enabled"] and escalation["enabled"] and stage_model != strong_model:
+            targets = select_escalation_targets(merged, escalation["categories"], escalation["min_confidence"])
+            registry = get_article_registry(state)
+            uncertain_news = [registry.get(index) for index in targets if registry.get(index)]
+            if uncertain_news:
+                print(f"\n[DEBUG] 1단계: 불확실한 뉴스 {len(uncertain_news)}개를 {strong_model}로 다시 판단합니다.")
+                escalation_chunks = split_exclusion_chunks(uncertain_news, strong_model)
+                escalation_prompts = [build_exclusion_prompt(chunk) for chunk in escalation_chunks]
+                # 상태 사본으로 동시 호출 (1단계 디버그 정보는 아래에서 이어 붙임)
+                results = yield [LLMCall(system_prompt, prompt, 1, json_mode, "escalation", strong_model,
+                                         ExclusionResult)
+                                 for prompt in escalation_prompts]
+                outcomes = yield from _validate_responses(state, results, ExclusionResult, 1, strong_model)
+
+                # 검증에 성공한 청크만 반영 (실패한 청크는 저가 모델의 판단 유지)
+                validated = [(chunk, classification) for chunk, (classification, _, _)
+                             in zip(escalation_chunks, outcomes) if classification is not None]
+                if validated:
+                    reclassified = merge_exclusion_results([chunk for chunk, _ in validated],
+                                                           [classification for _, classification in validated])
+                    merged = apply_escalation(merged, reclassified)
+
+                state["user_prompt_1"] = state.get("user_prompt_1", "") + f"\n\n[{strong_model} 재판단]\n" + \
+                    "\n\n".join(escalation_prompts)
+                state["llm_response_1"] = state.get("llm_response_1", "") + f"\n\n[{strong_model} 재판단]\n" + \
+                    "\n\n".join(response for _, response, _ in outcomes)
+
+        if store:
+            # 새로 분류한 판단 저장 (분류 결과에서 누락되어 보류로 처리한 뉴스는 다음 실행에서 다시 분류)
+            registry = get_article_registry(state)
+            new_verdicts = {}
+            for category, items in merged.items():
+                for item in items:
+                    news = registry.get(item["original_index"])
+                    if news and not item.get("unclassified"):
+                        new_verdicts[news.get("url")] = {
+                            "category": category,
+                            "reason": item.get("reason", ""),
+                            "confidence": item.get("confidence"),
+                            "escalated": item.get("escalated", False)
+                        }
+            store.put_verdicts(company, 1, criteria_hash, new_verdicts)
+
+            # 저장된 판단을 이번 실행의 인덱스로 추가
+            for news in news_data:
+                verdict = stored_verdicts.get(news.get("url"))
+                if verdict and verdict.get("category") in merged:
+                    original_index = news.get("original_index")
+                    merged[verdict["category"]].append({
+                        "index": original_index,
+                        "title": news.get("content", ""),
+                        "reason": verdict.get("reason", ""),
+                        "confidence": verdict.get("confidence"),
+                        "escalated": verdict.get("escalated", False),
+                        "original_index": original_index,
+                        "from_store": True
+                    })
+        state["excluded_news"] = merged["excluded"]
+        state["borderline_news"] = merged["borderline"]
+        state["retained_news"] = merged["retained"]
+        
+        print("\n[분류 결과]")
+        print(f"제외: {len(state['excluded_news'])}개")
+        print(f"보류: {len(state['borderline_news'])}개")
+        print(f"유지: {len(state['retained_news'])}개")
 
         return state
 
     except Exception as e:
-        st.error(f"뉴스 분류 중 오류가 발생했습니다: {str(e)}")
-        return state
+        return _report_stage_failure(state, f"뉴스 분류 중 오류가 발생했습니다: {str(e)}")
+
+# 헬퍼 함수: 로컬 중복 묶음
+def cluster_target_news(target_news: List[dict]) -> Dict[Any, List[Any]]:
+    """
+    그룹핑 대상 뉴스를 제목 유사도로 먼저 묶어 {대표 기사 인덱스: 묶음의 인덱스 목록}을 반환합니다.
+
+    대표 기사는 PRESS_PRIORITY(DUPLICATE_HANDLING의 언론사 우선순위)로 선택하며,
+    NEAR_DUPLICATE_SETTINGS가 꺼져 있으면 제목 유사도 묶음을 건너뛰고,
+    EMBEDDING_DEDUP_SETTINGS가 켜져 있으면 임베딩 코사인 유사도로 묶음을 한 번 더 합칩니다.
+    """
+    if not NEAR_DUPLICATE_SETTINGS["enabled"]:
+        clusters = [{"representative": news, "members": [news]} for news in target_news]
+    else:
+        clusters = cluster_near_duplicates(
+            target_news,
+            threshold=NEAR_DUPLICATE_SETTINGS["threshold"],
+            ngram=NEAR_DUPLICATE_SETTINGS["ngram"],
+            num_perm=NEAR_DUPLICATE_SETTINGS["num_perm"],
+            bands=NEAR_DUPLICATE_SETTINGS["bands"],
+            press_priority=PRESS_PRIORITY,
+            default_rank=NEAR_DUPLICATE_SETTINGS["default_press_rank"]
+        )
+
+    # 표현만 다른 같은 사건의 기사는 임베딩 유사도로 한 번 더 묶음 (선택 사항)
+    if EMBEDDING_DEDUP_SETTINGS["enabled"] and len(clusters) > 1:
+        try:
+            index = get_embedding_index(
+                EMBEDDING_DEDUP_SETTINGS["provider"],
+                EMBEDDING_DEDUP_SETTINGS["model"],
+                cache_path=EMBEDDING_DEDUP_SETTINGS["cache_path"],
+                batch_size=EMBEDDING_DEDUP_SETTINGS["batch_size"]
+            )
+            clusters = merge_semantic_duplicates(
+                clusters,
+                index,
+                EMBEDDING_DEDUP_SETTINGS["threshold"],
+                press_priority=PRESS_PRIORITY,
+                default_rank=NEAR_DUPLICATE_SETTINGS["default_press_rank"]
+            )
+        except Exception as e:
+            print(f"[DEBUG] 임베딩 중복 묶음 실패, 제목 유사도 묶음만 사용: {str(e)}")
+
+    cluster_members = {}
+    for cluster in clusters:
+        representative_index = cluster["representative"]["current_index"]
+        cluster_members[representative_index] = [news["current_index"] for news in cluster["members"]]
+        if len(cluster["members"]) > 1:
+            print(f"중복 묶음: {cluster_members[representative_index]} → 대표 {representative_index} "
+                  f"({cluster['representative'].get('press', '')})")
+    return cluster_members
 
 # 2단계: 뉴스 그룹핑 + 대표 기사 선택
-def group_and_select_news(state: AgentState) -> AgentState:
+def _grouping_steps(state: AgentState) -> Generator:
+    """유사 뉴스를 그룹으로 묶고 대표 기사를 선택하는 단계 (LLM 호출은 LLMCall로 요청)"""
     try:
         # 디버깅 정보 출력
         print("\n=== 그룹핑 전 인덱스 정보 ===")
@@ -602,11 +1217,12 @@ def group_and_select_news(state: AgentState) -> AgentState:
         
         print(f"대상 뉴스 인덱스: {target_indices}")
         
-        # 대상 뉴스 필터링 (원래 인덱스 매핑)
+        # 대상 뉴스 필터링 (원래 인덱스 매핑, 집합으로 상수 시간 확인)
+        target_index_set = set(target_indices)
         target_news = []
         for news in state["news_data"]:
             original_index = news.get("original_index")
-            if original_index in target_indices:
+            if original_index in target_index_set:
                 print(f"매칭된 뉴스: index={original_index}, title={news['content']}")
                 news["current_index"] = original_index  # current_index에 original_index 저장
                 target_news.append(news)
@@ -617,12 +1233,29 @@ def group_and_select_news(state: AgentState) -> AgentState:
             print("필터링된 뉴스가 없습니다!")
             return state
 
+        # 제목이 거의 같은 기사(통신 기사 재송고 등)는 로컬에서 먼저 묶고 대표 기사만 LLM에 전달
+        cluster_members = cluster_target_news(target_news)
+        representative_news = [news for news in target_news if news["current_index"] in cluster_members]
+        if len(representative_news) < len(target_news):
+            print(f"로컬 중복 묶음: {len(target_news)}개 → 대표 기사 {len(representative_news)}개")
+
         # 뉴스 데이터를 문자열로 변환 (current_index 사용)
         news_text = "\n\n".join([
             f"인덱스: {news['current_index']}\n제목: {news['content']}\n언론사: {news.get('press', '알 수 없음')}\n발행일: {news.get('date', '알 수 없음')}"
-            for news in target_news
+            for news in representative_news
         ])
 
+        # 제목이 비슷하지만 로컬에서 묶지 않은 쌍은 숨기지 않고 중복 후보로 알려 LLM이 판단하도록 함
+        candidate_text = ""
+        if NEAR_DUPLICATE_SETTINGS["enabled"] and len(representative_news) > 1:
+            candidate_pairs = find_similar_pairs(representative_news, NEAR_DUPLICATE_SETTINGS["candidate_threshold"],
+                                                 NEAR_DUPLICATE_SETTINGS["ngram"])
+            if candidate_pairs:
+                print(f"중복 후보 쌍: {len(candidate_pairs)}개")
+                candidate_text = "\n\n[중복 후보 (제목이 비슷하지만 숫자나 내용이 다를 수 있으니 같은 사안인지 확인 후 묶어주세요)]\n" + \
+                    "\n".join(f"- 인덱스 {representative_news[i]['current_index']}, {representative_news[j]['current_index']}"
+                              for i, j in candidate_pairs)
+
         # 그룹핑 프롬프트
         system_prompt = state.get("system_prompt_2", "당신은 뉴스 분석 전문가입니다. 유사한 뉴스를 그룹화하고 대표성을 갖춘 기사를 선택하는 작업을 수행합니다. 같은 사안에 대해 숫자, 기업 ,계열사, 맥락, 주요 키워드 등이 유사하면 중복으로 판단합니다. 언론사의 신뢰도와 기사의 상세도를 고려하여 대표 기사를 선정합니다.")
         
@@ -630,7 +1263,7 @@ def group_and_select_news(state: AgentState) -> AgentState:
 주어진 인덱스 번호를 정확히 사용해주세요. 인덱스 번호를 임의로 변경하지 마세요.
 
 [뉴스 목록]
-{news_text}
+{news_text}{candidate_text}
 
 [중복 처리 기준]
 {state.get("duplicate_handling", "")}
@@ -652,33 +1285,66 @@ def group_and_select_news(state: AgentState) -> AgentState:
 }}"""
 
         try:
-            # LLM 호출 (헬퍼 함수 사용)
-            result = call_llm(state, system_prompt, grouping_prompt, stage=2)
-            
-            # JSON 파싱 (헬퍼 함수 사용)
-            grouping = parse_json_response(result)
-            grouped_news = grouping.get("groups", [])
+            if len(representative_news) > 1:
+                # LLM 호출 (헬퍼 함수 사용)
+                stage_model = get_stage_model(state, 2)
+                result = yield LLMCall(system_prompt, grouping_prompt, 2, STRUCTURED_OUTPUT_SETTINGS["json_mode"],
+                                       "call", stage_model, GroupingResult)
+                
+                # 스키마 검증 (실패하면 형식 수정 요청으로 바로잡음)
+                [(grouping, result, error)] = yield from _validate_responses(state, [result], GroupingResult, 2,
+                                                                             stage_model)
+                if grouping is None:
+                    return _report_stage_failure(state, f"그룹핑 결과 파싱 중 오류가 발생했습니다: {str(error)}")
+                grouped_news = grouping.get("groups", [])
+            else:
+                # 대표 기사가 하나뿐이면 LLM으로 묶을 필요 없음
+                grouped_news = []
             
             # 그룹핑된 뉴스의 인덱스들을 모두 수집
             grouped_indices = set()
             for group in grouped_news:
                 grouped_indices.update(group.get("indices", []))
             
-            # 그룹핑되지 않은 뉴스들을 찾아서 각각 단일 그룹으로 추가
-            current_indices = set(news["current_index"] for news in target_news)
-            ungrouped_indices = current_indices - grouped_indices
+            # 대표 기사 인덱스를 로컬 중복 묶음 전체로 펼침
+            for group in grouped_news:
+                group["indices"] = [member for idx in group.get("indices", [])
+                                    for member in cluster_members.get(idx, [idx])]
             
-            # 미그룹 뉴스들을 각각 단일 그룹으로 추가
-            for idx in ungrouped_indices:
+            # 그룹핑되지 않은 대표 기사는 로컬 묶음 그대로 하나의 그룹으로 추가
+            for idx, members in cluster_members.items():
+                if idx in grouped_indices:
+                    continue
                 new_group = {
-                    "indices": [idx],
+                    "indices": members,
                     "selected_index": idx,
-                    "reason": "개별 뉴스로 처리"
+                    "reason": "개별 뉴스로 처리" if len(members) == 1 else "제목이 거의 같은 중복 기사로 자동 묶음 (언론사 우선순위로 대표 선정)"
                 }
                 grouped_news.append(new_group)
             
             # 그룹핑 결과 저장
             state["grouped_news"] = grouped_news
+
+            # 기사 저장소에 그룹핑 판단 기록 (그룹은 그날 수집된 기사 구성에 따라 달라지므로 기록만 하고 재사용하지 않음)
+            store = _get_article_store(state)
+            if store:
+                registry = get_article_registry(state)
+                verdicts = {}
+                for group in grouped_news:
+                    representative = registry.get(group.get("selected_index"))
+                    for index in group.get("indices", []):
+                        news = registry.get(index)
+                        if news:
+                            verdicts[news.get("url")] = {
+                                "selected": index == group.get("selected_index"),
+                                "representative_url": representative.get("url") if representative else None,
+                                "group_size": len(group.get("indices", [])),
+                                "reason": group.get("reason", "")
+                            }
+                criteria_hash = make_criteria_hash(
+                    "grouping", system_prompt, state.get("duplicate_handling", ""), get_stage_model(state, 2)
+                )
+                store.put_verdicts(_state_company(state), 2, criteria_hash, verdicts)
             
             # 디버깅 정보 출력
             print("\n=== 그룹핑 결과 ===")
@@ -687,20 +1353,21 @@ def group_and_select_news(state: AgentState) -> AgentState:
             
             return state
 
-        except json.JSONDecodeError as e:
-            st.error(f"그룹핑 결과 파싱 중 오류가 발생했습니다: {str(e)}")
-            return state
+        except (json.JSONDecodeError, ValueError) as e:
+            return _report_stage_failure(state, f"그룹핑 결과 파싱 중 오류가 발생했습니다: {str(e)}")
 
     except Exception as e:
-        st.error(f"뉴스 그룹핑 중 오류가 발생했습니다: {str(e)}")
-        return state
+        return _report_stage_failure(state, f"뉴스 그룹핑 중 오류가 발생했습니다: {str(e)}")
 
 # 3단계: 중요도 평가 + 최종 선정
-def evaluate_importance(state: AgentState) -> AgentState:
+def _evaluation_steps(state: AgentState) -> Generator:
+    """뉴스의 중요도를 평가하고 최종 선정하는 단계 (LLM 호출은 LLMCall로 요청)"""
     try:
         # 선택된 뉴스 추출
         selected_news = []
         index_map = {}  # 리스트 인덱스와 원래 인덱스 간의 매핑
+        selected_by_list_index = {}  # 리스트 인덱스 → 선택된 뉴스
+        registry = get_article_registry(state)  # original_index/URL → 기사 색인
         
         # 디버깅 정보 출력
         print("\n=== 중요도 평가 시작 ===")
@@ -711,11 +1378,7 @@ def evaluate_importance(state: AgentState) -> AgentState:
             selected_index = group["selected_index"]
             
             # 원래 뉴스 데이터에서 selected_index와 일치하는 뉴스 찾기
-            selected_article = next(
-                (news for news in state["news_data"] 
-                 if news.get("original_index") == selected_index),
-                None
-            )
+            selected_article = registry.get(selected_index)
             
             if selected_article:
                 print(f"그룹 {i}, 선택된 인덱스 {selected_index}: 제목 = {selected_article['content']}")
@@ -724,6 +1387,7 @@ def evaluate_importance(state: AgentState) -> AgentState:
                 selected_article["list_index"] = i
                 selected_article["group_info"] = group
                 selected_news.append(selected_article)
+                selected_by_list_index[i] = selected_article
             else:
                 print(f"그룹 {i}, 선택된 인덱스 {selected_index}: 해당 뉴스를 찾을 수 없음")
         
@@ -731,14 +1395,56 @@ def evaluate_importance(state: AgentState) -> AgentState:
             print("선택된 뉴스가 없습니다!")
             return state
 
+        # 중요도 평가 프롬프트
+        system_prompt = state.get("system_prompt_3", "당신은 회계법인의 전문 애널리스트입니다. 뉴스의 중요도를 평가하고 최종 선정하는 작업을 수행합니다. 특히 회계 감리, 재무제표, 경영권 변동, 주요 계약, 법적 분쟁 등 회계법인의 관점에서 중요한 이슈를 식별하고, 그 중요도를 '상' 또는 '중'으로 평가합니다. 또한 각 뉴스의 핵심 키워드와 관련 계열사를 식별하여 보고합니다.")
+        stage_model = get_stage_model(state, 3)
+
+        # 같은 기준으로 이미 평가한 대표 기사는 저장된 평가 사용
+        store = _get_article_store(state)
+        company = _state_company(state)
+        criteria_hash = make_criteria_hash(
+            "evaluation", system_prompt, state.get("selection_criteria", ""), stage_model
+        )
+        stored_selection, stored_not_selected = [], []
+        new_selected_news = selected_news
+        if store:
+            stored_verdicts = store.get_verdicts(company, 3, criteria_hash, [news.get("url") for news in selected_news])
+            new_selected_news = []
+            for news in selected_news:
+                verdict = stored_verdicts.get(news.get("url"))
+                if verdict is None:
+                    new_selected_news.append(news)
+                    continue
+                item = {key: value for key, value in verdict.items() if key != "selected"}
+                item.update({
+                    "index": news["list_index"],
+                    "url": news.get("url", ""),
+                    "press": news.get("press", ""),
+                    "date": news.get("date", ""),
+                    "published_at": news.get("published_at"),
+                    "original_index": news.get("original_index"),
+                    "group_info": news["group_info"],
+                    "from_store": True
+                })
+                (stored_selection if verdict.get("selected") else stored_not_selected).append(item)
+            if stored_verdicts:
+                print(f"\n[DEBUG] 3단계: 저장된 평가 {len(stored_verdicts)}개 재사용, "
+                      f"새 뉴스 {len(new_selected_news)}개만 평가합니다.")
+
+        if not new_selected_news:
+            state["user_prompt_3"] = f"(모든 뉴스 {len(selected_news)}개에 저장된 평가를 사용하여 LLM을 호출하지 않음)"
+            state["llm_response_3"] = ""
+            state["final_selection"] = stored_selection
+            state["not_selected_news"] = stored_not_selected
+            print(f"최종 선정 뉴스 수: {len(state['final_selection'])}")
+            print(f"미선정 뉴스 수: {len(state['not_selected_news'])}")
+            return state
+
         # 뉴스 데이터를 문자열로 변환 (list_index 사용)
         news_text = "\n\n".join([
             f"인덱스: {news['list_index']}\n제목: {news['content']}\n언론사: {news.get('press', '알 수 없음')}\n발행일: {news.get('date', '알 수 없음')}"
-            for news in selected_news
+            for news in new_selected_news
         ])
-
-        # 중요도 평가 프롬프트
-        system_prompt = state.get("system_prompt_3", "당신은 회계법인의 전문 애널리스트입니다. 뉴스의 중요도를 평가하고 최종 선정하는 작업을 수행합니다. 특히 회계 감리, 재무제표, 경영권 변동, 주요 계약, 법적 분쟁 등 회계법인의 관점에서 중요한 이슈를 식별하고, 그 중요도를 '상' 또는 '중'으로 평가합니다. 또한 각 뉴스의 핵심 키워드와 관련 계열사를 식별하여 보고합니다.")
         
         evaluation_prompt = f"""아래 기사들에 대해 회계법인의 시각으로 중요도를 평가하고, 모든 뉴스에 대해 평가 결과를 알려주세요.
 중요도 '상' 또는 '중'인 뉴스는 최종 선정하고, '하'인 뉴스는 선정하지 않습니다.
@@ -778,35 +1484,33 @@ def evaluate_importance(state: AgentState) -> AgentState:
   ]
 }}"""
 
-        # 최대 3번까지 시도
+        # 최대 3번까지 시도 (형식 수정으로도 검증에 실패하면 전체 프롬프트로 다시 요청)
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 # LLM 호출 (헬퍼 함수 사용)
-                result = call_llm(state, system_prompt, evaluation_prompt, stage=3)
+                result = yield LLMCall(system_prompt, evaluation_prompt, 3, STRUCTURED_OUTPUT_SETTINGS["json_mode"],
+                                       "retry" if attempt else "call", stage_model, EvaluationResult)
                 
-                # JSON 파싱 (헬퍼 함수 사용)
-                evaluation = parse_json_response(result)
-                
-                # 필수 필드 확인
-                if not all(key in evaluation for key in ["final_selection", "not_selected"]):
-                    raise ValueError("필수 필드가 누락되었습니다.")
+                # 스키마 검증 (필수 필드 확인 포함, 실패하면 형식 수정 요청으로 바로잡음)
+                [(evaluation, result, error)] = yield from _validate_responses(state, [result], EvaluationResult, 3,
+                                                                             stage_model)
+                if evaluation is None:
+                    raise error
                 
                 # 최종 선정된 뉴스 처리
                 for news in evaluation["final_selection"]:
-                    list_index = news["index"]
+                    list_index = _to_index(news["index"])
                     if list_index in index_map:
                         original_index = index_map[list_index]
-                        original_news = next(
-                            (n for n in selected_news if n["list_index"] == list_index),
-                            None
-                        )
+                        original_news = selected_by_list_index.get(list_index)
                         if original_news:
                             # 원본 데이터의 메타데이터를 그대로 사용
                             news.update({
                                 "url": original_news.get("url", ""),
                                 "press": original_news.get("press", ""),  # LLM이 제공한 press 대신 원본 press 사용
                                 "date": original_news.get("date", ""),
+                                "published_at": original_news.get("published_at"),
                                 "original_index": original_index,
                                 "group_info": original_news["group_info"]
                             })
@@ -814,25 +1518,34 @@ def evaluate_importance(state: AgentState) -> AgentState:
 
                 # 미선정 뉴스도 동일하게 처리
                 for news in evaluation["not_selected"]:
-                    list_index = news["index"]
+                    list_index = _to_index(news["index"])
                     if list_index in index_map:
                         original_index = index_map[list_index]
-                        original_news = next(
-                            (n for n in selected_news if n["list_index"] == list_index),
-                            None
-                        )
+                        original_news = selected_by_list_index.get(list_index)
                         if original_news:
                             news.update({
                                 "url": original_news.get("url", ""),
                                 "press": original_news.get("press", ""),  # LLM이 제공한 press 대신 원본 press 사용
                                 "date": original_news.get("date", ""),
+                                "published_at": original_news.get("published_at"),
                                 "original_index": original_index,
                                 "group_info": original_news["group_info"]
                             })
                             print(f"미선정 뉴스: 인덱스={original_index}, 제목={news['title']}")
                 
-                state["final_selection"] = evaluation.get("final_selection", [])
-                state["not_selected_news"] = evaluation.get("not_selected", [])
+                if store:
+                    # 새로 평가한 결과 저장 (다음 실행에서 같은 기준이면 재사용)
+                    verdict_keys = ["title", "importance", "reason", "keywords", "affiliates"]
+                    new_verdicts = {}
+                    for selected, items in [(True, evaluation["final_selection"]), (False, evaluation["not_selected"])]:
+                        for news in items:
+                            if news.get("url"):
+                                new_verdicts[news["url"]] = dict({key: news.get(key) for key in verdict_keys},
+                                                                 selected=selected)
+                    store.put_verdicts(company, 3, criteria_hash, new_verdicts)
+                
+                state["final_selection"] = evaluation.get("final_selection", []) + stored_selection
+                state["not_selected_news"] = evaluation.get("not_selected", []) + stored_not_selected
                 
                 print(f"최종 선정 뉴스 수: {len(state['final_selection'])}")
                 print(f"미선정 뉴스 수: {len(state['not_selected_news'])}")
@@ -842,16 +1555,38 @@ def evaluate_importance(state: AgentState) -> AgentState:
             except (json.JSONDecodeError, ValueError) as e:
                 print(f"\n파싱 시도 {attempt + 1} 실패: {str(e)}")
                 if attempt == max_retries - 1:  # 마지막 시도에서도 실패
-                    st.error(f"중요도 평가 결과 파싱 중 오류가 발생했습니다: {str(e)}")
-                    return state
+                    return _report_stage_failure(state, f"중요도 평가 결과 파싱 중 오류가 발생했습니다: {str(e)}")
                 # 다음 시도를 위해 잠시 대기
-                time.sleep(1)
+                yield Sleep(1)
 
         return state
 
     except Exception as e:
-        st.error(f"중요도 평가 중 오류가 발생했습니다: {str(e)}")
-        return state
+        return _report_stage_failure(state, f"중요도 평가 중 오류가 발생했습니다: {str(e)}")
+
+def filter_excluded_news(state: AgentState) -> AgentState:
+    """뉴스를 제외/보류/유지로 분류하는 함수"""
+    return run_stage(_exclusion_steps(state), state)
+
+async def afilter_excluded_news(state: AgentState) -> AgentState:
+    """filter_excluded_news의 비동기 버전"""
+    return await arun_stage(_exclusion_steps(state), state)
+
+def group_and_select_news(state: AgentState) -> AgentState:
+    """유사 뉴스를 그룹핑하고 대표 기사를 선택하는 함수"""
+    return run_stage(_grouping_steps(state), state)
+
+async def agroup_and_select_news(state: AgentState) -> AgentState:
+    """group_and_select_news의 비동기 버전"""
+    return await arun_stage(_grouping_steps(state), state)
+
+def evaluate_importance(state: AgentState) -> AgentState:
+    """중요도를 평가하고 최종 뉴스를 선정하는 함수"""
+    return run_stage(_evaluation_steps(state), state)
+
+async def aevaluate_importance(state: AgentState) -> AgentState:
+    """evaluate_importance의 비동기 버전"""
+    return await arun_stage(_evaluation_steps(state), state)
 
 # 노드 정의
 def get_nodes():
@@ -863,8 +1598,19 @@ def get_nodes():
         "evaluate_importance": evaluate_importance
     }
 
+# 비동기 노드 정의 (LLM 단계는 ainvoke 사용, 수집/필터링은 LangGraph가 스레드에서 실행)
+def get_async_nodes():
+    return {
+        "collect_news": collect_news,
+        "filter_valid_press": filter_valid_press,
+        "filter_excluded_news": afilter_excluded_news,
+        "group_and_select_news": agroup_and_select_news,
+        "evaluate_importance": aevaluate_importance
+    }
+
 # 에지 정의
 def get_edges():
+    from langgraph.graph import END
     return [
         ("collect_news", "filter_valid_press"),
         ("filter_valid_press", "filter_excluded_news"),
@@ -880,18 +1626,66 @@ def print_news(news_list, title):
         print(f"\n[{i+1}] 제목: {news['content']}")
         print(f"    URL: {news['url']}")
 
-# 메인 실행 함수
-def main():
+# 그래프 실행 설정(config["configurable"]["runtime"])으로 전달하는 실행 객체 (직렬화할 수 없어 상태/체크포인트에 저장하지 않음)
+RUNTIME_KEYS = ("reporter", "on_stream_item")
+
+def _attach_runtime(state: AgentState, config) -> AgentState:
+    runtime = ((config or {}).get("configurable") or {}).get("runtime")
+    return dict(state, **runtime) if runtime else state
+
+class StageFailedError(RuntimeError):
+    """체크포인트 실행에서 노드(단계)가 실패했음을 알리는 예외 (실패한 노드가 반환한 상태를 state로 보관)"""
+
+    def __init__(self, state: AgentState):
+        errors = state.get("stage_errors") or []
+        super().__init__(errors[-1] if errors else "단계 실패")
+        self.state = state
+
+def _check_stage_errors(before: int, result: AgentState) -> AgentState:
+    if len(result.get("stage_errors") or []) > before:
+        raise StageFailedError(result)
+    return result
+
+def _with_runtime(node_fn, fail_on_stage_error: bool = False):
+    """
+    그래프 실행 설정의 reporter / 스트리밍 콜백을 상태에 다시 넣어 노드를 실행하는 래퍼
+
+    fail_on_stage_error가 True면 노드가 stage_errors를 새로 남겼을 때 StageFailedError를 발생시켜
+    그 노드가 완료된 것으로 체크포인트에 저장되지 않게 합니다.
+    """
+    if asyncio.iscoroutinefunction(node_fn):
+        async def anode(state: AgentState, config):
+            before = len(state.get("stage_errors") or [])
+            result = await node_fn(_attach_runtime(state, config))
+            return _check_stage_errors(before, result) if fail_on_stage_error else result
+        return anode
+
+    def node(state: AgentState, config):
+        before = len(state.get("stage_errors") or [])
+        result = node_fn(_attach_runtime(state, config))
+        return _check_stage_errors(before, result) if fail_on_stage_error else result
+    return node
+
+# 그래프 생성 함수
+def build_graph(nodes=None, checkpointer=None):
+    """
+    노드(동기 또는 비동기)와 에지로 뉴스 분석 그래프를 생성하고 컴파일합니다.
+
+    checkpointer를 지정하면 노드가 끝날 때마다 상태를 저장하므로
+    같은 thread_id로 다시 실행하면 마지막으로 완료된 노드 다음부터 이어서 실행할 수 있습니다.
+    이때 단계 실패(stage_errors)를 남긴 노드는 StageFailedError를 발생시켜 완료로 저장하지 않습니다.
+    """
     # 노드 및 에지 가져오기
-    nodes = get_nodes()
+    nodes = nodes or get_nodes()
     edges = get_edges()
     
-    # 그래프 생성
+    # 그래프 생성 (LangGraph는 그래프를 만들 때만 불러옴)
+    from langgraph.graph import StateGraph
     builder = StateGraph(AgentState)
     
     # 노드 추가
     for node_name, node_fn in nodes.items():
-        builder.add_node(node_name, node_fn)
+        builder.add_node(node_name, _with_runtime(node_fn, fail_on_stage_error=checkpointer is not None))
     
     # 에지 추가
     for start, end in edges:
@@ -901,11 +1695,112 @@ def main():
     builder.set_entry_point("collect_news")
     
     # 그래프 컴파일
-    graph = builder.compile()
-    
-    # 실행
+    return builder.compile(checkpointer=checkpointer)
+
+# 체크포인트용 초기 상태 정리 함수
+def checkpoint_safe_state(state: AgentState) -> dict:
+    """
+    체크포인트에 저장할 수 있도록 초기 상태를 정리합니다.
+
+    실행 객체(reporter, 스트리밍 콜백, 기사 색인)는 빼고, 언론사 설정은 일반 dict로 바꾸며,
+    회사 간 공유되는 사전 수집 결과는 이 회사의 검색어에 해당하는 결과만 남깁니다.
+    """
+    safe = {key: value for key, value in state.items() if key not in RUNTIME_KEYS and key != "article_registry"}
+    for key in ("valid_press_dict", "additional_press_dict"):
+        config = safe.get(key)
+        if isinstance(config, Mapping) and not isinstance(config, dict):
+            safe[key] = {press: list(aliases) for press, aliases in config.items()}
+    prefetched_news = safe.get("prefetched_news")
+    if prefetched_news:
+        keywords = state.get("keyword") or []
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        queries = {normalize_query(kw) for kw in keywords}
+        safe["prefetched_news"] = {query: prefetched_news[query] for query in queries if query in prefetched_news}
+    return safe
+
+# 체크포인트를 사용하는 그래프 실행 함수
+def run_checkpointed_graph(initial_state: AgentState, checkpointer, thread_id: str, on_node=None) -> dict:
+    """
+    노드마다 체크포인트를 저장하며 그래프를 실행합니다.
+
+    같은 thread_id의 체크포인트가 있으면 마지막으로 완료된 노드 다음부터 이어서 실행하고
+    (initial_state는 사용하지 않음), 이미 끝난 실행이면 저장된 최종 상태를 그대로 반환합니다.
+    재시도 후에도 결과를 얻지 못한 노드(stage_errors)는 완료로 저장하지 않고 그 노드의 상태를 반환하므로
+    다시 실행하면 실패한 노드부터 다시 실행합니다.
+
+    Args:
+        initial_state (AgentState): 초기 상태 (reporter / on_stream_item은 실행 설정으로 전달)
+        checkpointer: LangGraph checkpointer (예: checkpoint_store.SQLiteCheckpointSaver)
+        thread_id (str): 체크포인트 스레드 ID (실행 ID:회사)
+        on_node (Optional[Callable[[str], None]]): 노드를 시작하기 전에 노드 이름으로 호출
+
+    Returns:
+        dict: 최종 상태 (initial_state의 reporter / on_stream_item 포함)
+    """
+    graph = build_graph(checkpointer=checkpointer)
+    runtime = {key: initial_state[key] for key in RUNTIME_KEYS if initial_state.get(key) is not None}
+    config = {"configurable": {"thread_id": thread_id, "runtime": runtime}}
+    order = [start for start, _ in get_edges()]
+
+    snapshot = graph.get_state(config)
+    if snapshot.values and not snapshot.next:
+        print(f"[DEBUG] 완료된 체크포인트 사용: {thread_id}")
+        return dict(snapshot.values, **runtime)
+    if snapshot.next:
+        print(f"[DEBUG] 체크포인트에서 이어서 실행: {thread_id} ({snapshot.next[0]}부터)")
+        graph_input, next_node = None, snapshot.next[0]
+    else:
+        graph_input, next_node = checkpoint_safe_state(initial_state), order[0]
+
+    if on_node:
+        on_node(next_node)
+    try:
+        for update in graph.stream(graph_input, config, stream_mode="updates"):
+            for node_name in update:
+                if on_node and node_name in order and order.index(node_name) + 1 < len(order):
+                    on_node(order[order.index(node_name) + 1])
+    except StageFailedError as e:
+        # 실패한 노드는 저장하지 않았으므로 같은 thread_id로 다시 실행하면 이 노드부터 실행
+        print(f"[DEBUG] 단계 실패로 체크포인트를 저장하지 않음: {thread_id} ({str(e)})")
+        return dict(e.state, **runtime)
+    return dict(graph.get_state(config).values, **runtime)
+
+# 비동기 그래프 실행 함수
+async def arun_graphs(initial_states: List[dict], max_concurrency: int = None) -> List[dict]:
+    """
+    여러 초기 상태(회사)에 대해 비동기 그래프를 하나의 이벤트 루프에서 동시에 실행합니다.
+
+    LLM 호출은 ainvoke로 진행되므로 응답을 기다리는 동안 스레드를 점유하지 않으며,
+    전체 LLM 동시 호출 수는 레지스트리의 비동기 semaphore로 제한됩니다.
+    이벤트 루프별 비동기 커넥션 풀은 실행이 끝나면 닫으므로 asyncio.run으로 여러 번 호출해도 됩니다.
+
+    Args:
+        initial_states (List[dict]): 회사별 초기 상태
+        max_concurrency (int): 동시에 실행할 그래프 수 상한 (기본값: None이면 제한 없음)
+
+    Returns:
+        List[dict]: 입력 순서와 동일한 순서의 최종 상태
+    """
+    graph = build_graph(get_async_nodes())
+    limiter = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def run(initial_state):
+        if limiter is None:
+            return await graph.ainvoke(initial_state)
+        async with limiter:
+            return await graph.ainvoke(initial_state)
+
+    try:
+        return await asyncio.gather(*(run(state) for state in initial_states))
+    finally:
+        # 이 이벤트 루프에서 만든 비동기 커넥션 풀은 루프가 닫히면 쓸 수 없으므로 여기서 정리
+        await get_llm_registry().aclose_loop()
+
+# 예제 초기 상태
+def _example_initial_state() -> dict:
     # 빈 초기 상태로 시작
-    result = graph.invoke({
+    return {
         "news_data": [],
         "filtered_news": [],
         "analysis": "",
@@ -930,8 +1825,10 @@ def main():
         "original_news_data": [],
         "start_datetime": datetime.now(),
         "end_datetime": datetime.now() + timedelta(days=7)
-    })
-    
+    }
+
+# 결과 출력 함수
+def print_result(result):
     # 전체 뉴스 목록 출력
     print_news(result["original_news_data"], "전체 뉴스 (50개)")
     
@@ -942,5 +1839,23 @@ def main():
     # 선별된 뉴스 출력
     print_news(result["filtered_news"], "회계법인 관점의 주요 뉴스")
 
+# 메인 실행 함수
+def main():
+    # .env의 API 키 등 환경 변수 로드 (모듈을 불러올 때는 로드하지 않음)
+    dotenv.load_dotenv(override=True)
+    
+    # 그래프 생성
+    graph = build_graph()
+    
+    # 실행
+    result = graph.invoke(_example_initial_state())
+    print_result(result)
+
+# 비동기 메인 실행 함수
+async def amain():
+    dotenv.load_dotenv(override=True)
+    results = await arun_graphs([_example_initial_state()])
+    print_result(results[0])
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,336 @@
+from datetime import datetime
+from typing import Callable, Mapping, Optional, Tuple
+
+from news_ai import (
+    collect_news,
+    filter_valid_press,
+    filter_excluded_news,
+    group_and_select_news,
+    evaluate_importance,
+    run_checkpointed_graph,
+)
+from press_matcher import get_press_matcher
+from article_registry import get_article_registry
+from reporting import CallbackReporter, get_reporter
+
+
+# 단계(그래프 노드)별 진행 메시지
+STAGE_MESSAGES = {
+    "collect_news": "1단계: 뉴스 수집 중...",
+    "filter_valid_press": "2단계: 유효 언론사 필터링 중...",
+    "filter_excluded_news": "3단계: 제외 판단 중...",
+    "group_and_select_news": "4단계: 그룹핑 중...",
+    "evaluate_importance": "5단계: 중요도 평가 중...",
+}
+
+
+def build_initial_state(company: str, keywords, *, model: str, exclusion_criteria: str,
+                        duplicate_handling: str, selection_criteria: str,
+                        system_prompts: Tuple[str, str, str], valid_press_config: Mapping,
+                        additional_press_config: Mapping, start_datetime: datetime, end_datetime: datetime,
+                        prefetched_news: Optional[dict] = None, fetch_max_workers: int = 8,
+                        use_llm_cache: bool = True, use_article_store: bool = True,
+                        run_id: Optional[str] = None) -> dict:
+    """
+    한 회사 분석의 초기 상태를 만듭니다. (앱과 배치 실행이 같은 상태 구성을 사용)
+
+    Args:
+        company (str): 회사명
+        keywords: 검색 키워드 리스트 (회사 연관 키워드)
+        model (str): 사용할 모델
+        exclusion_criteria (str): 회사별 추가 기준까지 결합한 제외 기준
+        duplicate_handling (str): 회사별 추가 기준까지 결합한 중복 처리 기준
+        selection_criteria (str): 회사별 추가 기준까지 결합한 선택 기준
+        system_prompts (Tuple[str, str, str]): 1~3단계 시스템 프롬프트
+        valid_press_config (Mapping): 유효 언론사 설정
+        additional_press_config (Mapping): 재평가 시 추가할 언론사 설정
+        start_datetime (datetime): 검색 시작 시각
+        end_datetime (datetime): 검색 종료 시각
+        prefetched_news (Optional[dict]): 회사 간 공유되는 사전 수집 결과
+        fetch_max_workers (int): 키워드별 RSS 피드 동시 요청 수 상한
+        use_llm_cache (bool): LLM 응답 캐시 사용 여부
+        use_article_store (bool): 저장된 기사 판단 재사용 여부
+        run_id (Optional[str]): 실행 ID (LLM 호출 기록용)
+
+    Returns:
+        dict: 초기 상태
+    """
+    system_prompt_1, system_prompt_2, system_prompt_3 = system_prompts
+    return {
+        "news_data": [],
+        "filtered_news": [],
+        "analysis": "",
+        "keyword": keywords,
+        "fetch_max_workers": fetch_max_workers,
+        "prefetched_news": prefetched_news or {},
+        "model": model,
+        "use_llm_cache": use_llm_cache,
+        "use_article_store": use_article_store,
+        "company": company,
+        "run_id": run_id,
+        "excluded_news": [],
+        "borderline_news": [],
+        "retained_news": [],
+        "grouped_news": [],
+        "final_selection": [],
+        "stage_errors": [],
+        "exclusion_criteria": exclusion_criteria,
+        "duplicate_handling": duplicate_handling,
+        "selection_criteria": selection_criteria,
+        "system_prompt_1": system_prompt_1,
+        "user_prompt_1": "",
+        "llm_response_1": "",
+        "system_prompt_2": system_prompt_2,
+        "user_prompt_2": "",
+        "llm_response_2": "",
+        "system_prompt_3": system_prompt_3,
+        "user_prompt_3": "",
+        "llm_response_3": "",
+        "not_selected_news": [],
+        "original_news_data": [],
+        "valid_press_dict": valid_press_config,
+        "additional_press_dict": additional_press_config,
+        "start_datetime": start_datetime,
+        "end_datetime": end_datetime
+    }
+
+
+def run_company_pipeline(initial_state: dict, valid_press_config: Mapping,
+                         additional_press_config: Mapping,
+                         notify: Optional[Callable[[str, str], None]] = None,
+                         on_item: Optional[Callable[[int, str, dict], None]] = None,
+                         checkpointer=None) -> dict:
+    """
+    한 회사의 뉴스 분석 파이프라인(수집 → 언론사 필터링 → 제외 판단 → 그룹핑 → 중요도 평가)을 실행합니다.
+
+    선택된 뉴스가 없으면 추가 언론사를 포함해 재평가(6단계)까지 수행합니다.
+    Streamlit 화면에 직접 쓰지 않고 진행/오류 메시지를 reporter(state["reporter"])로 전달하므로
+    여러 회사를 서로 다른 스레드에서 동시에 실행할 수 있습니다.
+
+    Args:
+        initial_state (dict): 회사별 초기 상태 (키워드, 기준, 프롬프트, 날짜 범위 등)
+        valid_press_config (Mapping): 유효 언론사 설정
+        additional_press_config (Mapping): 재평가 시 추가할 언론사 설정
+        notify (Optional[Callable[[str, str], None]]): 진행 메시지 콜백 ("write"/"success"/"warning"/"error", 메시지)
+            (지정하지 않으면 initial_state["reporter"], 그것도 없으면 콘솔 출력)
+        on_item (Optional[Callable[[int, str, dict], None]]): 지정하면 LLM 응답을 스트리밍으로 받아
+            항목이 완성될 때마다 (단계, 응답 키, 항목)으로 호출 (작업 스레드에서 호출될 수 있음)
+        checkpointer: 지정하면 1~5단계를 LangGraph 그래프로 실행하며 (실행 ID:회사)별로 노드마다 체크포인트를 저장
+            (같은 실행 ID로 다시 실행하면 마지막으로 완료된 단계 다음부터 이어서 실행)
+
+    Returns:
+        dict: 최종 상태 (재평가를 수행했다면 reevaluation_state 포함,
+            재시도 후에도 결과를 얻지 못한 단계가 있으면 stage_errors에 오류 메시지 목록)
+    """
+    # stage 함수의 오류 메시지도 진행 메시지와 같은 곳으로 전달
+    reporter = CallbackReporter(notify) if notify else get_reporter(initial_state)
+    notify = reporter.report
+    initial_state = dict(initial_state, reporter=reporter)
+    if on_item:
+        initial_state = dict(initial_state, on_stream_item=on_item)
+
+    # 회사별로 결합된 기준 (재평가 프롬프트에 사용)
+    enhanced_exclusion_criteria = initial_state.get("exclusion_criteria", "")
+    enhanced_duplicate_handling = initial_state.get("duplicate_handling", "")
+    enhanced_selection_criteria = initial_state.get("selection_criteria", "")
+
+    if checkpointer is not None and initial_state.get("run_id"):
+        # 1~5단계: 체크포인트를 남기며 그래프로 실행 (실패한 실행은 마지막 완료 단계 다음부터 재개)
+        from checkpoint_store import make_thread_id
+        thread_id = make_thread_id(initial_state["run_id"], initial_state.get("company", ""))
+        final_state = run_checkpointed_graph(initial_state, checkpointer, thread_id,
+                                             on_node=lambda node: notify("write", STAGE_MESSAGES[node]))
+    else:
+        # 1단계: 뉴스 수집
+        notify("write", STAGE_MESSAGES["collect_news"])
+        state_after_collection = collect_news(initial_state)
+
+        # 2단계: 유효 언론사 필터링
+        notify("write", STAGE_MESSAGES["filter_valid_press"])
+        state_after_press_filter = filter_valid_press(state_after_collection)
+
+        # 3단계: 제외 판단
+        notify("write", STAGE_MESSAGES["filter_excluded_news"])
+        state_after_exclusion = filter_excluded_news(state_after_press_filter)
+
+        # 4단계: 그룹핑
+        notify("write", STAGE_MESSAGES["group_and_select_news"])
+        state_after_grouping = group_and_select_news(state_after_exclusion)
+
+        # 5단계: 중요도 평가
+        notify("write", STAGE_MESSAGES["evaluate_importance"])
+        final_state = evaluate_importance(state_after_grouping)
+
+    # 6단계: 0개 선택 시 재평가 (개선된 코드)
+    if len(final_state["final_selection"]) == 0:
+        notify("write", "6단계: 선택된 뉴스가 없어 재평가를 시작합니다...")
+
+        # 추가 언론사 설정 불러오기 (이미 파싱된 딕셔너리 사용)
+        additional_press = additional_press_config
+
+        # 기존 유효 언론사에 추가 언론사 병합 (딕셔너리 병합)
+        expanded_valid_press_dict = {**valid_press_config, **additional_press}
+
+        # 추가 언론사로 필터링한 뉴스 저장 (기존 뉴스와 구분)
+        additional_valid_news = []
+
+        # 확장된 언론사 목록으로 원본 뉴스 재필터링
+        try:
+            # 현재 필터링된 유효 언론사 뉴스 수집
+            current_news_data = final_state.get("news_data", [])
+
+            # 원본 뉴스 데이터 가져오기
+            original_news_data = final_state.get("original_news_data", [])
+
+            if expanded_valid_press_dict:
+                # 확장된 언론사 목록용 매처 (설정별로 한 번만 컴파일되어 회사 간 재사용)
+                expanded_matcher = get_press_matcher(expanded_valid_press_dict)
+
+                # 현재 뉴스의 URL 색인 (단계 간 공유되는 기사 색인 재사용)
+                registry = get_article_registry(final_state)
+
+                # 확장된 언론사 목록으로 원본 뉴스 재필터링
+                for news in original_news_data:
+                    # 이미 필터링된 뉴스는 제외
+                    if registry.has_url(news.get('url')):
+                        continue
+
+                    if expanded_matcher.match(news.get("press", ""), news.get("url", "")):
+                        # 새 언론사 필터링된 뉴스임을 표시
+                        additional_valid_news.append(news)
+
+            # 추가 유효 뉴스가 있으면 기존 news_data에 추가
+            if additional_valid_news:
+                notify("success", f"추가 언론사 기준으로 {len(additional_valid_news)}개의 뉴스가 추가로 필터링되었습니다.")
+
+                # 기존 뉴스 데이터와 병합
+                combined_news = current_news_data + additional_valid_news
+                reevaluation_state = final_state.copy()
+                reevaluation_state["news_data"] = combined_news
+
+                # 추가된 뉴스들에 대한 제외/유지 판단 재실행
+                reevaluation_state = filter_excluded_news(reevaluation_state)
+
+                # 그룹핑 재실행
+                reevaluation_state = group_and_select_news(reevaluation_state)
+            else:
+                # 추가 뉴스가 없으면 원래 상태 복사
+                reevaluation_state = final_state.copy()
+                combined_news = current_news_data
+        except Exception as e:
+            notify("warning", f"추가 언론사 필터링 중 오류 발생: {str(e)}")
+            reevaluation_state = final_state.copy()
+            combined_news = final_state.get("news_data", [])
+
+        # 확장된 유효 언론사 목록 문자열로 변환 (프롬프트용)
+        expanded_valid_press_str = "유효 언론사 목록:\n"
+        for press, aliases in expanded_valid_press_dict.items():
+            expanded_valid_press_str += f"  * {press}: {aliases}\n"
+
+        # 재평가 시스템 프롬프트 개선 - 모든 뉴스 데이터 포함
+        reevaluation_system_prompt = f"""
+        당신은 회계법인의 뉴스 분석 전문가입니다. 현재 선정된 뉴스가 없어 재평가가 필요합니다.
+        아래 4가지 방향으로 뉴스를 재검토하세요:
+
+        1. 언론사 필터링 기준 완화:
+        - 기존 유효 언론사 목록 외에도 다음 언론사의 기사를 포함하여 평가합니다:
+          * 철강금속신문: 산업 전문지로 금속/철강 업계 소식에 특화됨
+          * 에너지신문: 에너지 산업 전문 매체로 관련 기업 분석에 유용함
+          * 이코노믹데일리: 경제 전문지로 추가적인 시각 제공
+
+        2. 제외 조건 재평가:
+        - 제외 기준을 유연하게 적용하여, 회계법인의 관점에서 재무적 관점으로 해석 가능한 기사들을 보류로 분류
+        - 특히 기업의 재정 혹은 전략적 변동과 연관된 기사를 보류로 전환
+
+        3. 중복 제거 재평가:
+        - 중복 기사 중에서도 언론사의 신뢰도나 기사 내용을 추가로 고려하여 가능한 경우 추가적으로 선택
+        - 재무적/전략적 관점에서 추가 정보를 제공하는 기사 우선 선택
+
+        4. 중요도 재평가:
+        - 선택 기준을 일부 충족하지 않는 기사일지라도 기업명과 관련된 재정적 또는 전략적 변동에 대해서는 중요도를 '중'으로 평가
+        - 필요하다면 중요도 '하'도 고려하여 최소 2개의 기사를 선정
+
+        [확장된 유효 언론사 목록]
+        {expanded_valid_press_str}
+
+        [기존 제외 기준]
+        {enhanced_exclusion_criteria}
+
+        [기존 중복 처리 기준]
+        {enhanced_duplicate_handling}
+
+        [기존 선택 기준]
+        {enhanced_selection_criteria}
+
+        [전체 뉴스 목록]
+        """
+
+        # 모든 뉴스 데이터를 하나의 리스트로 통합 (JSON 형식으로)
+        all_news_json = []
+        for i, news in enumerate(combined_news):
+            all_news_json.append({
+                "index": i+1,
+                "title": news.get('content', '제목 없음'),
+                "url": news.get('url', ''),
+                "date": news.get('date', ''),
+                "press": news.get('press', '')
+            })
+
+        # 프롬프트에 통합된 뉴스 목록 추가
+        reevaluation_system_prompt += str(all_news_json)
+
+        reevaluation_system_prompt += """
+
+        [분류된 뉴스 목록]
+        - 제외된 뉴스: {[f"제목: {news['title']}, 인덱스: {news['index']}, 사유: {news.get('reason', '')}" for news in reevaluation_state["excluded_news"]]}
+        - 보류 뉴스: {[f"제목: {news['title']}, 인덱스: {news['index']}, 사유: {news.get('reason', '')}" for news in reevaluation_state["borderline_news"]]}
+        - 유지 뉴스: {[f"제목: {news['title']}, 인덱스: {news['index']}, 사유: {news.get('reason', '')}" for news in reevaluation_state["retained_news"]]}
+
+        ⚠️ 매우 중요한 지시사항 ⚠️
+        1. 반드시 최소 2개 이상의 기사를 선정해야 합니다.
+        2. 언론사와 기사 내용을 고려하여 선정 기준을 대폭 완화하세요.
+        3. 원래 '제외'로 분류했던 기사 중에서도 회계법인 관점에서 조금이라도 가치가 있는 내용이 있다면 재검토하세요.
+        4. 어떤 경우에도 2개 미만의 기사를 선정하지 마세요. 이는 절대적인 요구사항입니다.
+        5. 모든 기사가 부적합하다고 판단되더라도 그 중에서 가장 나은 2개는 선정해야 합니다.
+        6. 추가 언론사 목록의 기사들도 동등하게 고려하세요.
+
+        다음 JSON 형식으로 응답해주세요:
+        {
+            "reevaluated_news": [
+                {
+                    "index": 1,
+                    "title": "뉴스 제목",
+                    "press": "언론사명",
+                    "date": "발행일자",
+                    "reason": "선정 사유",
+                    "keywords": ["키워드1", "키워드2"],
+                    "affiliates": ["계열사1", "계열사2"],
+                    "importance": "중요도(상/중/하)"
+                }
+            ]
+        }
+        """
+
+        # 재평가 시스템 프롬프트로 업데이트
+        reevaluation_state["system_prompt_3"] = reevaluation_system_prompt
+        # 재평가 프롬프트는 실행마다 뉴스 목록이 달라 저장된 평가를 재사용할 수 없으므로 저장소 사용 안 함
+        reevaluation_state["use_article_store"] = False
+
+        # 재평가 실행 (evaluate_importance 함수 재사용)
+        notify("write", "- 제외/중복/중요도 통합 재평가 중...")
+        reevaluation_result = evaluate_importance(reevaluation_state)
+
+        # 재평가 결과가 있으면 최종 상태 업데이트
+        if "final_selection" in reevaluation_result and reevaluation_result["final_selection"]:
+            final_state["final_selection"] = reevaluation_result["final_selection"]
+            # 재평가 결과임을 표시하기 위한 필드 추가
+            final_state["is_reevaluated"] = True
+            notify("success", f"재평가 후 {len(final_state['final_selection'])}개의 뉴스가 선택되었습니다.")
+        else:
+            # 그래도 없으면 오류 메시지만 표시
+            notify("error", "재평가 후에도 선정할 수 있는 뉴스가 없습니다.")
+
+        # 디버그 정보 표시를 위해 재평가에 사용한 상태 보관
+        final_state["reevaluation_state"] = reevaluation_state
+
+    return final_state
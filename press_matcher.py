@@ -0,0 +1,233 @@
+import ast
+import re
+from collections import deque
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+
+def normalize_string(s: str) -> str:
+    """문자열을 정규화하여 비교하기 쉽게 만듭니다. (소문자, 앞뒤 공백 제거, 연속 공백 축소)"""
+    if not s:
+        return ""
+    return re.sub(r'\s+', ' ', s.lower().strip())
+
+
+class PressConfig(Mapping):
+    """
+    불변 언론사 설정 {언론사: (별칭, ...)}입니다.
+
+    해시 가능하므로 컴파일된 PressMatcher의 캐시 키로 그대로 사용할 수 있고,
+    일반 dict처럼 items() / {**config} 등으로 읽을 수 있습니다.
+    """
+
+    __slots__ = ("_items", "_index", "_hash")
+
+    def __init__(self, items=()):
+        if isinstance(items, Mapping):
+            items = items.items()
+        index = {}
+        for press, aliases in items:
+            index[str(press)] = tuple(aliases)
+        self._index = index
+        self._items = tuple(index.items())
+        self._hash = hash(self._items)
+
+    def __getitem__(self, press):
+        return self._index[press]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, PressConfig):
+            return self._items == other._items
+        return super().__eq__(other)
+
+    def __repr__(self):
+        return f"PressConfig({dict(self._items)!r})"
+
+    def __reduce__(self):
+        # 프로세스마다 문자열 해시 값이 다르므로 다른 프로세스로 보낼 때는 해시를 다시 계산
+        return (PressConfig, (self._items,))
+
+
+@lru_cache(maxsize=32)
+def parse_press_config(text: str) -> PressConfig:
+    """
+    '언론사: ["별칭1", "별칭2", ...]' 형식의 줄들을 PressConfig로 변환합니다.
+
+    별칭 목록은 ast.literal_eval로만 해석하므로 임의 코드가 실행되지 않으며,
+    같은 내용의 문자열은 한 번만 파싱합니다. 해석할 수 없는 줄은 건너뜁니다.
+    """
+    items = []
+    for line in text.strip().split('\n'):
+        line = line.strip()
+        if not line or ': ' not in line:
+            continue
+        press_name, aliases_str = line.split(':', 1)
+        try:
+            aliases = ast.literal_eval(aliases_str.strip())
+            if not isinstance(aliases, (list, tuple)) or not all(isinstance(alias, str) for alias in aliases):
+                raise ValueError("별칭은 문자열 리스트여야 합니다.")
+            items.append((press_name.strip(), aliases))
+        except (ValueError, SyntaxError) as e:
+            print(f"[DEBUG] 언론사 설정 파싱 실패: {line}, 오류: {str(e)}")
+    print(f"[DEBUG] 언론사 설정 파싱 완료: {len(items)}개 언론사")
+    return PressConfig(items)
+
+
+class AhoCorasick:
+    """여러 별칭을 한 번의 순회로 찾아내는 Aho-Corasick 오토마톤"""
+
+    def __init__(self, patterns: Sequence[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for pattern in patterns:
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(pattern)
+
+        # 너비 우선으로 실패 링크 구성
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text: str) -> set:
+        """text에 포함된 모든 패턴을 반환합니다."""
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            if self._output[node]:
+                found.update(self._output[node])
+        return found
+
+
+class PressMatcher:
+    """
+    유효 언론사 설정을 한 번 컴파일해 두고 기사별 언론사/도메인을 빠르게 매칭합니다.
+
+    매칭 규칙은 기존 filter_valid_press와 같습니다. 설정 순서대로 언론사를 확인하여
+    언론사명이 별칭과 같거나 서로 포함 관계이면 매칭되고, 아니면 URL 도메인과 별칭이
+    서로 포함 관계인지 확인합니다. 먼저 매칭된 언론사와 그 언론사의 첫 번째 매칭 별칭을 사용합니다.
+
+    - 별칭 ⊂ 텍스트: 모든 별칭으로 만든 Aho-Corasick 오토마톤으로 한 번에 검색
+    - 텍스트 ⊂ 별칭 (완전 일치 포함): 별칭의 모든 부분 문자열 해시 인덱스로 O(1) 조회
+    """
+
+    def __init__(self, press_config: Mapping[str, Sequence[str]]):
+        self.press_names: List[str] = []
+        self.aliases: List[List[str]] = []
+        # 별칭 → [(언론사 순서, 별칭 순서)]
+        alias_positions: Dict[str, List[Tuple[int, int]]] = {}
+        # 별칭의 부분 문자열 → 언론사 순서별 최소 별칭 순서
+        substring_index: Dict[str, Dict[int, int]] = {}
+        # 빈 별칭은 모든 텍스트에 포함되므로 별도로 처리
+        self._empty_alias_hits: Dict[int, int] = {}
+
+        for press_rank, (main_press, aliases) in enumerate(press_config.items()):
+            normalized_aliases = [normalize_string(alias) for alias in aliases]
+            self.press_names.append(main_press)
+            self.aliases.append(normalized_aliases)
+
+            for alias_rank, alias in enumerate(normalized_aliases):
+                if not alias:
+                    self._empty_alias_hits.setdefault(press_rank, alias_rank)
+                    continue
+                alias_positions.setdefault(alias, []).append((press_rank, alias_rank))
+                for start in range(len(alias)):
+                    for end in range(start + 1, len(alias) + 1):
+                        ranks = substring_index.setdefault(alias[start:end], {})
+                        if press_rank not in ranks or alias_rank < ranks[press_rank]:
+                            ranks[press_rank] = alias_rank
+
+        self._alias_positions = alias_positions
+        self._substring_index = substring_index
+        self._automaton = AhoCorasick(list(alias_positions))
+
+    def _hits(self, text: str) -> Dict[int, int]:
+        """text와 포함 관계인 별칭을 {언론사 순서: 최소 별칭 순서}로 반환합니다."""
+        hits: Dict[int, int] = {}
+
+        def add(press_rank, alias_rank):
+            if press_rank not in hits or alias_rank < hits[press_rank]:
+                hits[press_rank] = alias_rank
+
+        if not text:
+            # 빈 문자열은 모든 별칭에 포함됨
+            for press_rank, aliases in enumerate(self.aliases):
+                if aliases:
+                    add(press_rank, 0)
+            return hits
+
+        # 텍스트가 별칭에 포함되는 경우 (완전 일치 포함)
+        for press_rank, alias_rank in self._substring_index.get(text, {}).items():
+            add(press_rank, alias_rank)
+
+        # 별칭이 텍스트에 포함되는 경우
+        for alias in self._automaton.find_all(text):
+            for press_rank, alias_rank in self._alias_positions[alias]:
+                add(press_rank, alias_rank)
+
+        for press_rank, alias_rank in self._empty_alias_hits.items():
+            add(press_rank, alias_rank)
+
+        return hits
+
+    def match(self, press: str, url: str) -> Optional[Tuple[str, str]]:
+        """
+        기사 언론사명과 URL을 유효 언론사 설정과 매칭합니다.
+
+        Returns:
+            Optional[Tuple[str, str]]: (매칭된 언론사, 매칭된 별칭), 매칭되지 않으면 None
+        """
+        press_hits = self._hits(normalize_string(press))
+        domain = urlparse(normalize_string(url)).netloc
+        domain_hits = self._hits(domain) if domain else {}
+
+        candidates = set(press_hits) | set(domain_hits)
+        if not candidates:
+            return None
+
+        press_rank = min(candidates)
+        alias_rank = press_hits[press_rank] if press_rank in press_hits else domain_hits[press_rank]
+        return self.press_names[press_rank], self.aliases[press_rank][alias_rank]
+
+
+@lru_cache(maxsize=32)
+def _compile_press_matcher(press_config: PressConfig) -> PressMatcher:
+    return PressMatcher(press_config)
+
+
+def get_press_matcher(press_config: Mapping) -> PressMatcher:
+    """설정 내용별로 컴파일된 PressMatcher를 재사용하여 반환합니다."""
+    if not isinstance(press_config, PressConfig):
+        press_config = PressConfig(press_config)
+    return _compile_press_matcher(press_config)
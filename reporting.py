@@ -0,0 +1,70 @@
+from abc import ABC, abstractmethod
+from typing import Callable
+
+
+class Reporter(ABC):
+    """
+    분석 단계의 진행/오류 메시지를 전달하는 인터페이스입니다.
+
+    state["reporter"]로 전달하면 stage 함수가 Streamlit 등 특정 화면에 의존하지 않고 메시지를 남길 수 있습니다.
+    level은 "write" / "success" / "warning" / "error" 중 하나입니다.
+    reporter는 직렬화할 수 없으므로 AgentState에 선언하지 않습니다. LangGraph 그래프로 실행하면 단계 사이에
+    전달되지 않아 기본 콘솔 출력(ConsoleReporter)을 사용하며, run_checkpointed_graph로 실행할 때만
+    config["configurable"]["runtime"]으로 전달되어 노드마다 state에 다시 붙습니다.
+    """
+
+    @abstractmethod
+    def report(self, level: str, message: str):
+        """level 수준의 메시지를 전달합니다."""
+
+    def write(self, message: str):
+        self.report("write", message)
+
+    def success(self, message: str):
+        self.report("success", message)
+
+    def warning(self, message: str):
+        self.report("warning", message)
+
+    def error(self, message: str):
+        self.report("error", message)
+
+
+class ConsoleReporter(Reporter):
+    """메시지를 콘솔에 출력합니다. (예: [ERROR] 삼성: 메시지)"""
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+
+    def report(self, level: str, message: str):
+        print(f"[{level.upper()}] {self.prefix}{message}")
+
+
+class CallbackReporter(Reporter):
+    """메시지를 notify(level, message) 콜백으로 전달합니다. (작업 스레드에서 호출될 수 있음)"""
+
+    def __init__(self, notify: Callable[[str, str], None]):
+        self.notify = notify
+
+    def report(self, level: str, message: str):
+        self.notify(level, message)
+
+
+class StreamlitReporter(Reporter):
+    """
+    메시지를 Streamlit 화면에 바로 표시합니다. (st.write / st.success / st.warning / st.error)
+
+    Streamlit 세션이 연결된 스레드에서만 사용해야 하며, streamlit은 처음 메시지를 표시할 때 불러옵니다.
+    """
+
+    def report(self, level: str, message: str):
+        import streamlit as st
+        getattr(st, level, st.write)(message)
+
+
+_console_reporter = ConsoleReporter()
+
+
+def get_reporter(state: dict) -> Reporter:
+    """state["reporter"]가 있으면 그 reporter를, 없으면 콘솔 출력 reporter를 반환합니다."""
+    return state.get("reporter") or _console_reporter
@@ -0,0 +1,87 @@
+import json
+from typing import List, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class _LLMOutput(BaseModel):
+    """LLM 응답 스키마의 공통 설정 (스키마에 없는 필드도 그대로 보존)"""
+
+    model_config = ConfigDict(extra="allow")
+
+
+class ClassifiedNews(_LLMOutput):
+    """1단계 제외/보류/유지 분류 항목"""
+
+    index: int
+    title: str = ""
+    reason: str = ""
+    confidence: Optional[float] = None  # 판단 확신도 (0~1)
+
+
+class ExclusionResult(_LLMOutput):
+    """1단계 제외 판단 응답"""
+
+    excluded: List[ClassifiedNews]
+    borderline: List[ClassifiedNews]
+    retained: List[ClassifiedNews]
+
+
+class NewsGroup(_LLMOutput):
+    """2단계 유사 뉴스 그룹"""
+
+    indices: List[int]
+    selected_index: int
+    reason: str = ""
+
+
+class GroupingResult(_LLMOutput):
+    """2단계 그룹핑 응답"""
+
+    groups: List[NewsGroup] = Field(default_factory=list)
+
+
+class SelectedNews(_LLMOutput):
+    """3단계 최종 선정 항목"""
+
+    index: int
+    title: str = ""
+    importance: str = ""
+    reason: str = ""
+    keywords: List[str] = Field(default_factory=list)
+    affiliates: List[str] = Field(default_factory=list)
+    press: str = ""
+    date: str = ""
+
+
+class NotSelectedNews(_LLMOutput):
+    """3단계 미선정 항목"""
+
+    index: int
+    title: str = ""
+    importance: str = ""
+    reason: str = ""
+
+
+class EvaluationResult(_LLMOutput):
+    """3단계 중요도 평가 응답"""
+
+    final_selection: List[SelectedNews]
+    not_selected: List[NotSelectedNews]
+
+
+def validate_output(data: dict, schema: Type[BaseModel]) -> dict:
+    """
+    파싱한 LLM 응답을 스키마로 검증하고 dict로 반환합니다.
+
+    숫자 문자열 인덱스("3")처럼 변환 가능한 값은 정규화하며,
+    검증에 실패하면 pydantic.ValidationError(ValueError 하위 클래스)를 발생시킵니다.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"JSON 객체가 아닙니다: {type(data).__name__}")
+    return schema.model_validate(data).model_dump()
+
+
+def schema_description(schema: Type[BaseModel]) -> str:
+    """수정 요청 프롬프트에 넣을 스키마의 JSON Schema 문자열"""
+    return json.dumps(schema.model_json_schema(), ensure_ascii=False)
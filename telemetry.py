@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from date_utils import KST
+
+
+def new_run_id() -> str:
+    """실행 시각 기반 실행 ID (예: 20250101_083000_1a2b3c)"""
+    return f"{datetime.now(KST).strftime('%Y%m%d_%H%M%S')}_{os.urandom(3).hex()}"
+
+
+class RunTelemetry:
+    """
+    한 번의 분석 실행에서 발생한 LLM 호출 기록(회사/단계별 토큰, 처리 시간, 재시도, 캐시 사용)을 모읍니다.
+
+    기록은 호출마다 log_dir/run_{run_id}.jsonl에 한 줄씩 추가되고, summary()로 회사/단계별 합계를 볼 수 있습니다.
+    여러 스레드에서 동시에 기록해도 안전합니다.
+    """
+
+    def __init__(self, run_id: str, log_dir: Optional[str] = "logs"):
+        """
+        Args:
+            run_id (str): 실행 ID
+            log_dir (Optional[str]): JSONL 로그를 저장할 폴더 (기본값: "logs", None이면 파일로 남기지 않음)
+        """
+        self.run_id = run_id
+        self.records: List[dict] = []
+        self._lock = threading.Lock()
+        self.path = None
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            self.path = os.path.join(log_dir, f"run_{run_id}.jsonl")
+
+    def record(self, company: str, stage: int, model: str, kind: str = "call",
+               prompt_tokens: int = 0, completion_tokens: int = 0, token_source: str = "usage",
+               wall_time: float = 0.0, wait_time: float = 0.0, cache_hit: bool = False,
+               error: Optional[str] = None):
+        """
+        LLM 호출 하나의 기록을 추가합니다.
+
+        Args:
+            company (str): 회사명
+            stage (int): 단계 번호 (1: 제외 판단, 2: 그룹핑, 3: 중요도 평가)
+            model (str): 모델명
+            kind (str): 호출 종류 ("call": 첫 호출, "retry": 전체 프롬프트 재요청, "repair": 형식 수정 요청,
+                "escalation": 상위 모델 재판단)
+            prompt_tokens (int): 입력 토큰 수
+            completion_tokens (int): 출력 토큰 수
+            token_source (str): 토큰 수 출처 ("usage": 응답 메타데이터, "estimate": 토크나이저 추정,
+                "cache": 캐시 사용으로 토큰 미사용, "none": 호출 오류)
+            wall_time (float): 동시 호출 제한 대기를 포함한 전체 소요 시간(초)
+            wait_time (float): 동시 호출 제한으로 대기한 시간(초)
+            cache_hit (bool): 응답 캐시 사용 여부
+            error (Optional[str]): 호출 오류 메시지
+        """
+        entry = {
+            "run_id": self.run_id,
+            "timestamp": datetime.now(KST).isoformat(),
+            "company": company,
+            "stage": stage,
+            "model": model,
+            "kind": kind,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "token_source": token_source,
+            "wall_time": round(wall_time, 3),
+            "wait_time": round(wait_time, 3),
+            "cache_hit": cache_hit,
+            "error": error,
+        }
+        with self._lock:
+            self.records.append(entry)
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                except OSError as e:
+                    print(f"[DEBUG] 실행 로그 기록 실패: {str(e)}")
+
+    def summary(self) -> List[dict]:
+        """회사/단계별 호출 수, 토큰, 처리 시간, 재시도/형식 수정/상위 모델 재판단, 캐시 사용 합계를 반환합니다."""
+        totals: Dict[tuple, dict] = {}
+        with self._lock:
+            records = list(self.records)
+        for entry in records:
+            key = (entry["company"], entry["stage"])
+            total = totals.setdefault(key, {
+                "company": entry["company"],
+                "stage": entry["stage"],
+                "calls": 0,
+                "retries": 0,
+                "repairs": 0,
+                "escalations": 0,
+                "cache_hits": 0,
+                "errors": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "wall_time": 0.0,
+                "wait_time": 0.0,
+            })
+            total["calls"] += 1
+            total["retries"] += entry["kind"] == "retry"
+            total["repairs"] += entry["kind"] == "repair"
+            total["escalations"] += entry["kind"] == "escalation"
+            total["cache_hits"] += bool(entry["cache_hit"])
+            total["errors"] += bool(entry["error"])
+            total["prompt_tokens"] += entry["prompt_tokens"]
+            total["completion_tokens"] += entry["completion_tokens"]
+            total["wall_time"] = round(total["wall_time"] + entry["wall_time"], 3)
+            total["wait_time"] = round(total["wait_time"] + entry["wait_time"], 3)
+        return [totals[key] for key in sorted(totals, key=lambda k: (str(k[0]), k[1]))]
+
+
+_runs: Dict[str, RunTelemetry] = {}
+_runs_lock = threading.Lock()
+_default_run_id = None
+
+
+def get_run_telemetry(run_id: Optional[str] = None, log_dir: Optional[str] = "logs") -> RunTelemetry:
+    """
+    실행 ID별 RunTelemetry를 반환합니다. (없으면 생성)
+
+    run_id가 없으면 프로세스 전체에서 공유하는 기본 실행에 기록합니다.
+    """
+    global _default_run_id
+    with _runs_lock:
+        if run_id is None:
+            if _default_run_id is None:
+                _default_run_id = new_run_id()
+            run_id = _default_run_id
+        run = _runs.get(run_id)
+        if run is None:
+            run = RunTelemetry(run_id, log_dir)
+            _runs[run_id] = run
+        return run
+
+
+def close_run(run_id: str):
+    """끝난 실행의 기록을 메모리에서 정리합니다. (JSONL 로그는 유지)"""
+    with _runs_lock:
+        _runs.pop(run_id, None)
@@ -0,0 +1,66 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import tiktoken
+
+# 모델명으로 토크나이저를 찾을 수 없을 때 사용할 인코딩 (gpt-4o / gpt-4.1 계열)
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=16)
+def get_encoding(model: str) -> Optional["tiktoken.Encoding"]:
+    """
+    모델에 맞는 tiktoken 인코딩을 반환합니다.
+
+    모델명을 알 수 없으면 DEFAULT_ENCODING을 사용하고, 인코딩 파일을 내려받을 수 없는
+    환경에서는 None을 반환합니다. (결과는 모델별로 한 번만 확인)
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        print(f"[DEBUG] '{model}' 토크나이저 로드 실패: {str(e)}")
+        return None
+
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        print(f"[DEBUG] {DEFAULT_ENCODING} 토크나이저 로드 실패, 글자 수 기반 추정 사용: {str(e)}")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """
+    text의 토큰 수를 셉니다.
+
+    토크나이저를 사용할 수 없으면 UTF-8 바이트 수로 추정합니다.
+    (한글 1글자 ≈ 3바이트 ≈ 1토큰, 영문은 실제보다 약간 많게 추정됨)
+    """
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is None:
+        return len(text.encode("utf-8")) // 3 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def chunk_by_token_budget(lines: List[str], token_budget: int, max_items: int,
+                          model: str = "gpt-4o") -> List[Tuple[int, int]]:
+    """
+    순서를 유지하면서 lines를 토큰 수 합계가 token_budget 이하, 개수가 max_items 이하인
+    구간으로 나누어 (시작, 끝) 인덱스 목록을 반환합니다. 한 줄이 예산을 넘으면 단독 구간이 됩니다.
+    """
+    ranges = []
+    start = 0
+    used = 0
+    for i, line in enumerate(lines):
+        tokens = count_tokens(line, model)
+        if i > start and (used + tokens > token_budget or i - start >= max_items):
+            ranges.append((start, i))
+            start = i
+            used = 0
+        used += tokens
+    if start < len(lines):
+        ranges.append((start, len(lines)))
+    return ranges